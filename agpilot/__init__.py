@@ -0,0 +1 @@
+"""Streamlit-free calculation core for AgPilot."""
@@ -0,0 +1,128 @@
+"""Aircraft type database.
+
+Types are defined in aircraft.json (shipped next to this module) and loaded
+once per process into an AircraftDatabase: a read-only mapping of type name to
+record dict, backed by a NumPy structured array of the numeric fields with
+indexes by name and by category. Additional or replacement types can be
+supplied without touching code through files listed in AGPILOT_AIRCRAFT_FILE
+(os.pathsep-separated, same format); later files win by name.
+
+Performance figures, station arms (inches aft of each type's datum) and the
+``cg_envelope`` polygons (convex, [arm_in, weight_lbs] vertices) are representative
+values for the calculator, not POH data.
+"""
+
+import json
+import os
+from collections.abc import Mapping
+from functools import lru_cache
+
+import numpy as np
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "aircraft.json")
+OVERRIDE_ENV = "AGPILOT_AIRCRAFT_FILE"
+SCHEMA_VERSION = 1
+CATEGORIES = ("fixed_wing", "helicopter")
+
+REQUIRED_FIELDS = (
+    "base_takeoff_ground_roll_ft", "base_takeoff_to_50ft_ft", "base_landing_ground_roll_ft",
+    "base_landing_to_50ft_ft", "base_climb_rate_fpm", "base_stall_flaps_down_mph", "best_climb_speed_mph",
+    "base_empty_weight_lbs", "base_fuel_capacity_gal", "fuel_weight_per_gal", "hopper_capacity_gal",
+    "hopper_weight_per_gal", "max_takeoff_weight_lbs", "max_landing_weight_lbs", "glide_ratio",
+    "empty_arm_in", "pilot_arm_in", "fuel_arm_in", "hopper_arm_in",
+)
+# Numeric fields that may be omitted (0 = not applicable, e.g. hover ceilings for fixed-wing types).
+OPTIONAL_FIELDS = ("hover_ceiling_ige_max_gw", "hover_ceiling_oge_max_gw")
+NUMERIC_FIELDS = REQUIRED_FIELDS + OPTIONAL_FIELDS
+
+
+class AircraftDatabase(Mapping):
+    """Type name → record dict, with a structured-array view and name/category indexes."""
+
+    def __init__(self, records):
+        self._records = {record["name"]: record for record in records}
+        names = list(self._records)
+        dtype = [("name", f"U{max(map(len, names), default=1)}"), ("category", "U16")]
+        dtype += [(field, "f8") for field in NUMERIC_FIELDS]
+        self.table = np.array(
+            [(record["name"], record["category"], *(record.get(field, 0) for field in NUMERIC_FIELDS))
+             for record in self._records.values()],
+            dtype=dtype,
+        )
+        self.table.flags.writeable = False
+        self.by_name = {name: i for i, name in enumerate(names)}
+        self.by_category = {category: tuple(name for name in names if self._records[name]["category"] == category)
+                            for category in CATEGORIES}
+
+    def __getitem__(self, name):
+        return self._records[name]
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def names(self, category=None):
+        return tuple(self._records) if category is None else self.by_category[category]
+
+    def indexes(self, names):
+        """Row indexes into ``table`` for an array of type names (KeyError for unknown types)."""
+        names = np.asarray(names, dtype=str)
+        unique, inverse = np.unique(names, return_inverse=True)
+        return np.array([self.by_name[name] for name in unique], dtype=np.intp)[inverse].reshape(names.shape)
+
+    def rows(self, names):
+        """Structured-array rows for ``names``; usable directly as per-row ``data`` by agpilot.performance."""
+        return self.table[self.indexes(names)]
+
+
+def read_types(path):
+    """Parse one type file into a list of validated record dicts."""
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    if document.get("version") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported aircraft file version {document.get('version')!r}")
+    records = []
+    for record in document["aircraft"]:
+        name = record.get("name", "?")
+        missing = [field for field in REQUIRED_FIELDS + ("cg_envelope",) if field not in record]
+        if missing:
+            raise ValueError(f"{path}: {name} is missing {', '.join(missing)}")
+        if record.get("category") not in CATEGORIES:
+            raise ValueError(f"{path}: {name} has category {record.get('category')!r}; expected one of {CATEGORIES}")
+        if not _convex(record["cg_envelope"]):
+            raise ValueError(f"{path}: {name} cg_envelope must be a convex polygon")
+        records.append(record)
+    return records
+
+
+def _convex(polygon):
+    # Every turn the same way (collinear vertices allowed); weight_balance.path_in_polygon relies on it.
+    vertices = np.asarray(polygon, dtype=float)
+    if vertices.ndim != 2 or vertices.shape[0] < 3 or vertices.shape[1] != 2:
+        return False
+    edges = np.roll(vertices, -1, axis=0) - vertices
+    turns = edges[:, 0] * np.roll(edges[:, 1], -1) - edges[:, 1] * np.roll(edges[:, 0], -1)
+    return bool((turns >= 0).all() or (turns <= 0).all())
+
+
+@lru_cache(maxsize=None)
+def load_database(paths=(DATA_PATH,)):
+    records = {}
+    for path in paths:
+        records.update((record["name"], record) for record in read_types(path))
+    return AircraftDatabase(records.values())
+
+
+def database():
+    """The process-wide database: the shipped types plus any AGPILOT_AIRCRAFT_FILE files."""
+    overrides = tuple(path for path in os.environ.get(OVERRIDE_ENV, "").split(os.pathsep) if path)
+    return load_database((DATA_PATH,) + overrides)
+
+
+def __getattr__(name):
+    # AIRCRAFT_DATA is resolved on first use rather than at import.
+    if name == "AIRCRAFT_DATA":
+        return database()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
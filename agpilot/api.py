@@ -0,0 +1,289 @@
+"""Headless HTTP/JSON API over agpilot.calculations, plus a local load generator.
+
+Endpoints (all JSON unless noted):
+
+    GET  /health
+    GET  /v1/aircraft
+    POST /v1/performance          one request object → one result object
+    POST /v1/weight-balance
+    POST /v1/max-hopper
+    POST /v1/<endpoint>/batch     {"requests": [...]} → {"results": [...]}, evaluated in one vectorized pass
+    POST /v1/loadplan             load plan CSV (text/csv) → evaluated CSV, see agpilot.loadplan
+
+Request fields and defaults are listed in agpilot.calculations (PERFORMANCE_FIELDS, ...).
+Results that are not finite (e.g. a hover limit for a fixed-wing type) are sent as null.
+Connections are HTTP/1.1 keep-alive and are served by a fixed thread pool;
+``--processes`` forks that many servers sharing the port (SO_REUSEPORT) to use
+more than one core.
+
+Usage:
+    python -m agpilot.api serve --port 8502 --workers 32 --processes 4
+    python -m agpilot.api bench --url http://127.0.0.1:8502 --connections 32 --requests 20000 [--batch 100]
+"""
+
+import argparse
+import http.client
+import json
+import math
+import os
+import signal
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from agpilot import calculations, loadplan
+from agpilot.aircraft import database
+
+DEFAULT_PORT = 8502
+DEFAULT_WORKERS = 32
+MAX_BATCH = 10_000
+MAX_BODY_BYTES = 16 * 1024 * 1024
+# Idle keep-alive connections are dropped after this long so they do not pin a worker.
+IDLE_TIMEOUT_S = 15
+
+BATCH_ENDPOINTS = {
+    "/v1/performance": calculations.performance_batch,
+    "/v1/weight-balance": calculations.weight_balance_batch,
+    "/v1/max-hopper": calculations.max_hopper_batch,
+}
+SAMPLE_REQUESTS = {
+    "/v1/performance": {"aircraft": "Air Tractor AT-802", "pressure_alt_ft": 1800, "oat_c": 28, "weight_lbs": 14500,
+                        "wind_kts": 5, "runway_condition": "Dry Grass / Firm Turf"},
+    "/v1/weight-balance": {"aircraft": "Robinson R44 Raven II", "fuel_gal": 30, "hopper_gal": 60, "pilot_weight_lbs": 180},
+    "/v1/max-hopper": {"aircraft": "Air Tractor AT-802", "pressure_alt_ft": 1800, "oat_c": 28, "field_length_ft": 3200,
+                       "fuel_gal": 200, "pilot_weight_lbs": 200, "min_climb_fpm": 200},
+}
+
+
+def _finite(value):
+    """``value`` with every NaN or infinite float replaced by None (JSON has no such numbers)."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "AgPilotAPI/1"
+    timeout = IDLE_TIMEOUT_S
+    # Headers and body go out in separate writes; without TCP_NODELAY the second waits on a delayed ACK.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/v1/aircraft":
+            aircraft_db = database()
+            self._send_json(200, {"aircraft": [
+                {"name": name, "category": record["category"], "description": record["description"]}
+                for name, record in aircraft_db.items()]})
+        else:
+            self._send_json(404, {"error": f"no such endpoint: {path}"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        body = self._read_body()
+        if body is None:
+            return
+        try:
+            if url.path == "/v1/loadplan":
+                min_climb = float(parse_qs(url.query).get("min_climb_fpm", ["0"])[0])
+                table = loadplan.evaluate_sorties(loadplan.read_sorties(body), database(), min_climb)
+                self._send(200, loadplan.to_csv(table).encode(), "text/csv; charset=utf-8")
+                return
+            batch = url.path.endswith("/batch")
+            function = BATCH_ENDPOINTS.get(url.path.removesuffix("/batch"))
+            if function is None:
+                self._send_json(404, {"error": f"no such endpoint: {url.path}"})
+                return
+            payload = json.loads(body)
+            if batch:
+                requests = payload.get("requests") if isinstance(payload, dict) else None
+                if not isinstance(requests, list) or not all(isinstance(request, dict) for request in requests):
+                    raise ValueError('batch body must be {"requests": [object, ...]}')
+                if len(requests) > MAX_BATCH:
+                    raise ValueError(f"batch too large ({len(requests)} > {MAX_BATCH})")
+                self._send_json(200, {"results": function(requests) if requests else []})
+            else:
+                if not isinstance(payload, dict):
+                    raise ValueError("request body must be a JSON object")
+                self._send_json(200, function([payload])[0])
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": str(e)})
+
+    def _read_body(self):
+        length = self.headers.get("Content-Length")
+        if length is None:
+            self._send_json(411, {"error": "Content-Length required"})
+            return None
+        try:
+            length = int(length)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            # The body's extent is unknown, so the connection cannot be reused.
+            self._send_json(400, {"error": f"invalid Content-Length: {length!r}"})
+            self.close_connection = True
+            return None
+        if length > MAX_BODY_BYTES:
+            self._send_json(413, {"error": "request body too large"})
+            self.close_connection = True
+            return None
+        return self.rfile.read(length)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(_finite(payload), allow_nan=False).encode(), "application/json")
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Per-request access logging would dominate the cost of a calculation.
+        pass
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that hands each accepted connection to a fixed-size thread pool."""
+
+    allow_reuse_address = True
+
+    def __init__(self, address, handler=APIHandler, workers=DEFAULT_WORKERS, reuse_port=False):
+        self.reuse_port = reuse_port
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agpilot-api")
+        super().__init__(address, handler)
+
+    def server_bind(self):
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _run(host, port, workers, reuse_port):
+    server = PooledHTTPServer((host, port), workers=workers, reuse_port=reuse_port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def serve(host="127.0.0.1", port=DEFAULT_PORT, workers=DEFAULT_WORKERS, processes=1):
+    database()  # load the type database before forking so children share it
+    print(f"AgPilot API on http://{host}:{port} ({processes} process(es) × {workers} workers)")
+    if processes <= 1:
+        _run(host, port, workers, reuse_port=False)
+        return
+    children = []
+    for _ in range(processes):
+        pid = os.fork()
+        if pid == 0:
+            _run(host, port, workers, reuse_port=True)
+            os._exit(0)
+        children.append(pid)
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+
+# ────────────────────────────────────────────────
+# Load generator
+# ────────────────────────────────────────────────
+def _connection_worker(host, port, path, body, n_requests):
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"Content-Type": "application/json"}
+    latencies = np.empty(n_requests)
+    for i in range(n_requests):
+        start = time.perf_counter()
+        connection.request("POST", path, body, headers)
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status} from {path}")
+        latencies[i] = time.perf_counter() - start
+    connection.close()
+    return latencies
+
+
+def _process_worker(host, port, path, body, connections, n_requests):
+    counts = [n_requests // connections + (i < n_requests % connections) for i in range(connections)]
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        return np.concatenate(list(pool.map(lambda n: _connection_worker(host, port, path, body, n), counts)))
+
+
+def bench(url, endpoint="/v1/performance", connections=16, requests=10_000, batch=0, processes=1):
+    """Drive ``endpoint`` over keep-alive connections and print throughput and latency percentiles."""
+    parsed = urlsplit(url)
+    request = SAMPLE_REQUESTS[endpoint]
+    path = endpoint + "/batch" if batch else endpoint
+    body = json.dumps({"requests": [request] * batch} if batch else request).encode()
+    per_process = [requests // processes + (i < requests % processes) for i in range(processes)]
+    start = time.perf_counter()
+    if processes == 1:
+        latencies = _process_worker(parsed.hostname, parsed.port, path, body, connections, requests)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            latencies = np.concatenate(list(pool.map(
+                _process_worker, *zip(*[(parsed.hostname, parsed.port, path, body, connections, n) for n in per_process]))))
+    elapsed = time.perf_counter() - start
+    p50, p99 = np.percentile(latencies, (50, 99)) * 1e3
+    print(f"{path}: {requests} requests ({requests * max(batch, 1)} calculations) in {elapsed:.2f} s "
+          f"over {connections * processes} connections → {requests / elapsed:,.0f} req/s, "
+          f"{requests * max(batch, 1) / elapsed:,.0f} calc/s, p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AgPilot calculation API server and load generator.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="run the API server")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="worker threads per process")
+    serve_parser.add_argument("--processes", type=int, default=1, help="server processes sharing the port")
+    bench_parser = commands.add_parser("bench", help="load-test a running server")
+    bench_parser.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}")
+    bench_parser.add_argument("--endpoint", default="/v1/performance", choices=sorted(SAMPLE_REQUESTS))
+    bench_parser.add_argument("--connections", type=int, default=16, help="keep-alive connections per process")
+    bench_parser.add_argument("--requests", type=int, default=10_000)
+    bench_parser.add_argument("--batch", type=int, default=0, help="items per request (0 = single endpoint)")
+    bench_parser.add_argument("--processes", type=int, default=1, help="load generator processes")
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        serve(args.host, args.port, args.workers, args.processes)
+    else:
+        bench(args.url, args.endpoint, args.connections, args.requests, args.batch, args.processes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""Bundled image assets, downscaled once and cached on disk.
+
+PIL is only imported when a cached copy is missing or older than its source,
+so a normal start never loads it.
+"""
+
+import os
+
+
+def downscaled(path, max_px, cache_dir):
+    """Path of a PNG copy of ``path`` whose longer side is at most ``max_px``."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    cached = os.path.join(cache_dir, f"{stem}-{max_px}.png")
+    if os.path.exists(cached) and os.path.getmtime(cached) >= os.path.getmtime(path):
+        return cached
+    from PIL import Image
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with Image.open(path) as image:
+        image.thumbnail((max_px, max_px), Image.LANCZOS)
+        tmp = f"{cached}.{os.getpid()}.tmp"
+        image.save(tmp, format="PNG", optimize=True)
+    os.replace(tmp, cached)
+    return cached
@@ -0,0 +1,263 @@
+"""Per-request calculations by aircraft type name, shared by the app and the HTTP API.
+
+The compute_* functions answer one question for one loading and return plain
+Python values, memoized on inputs rounded to CACHE_STEPS (see agpilot.memo).
+The *_batch functions take a list of request dicts, evaluate them all in one
+vectorized pass over agpilot.performance and return one result dict per
+request; job_comparison ranks every type and saved tail for one job the same way.
+"""
+
+import math
+
+import numpy as np
+
+from agpilot import hover, memo, metar, montecarlo, performance, solver, weight_balance, wind
+from agpilot.aircraft import AIRCRAFT_DATA, database
+
+# compute_* inputs are rounded to these steps before evaluation and caching, always in the
+# conservative direction: higher, hotter and heavier; less headwind and a lower glide start.
+CACHE_STEPS = {"pressure_alt_ft": (10, math.ceil), "oat_c": (1, math.ceil), "weight_lbs": (10, math.ceil),
+               "wind_kts": (1, math.floor), "height_ft": (10, math.floor)}
+CACHE_MAX_ENTRIES = 1024
+
+
+def calculate_density_altitude(pressure_alt_ft, oat_c):
+    return int(performance.density_altitude(pressure_alt_ft, oat_c))
+
+
+@memo.memoize(CACHE_MAX_ENTRIES, CACHE_STEPS)
+def compute_takeoff(pressure_alt_ft, oat_c, weight_lbs, wind_kts, runway_condition, aircraft):
+    ground_roll, to_50ft = performance.takeoff(AIRCRAFT_DATA[aircraft], pressure_alt_ft, oat_c, weight_lbs, wind_kts, runway_condition)
+    return float(ground_roll), float(to_50ft)
+
+
+@memo.memoize(CACHE_MAX_ENTRIES, CACHE_STEPS)
+def compute_landing(pressure_alt_ft, oat_c, weight_lbs, wind_kts, runway_condition, aircraft):
+    ground_roll, from_50ft = performance.landing(AIRCRAFT_DATA[aircraft], pressure_alt_ft, oat_c, weight_lbs, wind_kts, runway_condition)
+    return float(ground_roll), float(from_50ft)
+
+
+@memo.memoize(CACHE_MAX_ENTRIES, CACHE_STEPS)
+def compute_climb_rate(pressure_alt_ft, oat_c, weight_lbs, aircraft):
+    return float(performance.climb_rate(AIRCRAFT_DATA[aircraft], pressure_alt_ft, oat_c, weight_lbs))
+
+
+@memo.memoize(CACHE_MAX_ENTRIES, CACHE_STEPS)
+def compute_stall_speed(weight_lbs, aircraft):
+    return float(performance.stall_speed(AIRCRAFT_DATA[aircraft], weight_lbs))
+
+
+@memo.memoize(CACHE_MAX_ENTRIES, CACHE_STEPS)
+def compute_glide_distance(height_ft, wind_kts, aircraft):
+    data = AIRCRAFT_DATA[aircraft]
+    return float(performance.glide_distance(data, height_ft, wind_kts, performance.is_helicopter(data)))
+
+
+@memo.memoize(CACHE_MAX_ENTRIES, CACHE_STEPS)
+def compute_weight_balance(fuel_gal, hopper_gal, pilot_weight_lbs, empty_weight_lbs, aircraft, empty_arm_in=None):
+    """Total weight, a status line and the CG trajectory (see agpilot.weight_balance.trajectory)."""
+    data = AIRCRAFT_DATA[aircraft]
+    total_weight, takeoff_ok, landing_ok = performance.weight_balance(data, fuel_gal, hopper_gal, pilot_weight_lbs, empty_weight_lbs)
+    cg = weight_balance.trajectory(data, fuel_gal, hopper_gal, pilot_weight_lbs,
+                                   empty_weight_lbs=empty_weight_lbs, empty_arm_in=empty_arm_in)
+    status = "Within limits" if takeoff_ok else "Overweight!"
+    if not landing_ok:
+        status += " (Exceeds max landing weight)"
+    if cg["cg_ok"]:
+        status += f" – CG {cg['cg_in'][0]:.1f} in, inside envelope for the whole sortie"
+    else:
+        status += " – CG leaves the envelope during the sortie"
+    return float(total_weight), status, cg
+
+
+@memo.memoize(CACHE_MAX_ENTRIES, CACHE_STEPS)
+def compute_hover_margins(pressure_alt_ft, oat_c, weight_lbs, aircraft):
+    """IGE and OGE hover margins above the field in feet (see agpilot.hover.hover_margins)."""
+    ige_margin, oge_margin = hover.hover_margins(AIRCRAFT_DATA[aircraft], pressure_alt_ft, oat_c, weight_lbs)
+    return float(ige_margin), float(oge_margin)
+
+
+def compute_takeoff_uncertainty(pressure_alt_ft, oat_c, wind_kts, runway_condition, fuel_gal, hopper_gal, pilot_weight_lbs,
+                                empty_weight_lbs, aircraft, field_length_ft=None, min_climb_fpm=0, gust_kts=None,
+                                uncertainty=None, n=montecarlo.DEFAULT_SAMPLES, seed=0):
+    """Monte Carlo takeoff and climb percentiles (see agpilot.montecarlo.takeoff_climb_distribution)."""
+    return montecarlo.takeoff_climb_distribution(
+        AIRCRAFT_DATA[aircraft], pressure_alt_ft, oat_c, wind_kts, runway_condition, fuel_gal, hopper_gal,
+        pilot_weight_lbs, empty_weight_lbs, field_length_ft, min_climb_fpm, gust_kts, uncertainty, n, seed)
+
+
+def compute_runway_winds(strip_ids, wind_dir_deg, wind_speed_kt, gust_kt, var_from_deg, var_to_deg, oat_c, altimeter_inhg,
+                         weight_lbs, runway_condition, aircraft, max_crosswind_kt=wind.DEFAULT_MAX_CROSSWIND_KT,
+                         to_50ft=True):
+    """Wind components and distances on every runway end of ``strip_ids`` (see agpilot.wind.evaluate).
+
+    Weather arguments are scalars (one observation for all strips) or lists with
+    one entry per strip; None (or NaN) marks a missing direction/gust/range.
+    Returns one dict per strip with its best usable end (``runway`` None when
+    there is none) and an ``ends`` list.
+    """
+    def weather(value):
+        return np.array([np.nan if v is None else v for v in value] if isinstance(value, (list, tuple)) else
+                        (np.nan if value is None else value), dtype=float)
+
+    table = wind.runways(tuple(strip_ids))
+    per_strip = isinstance(wind_speed_kt, (list, tuple))
+    result = wind.evaluate(AIRCRAFT_DATA[aircraft], table, weather(wind_dir_deg), weather(wind_speed_kt), weather(gust_kt),
+                           weather(var_from_deg), weather(var_to_deg), weather(oat_c), weather(altimeter_inhg), weight_lbs,
+                           runway_condition, max_crosswind_kt, to_50ft, per_strip)
+    rows = []
+    for i, (strip_id, (runway, headwind, crosswind, margin)) in enumerate(zip(table["ids"], wind.best_runway(result, table))):
+        ends = [{"runway": str(table["ident"][i, j]), **{key: float(result[key][i, j]) for key in wind.OUTPUTS},
+                 "margin_ft": float(result["margin_ft"][i, j]), "usable": bool(result["usable"][i, j])}
+                for j in np.flatnonzero(table["valid"][i])]
+        rows.append({"strip": strip_id, "runway": runway, "headwind_kt": headwind, "crosswind_kt": crosswind,
+                     "margin_ft": margin, "ends": ends})
+    return rows
+
+
+# ────────────────────────────────────────────────
+# Batch evaluation (one vectorized pass per request list)
+# ────────────────────────────────────────────────
+# Request fields and their defaults; None marks a required field.
+PERFORMANCE_FIELDS = {
+    "aircraft": None, "pressure_alt_ft": None, "oat_c": None, "weight_lbs": None,
+    "wind_kts": 0.0, "runway_condition": performance.RUNWAY_CONDITION_NAMES[0], "glide_height_ft": 1000.0,
+}
+WEIGHT_BALANCE_FIELDS = {
+    "aircraft": None, "fuel_gal": None, "hopper_gal": None, "pilot_weight_lbs": None,
+    "empty_weight_lbs": np.nan, "empty_arm_in": np.nan, "fuel_burn_gal": np.nan,
+}
+MAX_HOPPER_FIELDS = {
+    "aircraft": None, "pressure_alt_ft": None, "oat_c": None, "field_length_ft": None, "fuel_gal": None,
+    "pilot_weight_lbs": None, "wind_kts": 0.0, "runway_condition": performance.RUNWAY_CONDITION_NAMES[0],
+    "empty_weight_lbs": np.nan, "min_climb_fpm": 0.0, "to_50ft": True,
+}
+_TEXT_FIELDS = ("aircraft", "runway_condition")
+
+
+def _columns(requests, fields):
+    """Turn a list of request dicts into column arrays, filling defaults and rejecting missing fields."""
+    columns = {}
+    for name, default in fields.items():
+        values = [default if request.get(name) is None else request[name] for request in requests]
+        if default is None and any(value is None for value in values):
+            row = next(i for i, value in enumerate(values) if value is None)
+            raise ValueError(f"request {row}: missing field '{name}'")
+        columns[name] = np.array(values, dtype=str if name in _TEXT_FIELDS else None)
+    unknown = sorted(set(columns["aircraft"].tolist()) - set(database()))
+    if unknown:
+        raise ValueError(f"Unknown aircraft type(s): {', '.join(unknown)}")
+    if "runway_condition" in columns:
+        unknown = sorted(set(columns["runway_condition"].tolist()) - set(performance.RUNWAY_CONDITION_NAMES))
+        if unknown:
+            raise ValueError(f"Unknown runway condition(s): {', '.join(unknown)}")
+    return columns
+
+
+def _rows(columns, results):
+    names = list(results)
+    shape = columns["aircraft"].shape
+    values = [np.broadcast_to(value, shape).tolist() if np.shape(value) != shape else value.tolist()
+              for value in results.values()]
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def performance_batch(requests):
+    """Density altitude, takeoff, landing, climb, stall, glide and hover for each request."""
+    columns = _columns(requests, PERFORMANCE_FIELDS)
+    data = database().rows(columns["aircraft"])
+    helicopter = performance.is_helicopter(data)
+    results = performance.evaluate(
+        data, columns["pressure_alt_ft"], columns["oat_c"], columns["weight_lbs"], columns["wind_kts"],
+        columns["runway_condition"], glide_height_ft=columns["glide_height_ft"], helicopter=helicopter)
+    ige_margin, oge_margin = hover.hover_margins(data, columns["pressure_alt_ft"], columns["oat_c"], columns["weight_lbs"])
+    # Hover is reported as margin above the field from the hover charts, not the formula ceilings.
+    del results["hover_ceiling_ige_ft"], results["hover_ceiling_oge_ft"]
+    results["hover_margin_ige_ft"] = np.where(helicopter, ige_margin, 0.0)
+    results["hover_margin_oge_ft"] = np.where(helicopter, oge_margin, 0.0)
+    return _rows(columns, results)
+
+
+def weight_balance_batch(requests):
+    """Total weight, takeoff CG and weight/CG limit checks for each request."""
+    columns = _columns(requests, WEIGHT_BALANCE_FIELDS)
+    aircraft_db = database()
+    data = aircraft_db.rows(columns["aircraft"])
+    empty_weight = np.where(np.isnan(columns["empty_weight_lbs"]), data["base_empty_weight_lbs"], columns["empty_weight_lbs"])
+    total_weight, weight_ok, landing_weight_ok = performance.weight_balance(
+        data, columns["fuel_gal"], columns["hopper_gal"], columns["pilot_weight_lbs"], empty_weight)
+    cg = weight_balance.trajectory(
+        data, columns["fuel_gal"], columns["hopper_gal"], columns["pilot_weight_lbs"],
+        fuel_burn_gal=np.where(np.isnan(columns["fuel_burn_gal"]), columns["fuel_gal"], columns["fuel_burn_gal"]),
+        empty_weight_lbs=empty_weight,
+        empty_arm_in=np.where(np.isnan(columns["empty_arm_in"]), data["empty_arm_in"], columns["empty_arm_in"]),
+        envelope=weight_balance.envelope_polygons(aircraft_db, columns["aircraft"]), steps=1)
+    return _rows(columns, {
+        "total_weight_lbs": total_weight,
+        "takeoff_cg_in": cg["cg_in"][..., 0],
+        "weight_ok": weight_ok,
+        "landing_weight_ok": landing_weight_ok,
+        "cg_ok": cg["cg_ok"],
+    })
+
+
+def max_hopper_batch(requests):
+    """Maximum hopper load, resulting gross weight and binding limit for each request."""
+    columns = _columns(requests, MAX_HOPPER_FIELDS)
+    data = database().rows(columns["aircraft"])
+    empty_weight = np.where(np.isnan(columns["empty_weight_lbs"]), data["base_empty_weight_lbs"], columns["empty_weight_lbs"])
+    return _rows(columns, solver.max_hopper_load(
+        data, columns["pressure_alt_ft"], columns["oat_c"], columns["wind_kts"], columns["runway_condition"],
+        columns["field_length_ft"], columns["fuel_gal"], columns["pilot_weight_lbs"], empty_weight,
+        columns["min_climb_fpm"], columns["to_50ft"]))
+
+
+def job_comparison(gallons, field_length_ft, elevation_ft, oat_c, pilot_weight_lbs, fleet_entries=(), fuel_gal=None,
+                   wind_kts=0.0, runway_condition=performance.RUNWAY_CONDITION_NAMES[0],
+                   altimeter_inhg=wind.STANDARD_ALTIMETER_INHG, min_climb_fpm=0.0, to_50ft=True):
+    """Rank every aircraft type and saved fleet tail for one job, best first.
+
+    All candidates — each type at its base empty weight plus each entry of
+    ``fleet_entries`` (fleet.FleetEntry) at its own — are evaluated in one
+    vectorized pass: the max hopper load per sortie (solver.max_hopper_load),
+    the loads needed for ``gallons``, and at that loaded weight the takeoff
+    margin (field length minus takeoff distance; None for helicopters), climb
+    rate and OGE hover margin (None for fixed-wing types). ``fuel_gal`` None
+    means full tanks; otherwise it is clipped to each type's capacity.
+    Candidates that cannot lift a load get ``loads`` None and rank last; ties
+    on loads go to the bigger hopper load.
+    """
+    fleet_entries = [entry for entry in fleet_entries if entry.aircraft in database()]
+    types = list(database())
+    names = np.array(types + [entry.aircraft for entry in fleet_entries], dtype=str)
+    labels = types + [entry.nickname for entry in fleet_entries]
+    data = database().rows(names)
+    empty_weight = np.array([np.nan] * len(types) + [np.nan if entry.empty_weight_lbs is None else entry.empty_weight_lbs
+                                                     for entry in fleet_entries], dtype=float)
+    empty_weight = np.where(np.isnan(empty_weight), data["base_empty_weight_lbs"], empty_weight)
+    fuel = data["base_fuel_capacity_gal"] if fuel_gal is None else np.minimum(fuel_gal, data["base_fuel_capacity_gal"])
+    pressure_alt = metar.pressure_altitude(elevation_ft, altimeter_inhg)
+
+    helicopter = performance.is_helicopter(data)
+    load = solver.max_hopper_load(data, pressure_alt, oat_c, wind_kts, runway_condition, field_length_ft, fuel,
+                                  pilot_weight_lbs, empty_weight, min_climb_fpm, to_50ft)
+    lifts = load["feasible"] & (load["hopper_gal"] >= 1)
+    loads = np.where(lifts, np.ceil(gallons / np.where(lifts, load["hopper_gal"], 1)), np.inf)
+    ground_roll, to_50 = performance.takeoff(data, pressure_alt, oat_c, load["weight_lbs"], wind_kts, runway_condition)
+    takeoff_margin = field_length_ft - (to_50 if to_50ft else ground_roll)
+    climb = performance.climb_rate(data, pressure_alt, oat_c, load["weight_lbs"])
+    _, oge_margin = hover.hover_margins(data, pressure_alt, oat_c, load["weight_lbs"])
+
+    order = np.lexsort((-load["hopper_gal"], loads))
+    return [{
+        "name": labels[i],
+        "aircraft": str(names[i]),
+        "fleet": bool(i >= len(types)),
+        "loads": int(loads[i]) if lifts[i] else None,
+        "hopper_gal": float(load["hopper_gal"][i]),
+        "weight_lbs": float(load["weight_lbs"][i]),
+        "limit": str(load["limit"][i]),
+        "takeoff_margin_ft": None if helicopter[i] else float(takeoff_margin[i]),
+        "climb_rate_fpm": float(climb[i]),
+        "hover_margin_ft": float(oge_margin[i]) if helicopter[i] else None,
+    } for i in order]
@@ -0,0 +1,280 @@
+"""Chart builders for the app: vectorized curves, LRU-cached, rendered client-side.
+
+Charts are returned as Vega-Lite specs (plain dicts for st.vega_lite_chart), so
+the server ships the curve data and the browser draws it; nothing here imports
+a plotting library. Overlays for several OATs and weights are evaluated in one
+broadcast call and sent as long-form columns (Streamlit ships them to the
+browser as one Arrow table), so extra curves add data, not charts or round trips.
+climb_chart_png is the rasterized fallback; it draws on a standalone Figure
+that is never registered with pyplot and is cleared once saved.
+
+Cached results are shared between sessions and must not be mutated.
+"""
+
+import io
+from functools import lru_cache
+
+import numpy as np
+
+from agpilot import hover, performance
+from agpilot.aircraft import database
+
+CLIMB_ALTITUDES_FT = np.linspace(0, 12000, 61)
+CHART_CACHE_SIZE = 256
+LINE_COLOR = "darkgreen"
+
+
+def climb_curves(data, oats_c, weights_lbs, altitudes_ft=CLIMB_ALTITUDES_FT):
+    """Climb rate (fpm) for every OAT × weight pair, shape (len(oats_c), len(weights_lbs), len(altitudes_ft))."""
+    oats_c = np.asarray(oats_c, dtype=float)[:, None, None]
+    weights_lbs = np.asarray(weights_lbs, dtype=float)[None, :, None]
+    return performance.climb_rate(data, np.asarray(altitudes_ft, dtype=float), oats_c, weights_lbs)
+
+
+def _series(aircraft, oats_c, weights_lbs):
+    curves = climb_curves(database()[aircraft], oats_c, weights_lbs)
+    labels = [f"OAT {oat:g} °C, {weight:g} lbs" for oat in oats_c for weight in weights_lbs]
+    return labels, curves.reshape(len(labels), -1)
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def climb_chart(aircraft, oats_c, weights_lbs):
+    """Vega-Lite spec of rate of climb vs pressure altitude; ``oats_c`` and ``weights_lbs`` are tuples."""
+    labels, curves = _series(aircraft, oats_c, weights_lbs)
+    values = {
+        "series": np.repeat(labels, len(CLIMB_ALTITUDES_FT)),
+        "pressure_alt_ft": np.tile(CLIMB_ALTITUDES_FT.round(), len(labels)),
+        "climb_fpm": curves.ravel().round(1),
+    }
+    if len(labels) == 1:
+        title = f"Climb Performance – {aircraft} – {labels[0]}"
+        color = {"value": LINE_COLOR}
+    else:
+        title = f"Climb Performance – {aircraft}"
+        color = {"field": "series", "type": "nominal", "title": None, "sort": labels, "legend": {"orient": "bottom"}}
+    return {
+        "title": title,
+        "height": 380,
+        "data": {"values": values},
+        "mark": {"type": "line", "strokeWidth": 2.2},
+        "encoding": {
+            "x": {"field": "pressure_alt_ft", "type": "quantitative", "title": "Pressure Altitude (ft)"},
+            "y": {"field": "climb_fpm", "type": "quantitative", "title": "Rate of Climb (fpm)"},
+            "color": color,
+            "tooltip": [
+                {"field": "series", "type": "nominal", "title": "Curve"},
+                {"field": "pressure_alt_ft", "type": "quantitative", "title": "PA (ft)"},
+                {"field": "climb_fpm", "type": "quantitative", "title": "Climb (fpm)", "format": ".0f"},
+            ],
+        },
+    }
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def climb_chart_png(aircraft, oats_c, weights_lbs):
+    """The same chart rasterized by matplotlib, as PNG bytes."""
+    from matplotlib.figure import Figure
+
+    labels, curves = _series(aircraft, oats_c, weights_lbs)
+    fig = Figure(figsize=(10, 5.5))
+    try:
+        ax = fig.subplots()
+        for label, curve in zip(labels, curves):
+            ax.plot(CLIMB_ALTITUDES_FT, curve, linewidth=2.2, label=label,
+                    color=LINE_COLOR if len(labels) == 1 else None)
+        ax.set_xlabel("Pressure Altitude (ft)")
+        ax.set_ylabel("Rate of Climb (fpm)")
+        ax.set_title(f"Climb Performance – {aircraft}" + (f" – {labels[0]}" if len(labels) == 1 else ""))
+        ax.grid(True, linestyle='--', alpha=0.7)
+        if len(labels) > 1:
+            ax.legend()
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=100)
+    finally:
+        fig.clf()
+    return buffer.getvalue()
+
+
+# ────────────────────────────────────────────────
+# PA × OAT envelope heatmaps
+# ────────────────────────────────────────────────
+ENVELOPE_GRID = 200
+ENVELOPE_PA_FT = (0, 12000)
+ENVELOPE_OAT_C = (-20, 45)
+# Hover margins are signed; the limit contour is where the margin reaches zero.
+HOVER_LIMIT_FT = 0.0
+# (grid key, title, colour scheme, higher-is-better)
+_ENVELOPE_PANELS = {
+    "takeoff_ft": ("Takeoff distance (ft)", "yelloworangered", False),
+    "climb_rate_fpm": ("Rate of climb (fpm)", "yellowgreen", True),
+    "hover_margin_ige_ft": ("IGE hover margin (ft)", "blues", True),
+    "hover_margin_oge_ft": ("OGE hover margin (ft)", "blues", True),
+}
+
+
+def envelope_grid(data, weight_lbs, wind_kts=0, runway_condition=performance.RUNWAY_CONDITION_NAMES[0], to_50ft=True,
+                  n=ENVELOPE_GRID, pa_range=ENVELOPE_PA_FT, oat_range=ENVELOPE_OAT_C):
+    """Takeoff distance, climb rate and hover margins on an n × n grid (rows = pressure altitude, columns = OAT)."""
+    pressure_alt_ft = np.linspace(*pa_range, n)
+    oat_c = np.linspace(*oat_range, n)
+    pa_column, oat_row = pressure_alt_ft[:, None], oat_c[None, :]
+    ground_roll, over_50ft = performance.takeoff(data, pa_column, oat_row, weight_lbs, wind_kts, runway_condition)
+    ige_margin, oge_margin = hover.hover_margins(data, pa_column, oat_row, weight_lbs)
+    return {
+        "pressure_alt_ft": pressure_alt_ft,
+        "oat_c": oat_c,
+        "takeoff_ft": over_50ft if to_50ft else ground_roll,
+        "climb_rate_fpm": performance.climb_rate(data, pa_column, oat_row, weight_lbs),
+        "hover_margin_ige_ft": ige_margin,
+        "hover_margin_oge_ft": oge_margin,
+    }
+
+
+def contour(pressure_alt_ft, values, level):
+    """Pressure altitude at which each OAT column of ``values`` first crosses ``level`` (NaN where it does not)."""
+    above = values >= level
+    crossing = above[1:] != above[:-1]
+    row = crossing.argmax(axis=0)
+    column = np.arange(values.shape[1])
+    low, high = values[row, column], values[row + 1, column]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.clip((level - low) / (high - low), 0, 1)
+    crossing_pa = pressure_alt_ft[row] + fraction * (pressure_alt_ft[row + 1] - pressure_alt_ft[row])
+    return np.where(crossing.any(axis=0), crossing_pa, np.nan)
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def envelope_heatmaps(aircraft, weight_lbs, wind_kts, runway_condition, to_50ft, field_length_ft, min_climb_fpm,
+                      current=None, n=ENVELOPE_GRID):
+    """Vega-Lite spec of takeoff, climb and (helicopters) hover heatmaps over PA × OAT.
+
+    Contour lines mark ``field_length_ft`` on the takeoff panel, ``min_climb_fpm``
+    on the climb panel and a zero hover margin on the hover panels; ``current``
+    is an optional (oat_c, pressure_alt_ft) point drawn on every panel.
+    """
+    data = database()[aircraft]
+    grid = envelope_grid(data, weight_lbs, wind_kts, runway_condition, to_50ft, n)
+    helicopter = bool(performance.is_helicopter(data))
+    panels = ["climb_rate_fpm", "hover_margin_ige_ft", "hover_margin_oge_ft"] if helicopter else ["takeoff_ft", "climb_rate_fpm"]
+    levels = {"takeoff_ft": field_length_ft, "climb_rate_fpm": min_climb_fpm,
+              "hover_margin_ige_ft": HOVER_LIMIT_FT, "hover_margin_oge_ft": HOVER_LIMIT_FT}
+    pa_step = float(grid["pressure_alt_ft"][1] - grid["pressure_alt_ft"][0])
+    oat_step = float(grid["oat_c"][1] - grid["oat_c"][0])
+    table = {
+        "pressure_alt_ft": np.repeat(grid["pressure_alt_ft"] - pa_step / 2, n).astype(np.float32),
+        "oat_c": np.tile(grid["oat_c"] - oat_step / 2, n).astype(np.float32),
+        **{key: grid[key].ravel().astype(np.float32) for key in panels},
+    }
+    charts = []
+    for key in panels:
+        title, scheme, higher_is_better = _ENVELOPE_PANELS[key]
+        line_pa = contour(grid["pressure_alt_ft"], grid[key], levels[key])
+        line = [{"oat_c": oat, "pressure_alt_ft": pa} for oat, pa in zip(grid["oat_c"].tolist(), line_pa.round().tolist())
+                if pa == pa]
+        layers = [{
+            "mark": {"type": "rect"},
+            "encoding": {
+                "x": {"field": "oat_c", "type": "quantitative", "title": "OAT (°C)", "scale": {"domain": list(ENVELOPE_OAT_C), "nice": False}},
+                "x2": {"field": "oat_c_end"},
+                "y": {"field": "pressure_alt_ft", "type": "quantitative", "title": "Pressure altitude (ft)",
+                      "scale": {"domain": list(ENVELOPE_PA_FT), "nice": False}},
+                "y2": {"field": "pressure_alt_ft_end"},
+                "color": {"field": key, "type": "quantitative", "title": None,
+                          "scale": {"scheme": scheme, "reverse": not higher_is_better}},
+            },
+        }]
+        if line:
+            layers.append({"data": {"values": line}, "mark": {"type": "line", "color": "black", "strokeWidth": 2},
+                           "encoding": {"x": {"field": "oat_c", "type": "quantitative"},
+                                        "y": {"field": "pressure_alt_ft", "type": "quantitative"}}})
+        if current is not None:
+            layers.append({"data": {"values": [{"oat_c": current[0], "pressure_alt_ft": current[1]}]},
+                           "mark": {"type": "point", "shape": "cross", "size": 120, "color": "black", "filled": True},
+                           "encoding": {"x": {"field": "oat_c", "type": "quantitative"},
+                                        "y": {"field": "pressure_alt_ft", "type": "quantitative"}}})
+        contour_label = {"takeoff_ft": f"{field_length_ft:g} ft field", "climb_rate_fpm": f"{min_climb_fpm:g} fpm minimum"}
+        charts.append({"title": f"{title} – line at {contour_label.get(key, 'zero margin')}",
+                       "width": 300, "height": 260, "layer": layers})
+    return {
+        "title": f"{aircraft} at {weight_lbs:g} lbs",
+        "data": {"values": table},
+        "transform": [{"calculate": f"datum.pressure_alt_ft + {pa_step}", "as": "pressure_alt_ft_end"},
+                      {"calculate": f"datum.oat_c + {oat_step}", "as": "oat_c_end"}],
+        "concat": charts,
+        "columns": 2,
+        "resolve": {"scale": {"color": "independent"}},
+    }
+
+
+# ────────────────────────────────────────────────
+# Hover margin vs gross weight
+# ────────────────────────────────────────────────
+HOVER_WEIGHTS = 121
+
+
+@lru_cache(maxsize=CHART_CACHE_SIZE)
+def hover_margin_chart(aircraft, pressure_alt_ft, oat_c, weight_lbs, min_weight_lbs):
+    """Vega-Lite spec of IGE/OGE hover margin above the field across gross weight, with the current weight marked."""
+    data = database()[aircraft]
+    weights = np.linspace(min_weight_lbs, data["max_takeoff_weight_lbs"], HOVER_WEIGHTS)
+    ige_margin, oge_margin = hover.hover_margins(data, pressure_alt_ft, oat_c, weights)
+    values = {
+        "mode": np.repeat(["IGE", "OGE"], HOVER_WEIGHTS),
+        "weight_lbs": np.tile(weights.round(), 2),
+        "margin_ft": np.concatenate([ige_margin, oge_margin]).round(),
+    }
+    return {
+        "title": f"Hover Margin – {aircraft} – PA {pressure_alt_ft:.0f} ft, {oat_c:.0f} °C",
+        "height": 320,
+        "data": {"values": values},
+        "layer": [
+            {
+                "mark": {"type": "line", "strokeWidth": 2.2},
+                "encoding": {
+                    "x": {"field": "weight_lbs", "type": "quantitative", "title": "Gross Weight (lbs)",
+                          "scale": {"zero": False}},
+                    "y": {"field": "margin_ft", "type": "quantitative", "title": "Hover margin above field (ft)"},
+                    "color": {"field": "mode", "type": "nominal", "title": None, "legend": {"orient": "bottom"},
+                              "scale": {"range": ["steelblue", LINE_COLOR]}},
+                    "tooltip": [
+                        {"field": "mode", "type": "nominal"},
+                        {"field": "weight_lbs", "type": "quantitative", "title": "Weight (lbs)"},
+                        {"field": "margin_ft", "type": "quantitative", "title": "Margin (ft)"},
+                    ],
+                },
+            },
+            {
+                "data": {"values": [{"weight_lbs": weight_lbs}]},
+                "mark": {"type": "rule", "color": "red", "strokeDash": [4, 3]},
+                "encoding": {"x": {"field": "weight_lbs", "type": "quantitative"}},
+            },
+        ],
+    }
+
+
+# ────────────────────────────────────────────────
+# Spray-block route
+# ────────────────────────────────────────────────
+def spray_plan_chart(polygons, result, strip_lonlat):
+    """Vega-Lite map of a sprayplan.plan() result: field outline, passes coloured by load, strip and load breaks."""
+    outline = [{"lon": a[0], "lat": a[1], "lon2": b[0], "lat2": b[1]}
+               for polygon in polygons for ring in polygon for a, b in zip(ring.tolist(), np.roll(ring, -1, axis=0).tolist())]
+    passes = [{"lon": start[0], "lat": start[1], "lon2": end[0], "lat2": end[1], "load": int(load) + 1, "pass": i + 1}
+              for i, ((start, end), load) in enumerate(zip(result["passes"].tolist(), result["load"].tolist()))]
+    points = [{"lon": strip_lonlat[0], "lat": strip_lonlat[1], "label": "Loading strip"}]
+    points += [{"lon": lon, "lat": lat, "label": f"End of load {k + 1}"} for k, (lon, lat) in enumerate(result["breaks"].tolist())]
+    rule = {"longitude": {"field": "lon", "type": "quantitative"}, "latitude": {"field": "lat", "type": "quantitative"},
+            "longitude2": {"field": "lon2"}, "latitude2": {"field": "lat2"}}
+    return {
+        "height": 420,
+        "projection": {"type": "mercator"},
+        "layer": [
+            {"data": {"values": outline}, "mark": {"type": "rule", "color": "black", "strokeWidth": 1.5}, "encoding": rule},
+            {"data": {"values": passes}, "mark": {"type": "rule", "strokeWidth": 1},
+             "encoding": {**rule, "color": {"field": "load", "type": "ordinal", "title": "Load"},
+                          "tooltip": [{"field": "pass", "type": "quantitative"}, {"field": "load", "type": "ordinal"}]}},
+            {"data": {"values": points}, "mark": {"type": "point", "filled": True, "size": 90, "color": "red"},
+             "encoding": {"longitude": rule["longitude"], "latitude": rule["latitude"],
+                          "tooltip": [{"field": "label", "type": "nominal"}]}},
+        ],
+    }
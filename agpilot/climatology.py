@@ -0,0 +1,169 @@
+"""Density-altitude and performance climatology from archived METARs.
+
+Archive files are memory-mapped and read line by line, so their size is not
+limited by RAM. Two layouts are understood:
+
+* NOAA cycle files — a "YYYY/MM/DD HH:MM" line followed by the METAR line;
+* one observation per line with the timestamp in front, e.g. IEM ASOS CSV
+  ("KYKM,2024-07-01 05:53,KYKM 010553Z ...").
+
+Every decoded observation is run through the performance engine for each
+aircraft type, and the results are reduced to month × hour-of-day percentile
+tables saved as a compressed .npz that the app loads lazily.
+
+Usage:
+    python -m agpilot.climatology archive/*.txt --station KYKM --elevation 1099 \\
+        --field-length 2800 --runway-condition "Dry Grass / Firm Turf" \\
+        --utc-offset -7 --out data/climatology/KYKM.npz
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+from array import array
+
+import numpy as np
+
+from agpilot import performance, solver
+from agpilot.aircraft import AIRCRAFT_DATA
+from agpilot.metar import parse_metar
+
+PERCENTILES = (10, 50, 90)
+MONTHS, HOURS = 12, 24
+
+_TIMESTAMP = re.compile(rb"(\d{4})[-/](\d{2})[-/](\d{2})[ T](\d{2}):(\d{2})")
+_REPORT = re.compile(rb"(?:^|[,\s\"])((?:METAR |SPECI )?[A-Z][A-Z0-9]{3} \d{6}Z [^\"\r\n]*)")
+
+
+def iter_observations(path, station=None):
+    """Yield (month, raw METAR) pairs from one archive file without loading it whole."""
+    station = station.encode() if station else None
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            month = None
+            for line in iter(mm.readline, b""):
+                timestamp = _TIMESTAMP.search(line)
+                if timestamp:
+                    month = int(timestamp[2])
+                report = _REPORT.search(line)
+                if report is None or month is None:
+                    continue
+                if station and station not in report[1][:10]:
+                    continue
+                yield month, report[1].decode("ascii", "replace")
+
+
+def decode_archive(paths, field_elevation_ft, station=None, utc_offset_h=0, runway_heading_deg=None):
+    """Decode archive files into observation columns (month, local hour, PA, OAT, headwind)."""
+    columns = {name: array("d") for name in ("month", "hour", "pressure_alt_ft", "oat_c", "wind_kts")}
+    skipped = 0
+    for path in paths:
+        for month, text in iter_observations(path, station):
+            decoded = parse_metar(text)
+            if decoded.temp_c is None or decoded.altimeter_inhg is None or decoded.hour is None:
+                skipped += 1
+                continue
+            columns["month"].append(month)
+            columns["hour"].append((decoded.hour + utc_offset_h) % HOURS)
+            columns["pressure_alt_ft"].append(decoded.pressure_altitude_ft(field_elevation_ft))
+            columns["oat_c"].append(decoded.temp_c)
+            columns["wind_kts"].append(decoded.headwind_kt(runway_heading_deg) if runway_heading_deg is not None else 0.0)
+    observations = {name: np.frombuffer(values, dtype=float) for name, values in columns.items()}
+    return observations, skipped
+
+
+def _group_percentiles(values, key, n_groups, percentiles):
+    """Percentiles of ``values`` (…, N) per group id in ``key`` (N,) → (…, n_groups, P); NaN for empty groups."""
+    order = np.argsort(key, kind="stable")
+    values = values[..., order]
+    bounds = np.searchsorted(key[order], np.arange(n_groups + 1))
+    out = np.full(values.shape[:-1] + (n_groups, len(percentiles)), np.nan)
+    for group in range(n_groups):
+        lo, hi = bounds[group], bounds[group + 1]
+        if hi > lo:
+            out[..., group, :] = np.moveaxis(np.percentile(values[..., lo:hi], percentiles, axis=-1), 0, -1)
+    return out
+
+
+def build_climatology(observations, aircraft_db=AIRCRAFT_DATA, field_length_ft=3000,
+                      runway_condition=performance.RUNWAY_CONDITION_NAMES[0], fuel_fraction=1.0,
+                      pilot_weight_lbs=200, min_climb_fpm=0, percentiles=PERCENTILES):
+    """Reduce observation columns to month × hour percentile tables for every aircraft type."""
+    key = ((observations["month"] - 1) * HOURS + observations["hour"]).astype(np.intp)
+    n_groups = MONTHS * HOURS
+    counts = np.bincount(key, minlength=n_groups)
+    da_ft = performance.density_altitude(observations["pressure_alt_ft"], observations["oat_c"])
+
+    names = list(aircraft_db)
+    takeoff = np.empty((len(names), key.size))
+    max_hopper = np.empty((len(names), key.size))
+    full_hopper_fraction = np.empty((len(names), n_groups))
+    for i, name in enumerate(names):
+        data = aircraft_db[name]
+        fuel_gal = data["base_fuel_capacity_gal"] * fuel_fraction
+        full_weight, _, _ = performance.weight_balance(data, fuel_gal, data["hopper_capacity_gal"], pilot_weight_lbs)
+        _, takeoff[i] = performance.takeoff(
+            data, observations["pressure_alt_ft"], observations["oat_c"],
+            min(full_weight, data["max_takeoff_weight_lbs"]), observations["wind_kts"], runway_condition)
+        max_hopper[i] = solver.max_hopper_load(
+            data, observations["pressure_alt_ft"], observations["oat_c"], observations["wind_kts"], runway_condition,
+            field_length_ft, fuel_gal, pilot_weight_lbs, min_climb_fpm=min_climb_fpm)["hopper_gal"]
+        full = np.bincount(key, weights=max_hopper[i] >= data["hopper_capacity_gal"], minlength=n_groups)
+        with np.errstate(invalid="ignore"):
+            full_hopper_fraction[i] = full / counts
+
+    shape = (MONTHS, HOURS)
+    return {
+        "aircraft": np.array(names),
+        "percentiles": np.array(percentiles),
+        "count": counts.reshape(shape),
+        "density_altitude_ft": _group_percentiles(da_ft, key, n_groups, percentiles).reshape(shape + (-1,)),
+        "takeoff_to_50ft_ft": _group_percentiles(takeoff, key, n_groups, percentiles).reshape((len(names),) + shape + (-1,)),
+        "max_hopper_gal": _group_percentiles(max_hopper, key, n_groups, percentiles).reshape((len(names),) + shape + (-1,)),
+        "full_hopper_fraction": full_hopper_fraction.reshape((len(names),) + shape),
+    }
+
+
+def save(path, tables, **metadata):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.savez_compressed(path, metadata=np.array(json.dumps(metadata)), **tables)
+
+
+def load(path):
+    """Open a climatology file; arrays are read on first access."""
+    tables = np.load(path)
+    return tables, json.loads(str(tables["metadata"]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a month × hour performance climatology from archived METARs.")
+    parser.add_argument("archives", nargs="+", help="METAR archive text files")
+    parser.add_argument("--station", help="only use reports from this ICAO")
+    parser.add_argument("--elevation", type=float, required=True, help="field elevation (ft)")
+    parser.add_argument("--field-length", type=float, default=3000, help="available takeoff distance to 50 ft (ft)")
+    parser.add_argument("--runway-condition", default=performance.RUNWAY_CONDITION_NAMES[0],
+                        choices=performance.RUNWAY_CONDITION_NAMES)
+    parser.add_argument("--runway-heading", type=float, help="credit the METAR headwind along this heading")
+    parser.add_argument("--utc-offset", type=float, default=0, help="hours added to UTC for local hour-of-day")
+    parser.add_argument("--fuel-fraction", type=float, default=1.0, help="fuel load as a fraction of capacity")
+    parser.add_argument("--pilot-weight", type=float, default=200)
+    parser.add_argument("--min-climb", type=float, default=0, help="minimum acceptable climb rate (fpm)")
+    parser.add_argument("--out", required=True, help="output .npz path")
+    args = parser.parse_args(argv)
+
+    observations, skipped = decode_archive(args.archives, args.elevation, args.station, args.utc_offset, args.runway_heading)
+    tables = build_climatology(observations, field_length_ft=args.field_length, runway_condition=args.runway_condition,
+                               fuel_fraction=args.fuel_fraction, pilot_weight_lbs=args.pilot_weight,
+                               min_climb_fpm=args.min_climb)
+    save(args.out, tables, station=args.station, field_elevation_ft=args.elevation, field_length_ft=args.field_length,
+         runway_condition=args.runway_condition, utc_offset_h=args.utc_offset, fuel_fraction=args.fuel_fraction,
+         pilot_weight_lbs=args.pilot_weight, min_climb_fpm=args.min_climb, observations=int(observations["month"].size))
+    print(f"{observations['month'].size} observations decoded, {skipped} skipped → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
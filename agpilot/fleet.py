@@ -0,0 +1,99 @@
+"""Persistent fleet store: saved tail configurations shared by every session.
+
+Entries live in one SQLite file keyed by nickname (typically the tail number),
+with an index on aircraft type. FleetStore keeps the decoded entries in memory
+and re-reads them only when the database changes, which SQLite reports through
+``PRAGMA data_version`` — so a save by one pilot is visible to every other
+session (and process) on its next rerun without re-querying on every rerun.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+FLEET_DB_PATH = os.path.join("data", "fleet.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fleet (
+    nickname TEXT PRIMARY KEY,
+    aircraft TEXT NOT NULL,
+    empty_weight_lbs REAL,
+    empty_arm_in REAL,
+    notes TEXT NOT NULL DEFAULT '',
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS fleet_aircraft ON fleet (aircraft);
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class FleetEntry:
+    nickname: str
+    aircraft: str
+    empty_weight_lbs: float = None    # None = the type's base empty weight
+    empty_arm_in: float = None        # None = the type's base empty-weight arm
+    notes: str = ""
+    updated_at: float = 0.0
+
+
+class FleetStore:
+    def __init__(self, path=FLEET_DB_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._entries = None
+        self._version = None
+
+    def entries(self):
+        """All entries as {nickname: FleetEntry}, sorted by nickname."""
+        with self._lock:
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._entries is None or version != self._version:
+                rows = self._conn.execute(
+                    "SELECT nickname, aircraft, empty_weight_lbs, empty_arm_in, notes, updated_at"
+                    " FROM fleet ORDER BY nickname").fetchall()
+                self._entries = {row[0]: FleetEntry(*row) for row in rows}
+                self._version = version
+            return self._entries
+
+    def get(self, nickname):
+        return self.entries().get(nickname)
+
+    def by_aircraft(self, aircraft):
+        with self._lock:
+            rows = self._conn.execute("SELECT nickname FROM fleet WHERE aircraft = ? ORDER BY nickname", (aircraft,)).fetchall()
+        entries = self.entries()
+        return [entries[nickname] for nickname, in rows if nickname in entries]
+
+    def save(self, nickname, aircraft, empty_weight_lbs=None, empty_arm_in=None, notes=""):
+        """Insert or replace the entry for ``nickname``; returns the stored FleetEntry."""
+        nickname = nickname.strip()
+        if not nickname:
+            raise ValueError("Fleet entries need a nickname")
+        entry = FleetEntry(nickname, aircraft, empty_weight_lbs, empty_arm_in, notes.strip(), time.time())
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO fleet (nickname, aircraft, empty_weight_lbs, empty_arm_in, notes, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (nickname) DO UPDATE SET aircraft = excluded.aircraft,"
+                " empty_weight_lbs = excluded.empty_weight_lbs, empty_arm_in = excluded.empty_arm_in,"
+                " notes = excluded.notes, updated_at = excluded.updated_at",
+                (entry.nickname, entry.aircraft, entry.empty_weight_lbs, entry.empty_arm_in, entry.notes, entry.updated_at),
+            )
+            # data_version only changes for commits made by other connections.
+            self._entries = None
+        return entry
+
+    def delete(self, nickname):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM fleet WHERE nickname = ?", (nickname,))
+            self._entries = None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
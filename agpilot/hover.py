@@ -0,0 +1,264 @@
+"""Hover performance from gross weight × OAT × pressure altitude charts.
+
+Each helicopter type has an IGE and an OGE hover chart: the maximum hover gross
+weight at every node of a shared pressure altitude × OAT grid, as read off the
+flight manual's hover-ceiling charts. Charts live in hover_charts.json (shipped
+next to this module); HoverCharts stacks them into one (types, 2, PA, OAT)
+array and interpolates bilinearly, gathering the four surrounding nodes for
+every query at once, so whole condition grids, weight sweeps and per-row fleet
+data are one call. Types without a chart fall back to the formula in
+agpilot.performance. Conditions above the grid (higher or hotter than the
+chart goes) count as no hover; below it the edge of the chart is used.
+
+The shipped charts are representative placeholders, not POH data: they were
+generated by ``python -m agpilot.hover build`` from each type's published
+maximum-gross-weight hover ceilings (standard day, so pressure and density
+altitude coincide) with max hover weight proportional to air density, and
+they run past max takeoff weight so interpolation near it stays smooth (the
+structural limit is applied separately). Replace a type's tables with values
+digitized from its POH, on the same grid.
+
+Usage:
+    python -m agpilot.hover build agpilot/hover_charts.json
+    python -m agpilot.hover check agpilot/hover_charts.json     # lookup latency and MTOW ceilings
+"""
+
+import argparse
+import json
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from agpilot import performance
+from agpilot.aircraft import database
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "hover_charts.json")
+SCHEMA_VERSION = 1
+MODES = ("ige", "oge")
+PRESSURE_ALT_FT = np.arange(0, 14001, 1000, dtype=float)
+OAT_C = np.arange(-30, 51, 10, dtype=float)
+SEA_LEVEL_K = 288.15
+
+
+def density_ratio(pressure_alt_ft, oat_c):
+    """Air density relative to the ISA sea-level value."""
+    pressure_ratio = (1 - 6.8756e-6 * np.asarray(pressure_alt_ft, dtype=float)) ** 5.2559
+    return pressure_ratio * SEA_LEVEL_K / (np.asarray(oat_c, dtype=float) + 273.15)
+
+
+def synthesize(data, pressure_alt_ft=PRESSURE_ALT_FT, oat_c=OAT_C):
+    """Placeholder IGE/OGE max-weight tables for one type from its published max-gross-weight ceilings."""
+    pa, oat = np.meshgrid(pressure_alt_ft, oat_c, indexing="ij")
+    mtow = data["max_takeoff_weight_lbs"]
+    tables = {}
+    for mode in MODES:
+        ceiling_ft = data[f"hover_ceiling_{mode}_max_gw"]
+        at_ceiling = density_ratio(ceiling_ft, performance.isa_temperature(ceiling_ft))
+        tables[mode] = (mtow * density_ratio(pa, oat) / at_ceiling).round(-1)
+    return tables
+
+
+def build(path, aircraft_db=None):
+    # One line per pressure altitude row, so a chart reads like the table it was digitized from.
+    def table(rows):
+        return "[\n" + ",\n".join(f"        {json.dumps([int(v) for v in row])}" for row in rows) + "\n      ]"
+
+    aircraft_db = aircraft_db or database()
+    charts = []
+    for name in aircraft_db.names("helicopter"):
+        tables = synthesize(aircraft_db[name])
+        fields = [f'      "source": {json.dumps("representative placeholder generated from published max-GW hover ceilings")}']
+        fields += [f'      "{mode}_max_weight_lbs": {table(tables[mode])}' for mode in MODES]
+        charts.append(f"    {json.dumps(name)}: {{\n" + ",\n".join(fields) + "\n    }")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'{{\n  "version": {SCHEMA_VERSION},\n'
+                f'  "pressure_alt_ft": {json.dumps(PRESSURE_ALT_FT.astype(int).tolist())},\n'
+                f'  "oat_c": {json.dumps(OAT_C.astype(int).tolist())},\n'
+                '  "charts": {\n' + ",\n".join(charts) + "\n  }\n}\n")
+
+
+def _locate(axis, values):
+    """Lower node index and fractional position of ``values`` on a sorted ``axis`` (clamped to its range)."""
+    values = np.clip(values, axis[0], axis[-1])
+    index = np.clip(np.searchsorted(axis, values, side="right") - 1, 0, axis.size - 2)
+    return index, (values - axis[index]) / (axis[index + 1] - axis[index])
+
+
+class HoverCharts:
+    """Type name → IGE/OGE max hover weight charts on a shared PA × OAT grid."""
+
+    def __init__(self, document):
+        self.pressure_alt_ft = np.asarray(document["pressure_alt_ft"], dtype=float)
+        self.oat_c = np.asarray(document["oat_c"], dtype=float)
+        shape = (self.pressure_alt_ft.size, self.oat_c.size)
+        names = list(document["charts"])
+        self.by_name = {name: i for i, name in enumerate(names)}
+        self.sources = {name: chart.get("source", "") for name, chart in document["charts"].items()}
+        self.tables = np.empty((len(names), len(MODES)) + shape)
+        for i, name in enumerate(names):
+            for m, mode in enumerate(MODES):
+                table = np.asarray(document["charts"][name][f"{mode}_max_weight_lbs"], dtype=float)
+                if table.shape != shape:
+                    raise ValueError(f"{name}: {mode} chart is {table.shape}, expected {shape} (PA × OAT)")
+                if np.any(np.diff(table, axis=0) > 0):
+                    raise ValueError(f"{name}: {mode} chart must not increase with pressure altitude")
+                self.tables[i, m] = table
+        self.tables.flags.writeable = False
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+    def indexes(self, names):
+        """Chart index for each type name; −1 where a type has no chart."""
+        names = np.asarray(names, dtype=str)
+        unique, inverse = np.unique(names, return_inverse=True)
+        return np.array([self.by_name.get(name, -1) for name in unique], dtype=np.intp)[inverse].reshape(names.shape)
+
+    def _at_oat(self, index, mode, oat_c):
+        # Max weight at every PA node for the given OAT: shape broadcast(index, oat) + (PA nodes,).
+        j, f = _locate(self.oat_c, np.asarray(oat_c, dtype=float))
+        index = np.maximum(index, 0)
+        return self.tables[index, mode, :, j] * (1 - f)[..., None] + self.tables[index, mode, :, j + 1] * f[..., None]
+
+    def off_chart(self, pressure_alt_ft, oat_c):
+        """True above the chart's top pressure altitude or OAT, where nothing is known to hover."""
+        return (np.asarray(pressure_alt_ft) > self.pressure_alt_ft[-1]) | (np.asarray(oat_c) > self.oat_c[-1])
+
+    def max_weight(self, index, pressure_alt_ft, oat_c, out_of_ground_effect=True):
+        """Interpolated max hover gross weight; all arguments broadcast.
+
+        Below the bottom of the grid (lower or colder, i.e. denser air) the
+        edge value is used, which understates performance; above the top
+        (higher or hotter) the result is 0: the chart cannot vouch for a hover.
+        """
+        pressure_alt_ft, oat_c = np.asarray(pressure_alt_ft, dtype=float), np.asarray(oat_c, dtype=float)
+        i, g = _locate(self.pressure_alt_ft, pressure_alt_ft)
+        j, f = _locate(self.oat_c, oat_c)
+        index, mode = np.maximum(index, 0), int(out_of_ground_effect)
+        weight = ((self.tables[index, mode, i, j] * (1 - f) + self.tables[index, mode, i, j + 1] * f) * (1 - g)
+                  + (self.tables[index, mode, i + 1, j] * (1 - f) + self.tables[index, mode, i + 1, j + 1] * f) * g)
+        return np.where(self.off_chart(pressure_alt_ft, oat_c), 0.0, weight)
+
+    def ceiling(self, index, weight_lbs, oat_c, out_of_ground_effect=True):
+        """Highest pressure altitude at which ``weight_lbs`` hovers at ``oat_c``.
+
+        Capped at the chart's top pressure altitude. A weight heavier than the
+        sea-level node extrapolates the lowest segment to a negative ceiling;
+        above the chart's top OAT the ceiling is −inf.
+        """
+        weight, oat_c = np.asarray(weight_lbs, dtype=float), np.asarray(oat_c, dtype=float)
+        nodes = self._at_oat(np.asarray(index), int(out_of_ground_effect), oat_c)
+        nodes, weight = np.broadcast_arrays(nodes, weight[..., None])
+        weight = weight[..., 0]
+        # Charts fall with altitude, so the nodes that still carry the weight form a prefix.
+        k = np.clip((nodes >= weight[..., None]).sum(axis=-1), 1, nodes.shape[-1] - 1)
+        below = np.take_along_axis(nodes, (k - 1)[..., None], axis=-1)[..., 0]
+        above = np.take_along_axis(nodes, k[..., None], axis=-1)[..., 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.where(below > above, (below - weight) / (below - above), np.where(weight <= above, 1.0, -np.inf))
+        ceiling = self.pressure_alt_ft[k - 1] + np.minimum(fraction, 1) * (self.pressure_alt_ft[k] - self.pressure_alt_ft[k - 1])
+        return np.where(oat_c > self.oat_c[-1], -np.inf, ceiling)
+
+
+def read_charts(path):
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    if document.get("version") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported hover chart file version {document.get('version')!r}")
+    return document
+
+
+@lru_cache(maxsize=None)
+def charts(path=DATA_PATH):
+    return HoverCharts(read_charts(path))
+
+
+def _chart_index(data):
+    # Records and structured rows carry the type name; anything without one uses the formula.
+    try:
+        names = data["name"]
+    except (KeyError, ValueError):
+        return np.full(np.shape(data["max_takeoff_weight_lbs"]), -1)
+    return charts().indexes(names)
+
+
+def max_hover_weight(data, pressure_alt_ft, oat_c, out_of_ground_effect=True, margin_ft=0):
+    """Heaviest weight that hovers ``margin_ft`` above the field (inf for fixed-wing types).
+
+    From the type's chart when it has one, otherwise performance.max_weight_for_hover.
+    """
+    index = _chart_index(data)
+    pressure_alt_ft = np.asarray(pressure_alt_ft, dtype=float)
+    charted = charts().max_weight(index, pressure_alt_ft + margin_ft, oat_c, out_of_ground_effect)
+    formula = performance.max_weight_for_hover(data, performance.density_altitude(pressure_alt_ft, oat_c),
+                                               out_of_ground_effect, margin_ft)
+    return np.where(index >= 0, charted, formula)
+
+
+def hover_margins(data, pressure_alt_ft, oat_c, weight_lbs):
+    """IGE and OGE hover margins in feet above the field (zero for fixed-wing types).
+
+    From the type's charts: hover ceiling at ``weight_lbs`` and ``oat_c`` minus
+    the field pressure altitude. Types without a chart use performance.hover_margin.
+    The margins are signed: negative (down to −inf off the chart) when the
+    weight cannot hover at the field, so callers must test ``>= 0``.
+    """
+    index = _chart_index(data)
+    helicopter = performance.is_helicopter(data)
+    pressure_alt_ft = np.asarray(pressure_alt_ft, dtype=float)
+    formula = performance.hover_margin(data, performance.density_altitude(pressure_alt_ft, oat_c), weight_lbs)
+    return tuple(np.where(helicopter, np.where(index >= 0, charts().ceiling(index, weight_lbs, oat_c, mode) - pressure_alt_ft,
+                                               fallback), 0.0)
+                 for mode, fallback in zip((False, True), formula))
+
+
+def max_hopper_for_hover(data, pressure_alt_ft, oat_c, fuel_gal, pilot_weight_lbs, empty_weight_lbs=None,
+                         out_of_ground_effect=True, margin_ft=0):
+    """Hopper gallons (0 to capacity) that still allow a hover ``margin_ft`` above the field."""
+    zero_hopper_weight, _, _ = performance.weight_balance(data, fuel_gal, 0, pilot_weight_lbs, empty_weight_lbs)
+    limit = np.minimum(max_hover_weight(data, pressure_alt_ft, oat_c, out_of_ground_effect, margin_ft),
+                       data["max_takeoff_weight_lbs"])
+    return np.clip((limit - zero_hopper_weight) / data["hopper_weight_per_gal"], 0, data["hopper_capacity_gal"])
+
+
+def check(path, aircraft_db=None, samples=100_000, seed=0):
+    """Report chart lookup latency, batched and per query, and the OGE ceiling at max takeoff weight and 15 °C."""
+    aircraft_db = aircraft_db or database()
+    table = HoverCharts(read_charts(path))
+    rng = np.random.default_rng(seed)
+    pa = rng.uniform(table.pressure_alt_ft[0], table.pressure_alt_ft[-1], samples)
+    oat = rng.uniform(table.oat_c[0], table.oat_c[-1], samples)
+    print(f"{'aircraft':32s} {'batched ms':>11s} {'µs/query':>9s} {'OGE ceiling @ MTOW, 15 °C':>27s}")
+    for name in aircraft_db.names("helicopter"):
+        if name not in table:
+            print(f"{name:32s} no chart")
+            continue
+        index = table.by_name[name]
+        weight = rng.uniform(0.6, 1.0, samples) * aircraft_db[name]["max_takeoff_weight_lbs"]
+        start = time.perf_counter()
+        table.max_weight(index, pa, oat)
+        table.ceiling(index, weight, oat)
+        batched_ms = (time.perf_counter() - start) * 1e3
+        start = time.perf_counter()
+        for k in range(1000):
+            table.max_weight(index, pa[k], oat[k])
+        single_us = (time.perf_counter() - start) * 1e3
+        ceiling = table.ceiling(index, aircraft_db[name]["max_takeoff_weight_lbs"], 15.0)
+        print(f"{name:32s} {batched_ms:11.1f} {single_us:9.1f} {ceiling:27.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build placeholder hover charts or check chart lookups.")
+    parser.add_argument("command", choices=("build", "check"))
+    parser.add_argument("path", nargs="?", default=DATA_PATH)
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        build(args.path)
+    else:
+        check(args.path)
+
+
+if __name__ == "__main__":
+    main()
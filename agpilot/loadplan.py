@@ -0,0 +1,230 @@
+"""Batch "load plan" evaluation of a whole sortie list.
+
+A load plan is a CSV (or any table) with one sortie per row. All rows are
+evaluated together: aircraft parameters are gathered into per-row arrays and
+pushed through agpilot.performance in a single vectorized pass.
+"""
+
+import csv
+import io
+
+import numpy as np
+
+from agpilot import hover, performance, weight_balance
+from agpilot.aircraft import AircraftDatabase
+
+SORTIE_COLUMNS = (
+    "aircraft", "field", "pressure_alt_ft", "oat_c", "wind_kts", "runway_condition",
+    "fuel_gal", "hopper_gal", "pilot_weight_lbs",
+)
+# Optional per-row columns; blank or missing means "not checked" / "use base value".
+OPTIONAL_COLUMNS = ("empty_weight_lbs", "empty_arm_in", "field_length_ft", "fuel_burn_gal")
+TEXT_COLUMNS = ("aircraft", "field", "runway_condition")
+
+RESULT_COLUMNS = (
+    "total_weight_lbs", "takeoff_cg_in", "density_altitude_ft",
+    "takeoff_ground_roll_ft", "takeoff_to_50ft_ft", "landing_ground_roll_ft", "landing_from_50ft_ft",
+    "climb_rate_fpm", "hover_margin_ige_ft", "hover_margin_oge_ft",
+    "weight_ok", "landing_weight_ok", "cg_ok", "takeoff_ok", "climb_ok", "hover_ok", "pass",
+)
+
+TEMPLATE_CSV = (
+    ",".join(SORTIE_COLUMNS + OPTIONAL_COLUMNS) + "\n"
+    "Air Tractor AT-802,KELN,1800,22,5,Dry Grass / Firm Turf,200,650,200,,,3200,\n"
+    "Robinson R44 Raven II,KYKM,1100,28,0,Paved / Dry Hard Surface,30,60,180,,,,\n"
+)
+
+
+def read_sorties(source):
+    """Parse load plan CSV text (str, bytes or a file object) into a dict of column arrays.
+
+    Text without quotes is split into fields in one pass and sliced into columns;
+    quoted CSV goes through the csv module.
+    """
+    if hasattr(source, "read"):
+        source = source.read()
+    if isinstance(source, bytes):
+        source = source.decode("utf-8-sig")
+    header, columns, n_rows = _split_plain(source) if '"' not in source else _split_quoted(source)
+    missing = [name for name in SORTIE_COLUMNS if name not in header]
+    if missing:
+        raise ValueError(f"Load plan is missing column(s): {', '.join(missing)}")
+    return {name: _column(name, columns.get(name), n_rows) for name in SORTIE_COLUMNS + OPTIONAL_COLUMNS}
+
+
+def _blank(line):
+    return not line.strip(", \t")
+
+
+def _split_plain(source):
+    # No quoting, so every row is its line split on commas: split all rows at once, then slice columns out.
+    lines = source.splitlines()
+    header = [name.strip() for name in lines[0].split(",")] if lines else []
+    rows = [line for line in lines[1:] if not _blank(line)]
+    fields = ",".join(rows).split(",") if rows else []
+    if len(fields) != len(rows) * len(header):
+        for line_num, line in enumerate(lines[1:], start=2):
+            if not _blank(line) and line.count(",") != len(header) - 1:
+                raise ValueError(f"Load plan line {line_num}: expected {len(header)} fields, got {line.count(',') + 1}")
+    return header, {name: fields[i::len(header)] for i, name in enumerate(header)}, len(rows)
+
+
+def _split_quoted(source):
+    reader = csv.reader(io.StringIO(source))
+    header = [name.strip() for name in next(reader, [])]
+    rows = []
+    for row in reader:
+        if not any(value.strip() for value in row):
+            continue
+        if len(row) != len(header):
+            raise ValueError(f"Load plan line {reader.line_num}: expected {len(header)} fields, got {len(row)}")
+        rows.append(row)
+    columns = dict(zip(header, map(list, zip(*rows)))) if rows else {name: [] for name in header}
+    return header, columns, len(rows)
+
+
+def _column(name, values, n_rows):
+    if name in TEXT_COLUMNS:
+        return np.array([value.strip() for value in values], dtype=str) if values else np.full(n_rows, "")
+    if values is None:
+        return np.full(n_rows, np.nan)
+    try:
+        return np.fromiter(map(float, values), float, len(values))
+    except ValueError:
+        # Blank cells are NaN; anything else that is not a number still raises.
+        return np.array([float(value) if value.strip() else np.nan for value in values])
+
+
+def stack_aircraft(aircraft_db, names):
+    """Gather the numeric fields of ``aircraft_db`` into per-row arrays for ``names``.
+
+    For an AircraftDatabase this is a gather from its structured array.
+    """
+    unique, inverse = np.unique(np.asarray(names, dtype=str), return_inverse=True)
+    unknown = [name for name in unique if name not in aircraft_db]
+    if unknown:
+        raise ValueError(f"Unknown aircraft type(s): {', '.join(unknown)}")
+    if isinstance(aircraft_db, AircraftDatabase):
+        return aircraft_db.rows(names)
+    fields = {key for name in unique for key, value in aircraft_db[name].items() if isinstance(value, (int, float))}
+    return {
+        key: np.array([aircraft_db[name].get(key, 0) for name in unique], dtype=float)[inverse]
+        for key in fields
+    }
+
+
+def evaluate_sorties(sorties, aircraft_db, min_climb_fpm=0.0):
+    """Weight & balance, CG trajectory, takeoff, landing, climb and hover for every sortie, with pass/fail flags.
+
+    Returns a dict of columns: the input columns followed by RESULT_COLUMNS.
+    """
+    data = stack_aircraft(aircraft_db, sorties["aircraft"])
+    unknown = sorted(set(np.asarray(sorties["runway_condition"], dtype=str).tolist()) - set(performance.RUNWAY_CONDITION_NAMES))
+    if unknown:
+        raise ValueError(f"Unknown runway condition(s): {', '.join(map(repr, unknown))}")
+    helicopter = performance.is_helicopter(data)
+    empty_weight = np.where(np.isnan(sorties["empty_weight_lbs"]), data["base_empty_weight_lbs"], sorties["empty_weight_lbs"])
+    total_weight, weight_ok, landing_weight_ok = performance.weight_balance(
+        data, sorties["fuel_gal"], sorties["hopper_gal"], sorties["pilot_weight_lbs"], empty_weight)
+    cg = weight_balance.trajectory(
+        data, sorties["fuel_gal"], sorties["hopper_gal"], sorties["pilot_weight_lbs"],
+        fuel_burn_gal=np.where(np.isnan(sorties["fuel_burn_gal"]), sorties["fuel_gal"], sorties["fuel_burn_gal"]),
+        empty_weight_lbs=empty_weight,
+        empty_arm_in=np.where(np.isnan(sorties["empty_arm_in"]), data["empty_arm_in"], sorties["empty_arm_in"]),
+        envelope=weight_balance.envelope_polygons(aircraft_db, sorties["aircraft"]), steps=1)
+    results = performance.evaluate(
+        data, sorties["pressure_alt_ft"], sorties["oat_c"], total_weight,
+        sorties["wind_kts"], sorties["runway_condition"], helicopter=helicopter)
+    ige_margin, oge_margin = hover.hover_margins(data, sorties["pressure_alt_ft"], sorties["oat_c"], total_weight)
+    results["hover_margin_ige_ft"] = np.where(helicopter, ige_margin, 0.0)
+    results["hover_margin_oge_ft"] = np.where(helicopter, oge_margin, 0.0)
+
+    field_length = sorties["field_length_ft"]
+    takeoff_ok = helicopter | np.isnan(field_length) | (results["takeoff_to_50ft_ft"] <= field_length)
+    climb_ok = results["climb_rate_fpm"] > min_climb_fpm
+    hover_ok = ~helicopter | (results["hover_margin_oge_ft"] >= 0)
+    results.update(
+        total_weight_lbs=total_weight,
+        takeoff_cg_in=cg["cg_in"][..., 0],
+        cg_ok=cg["cg_ok"],
+        weight_ok=weight_ok,
+        landing_weight_ok=landing_weight_ok,
+        takeoff_ok=takeoff_ok,
+        climb_ok=climb_ok,
+        hover_ok=hover_ok,
+    )
+    results["pass"] = weight_ok & cg["cg_ok"] & takeoff_ok & climb_ok & hover_ok
+    return {**sorties, **{name: results[name] for name in RESULT_COLUMNS}}
+
+
+def to_csv(table):
+    """Render a column dict (as returned by evaluate_sorties) as CSV text.
+
+    Each column is rendered to a zero-padded byte matrix in one pass (floats as
+    "%.1f", NaN as an empty cell); the padding is dropped when the rows are joined.
+    """
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\n").writerow(table)
+    columns = [_column_bytes(np.asarray(values)) for values in table.values()]
+    n_rows = len(columns[0]) if columns else 0
+    if not n_rows:
+        return out.getvalue()
+    comma, newline = np.full((n_rows, 1), ord(","), np.uint8), np.full((n_rows, 1), ord("\n"), np.uint8)
+    pieces = [piece for i, column in enumerate(columns) for piece in ((comma, column) if i else (column,))]
+    rows = np.concatenate(pieces + [newline], axis=1)
+    return out.getvalue() + rows[rows != 0].tobytes().decode("utf-8")
+
+
+def _column_bytes(values):
+    """One column as a (rows, width) uint8 matrix of its CSV text, padded with zero bytes."""
+    if values.dtype.kind == "f":
+        return _format_tenths(values)
+    if values.dtype.kind == "b":
+        return _BOOL_TEXT[values.view(np.uint8)].view(np.uint8).reshape(len(values), _BOOL_TEXT.itemsize)
+    text = values if values.dtype.kind == "U" else values.astype(str)
+    try:
+        encoded = text.astype("S")
+    except UnicodeEncodeError:
+        encoded = np.char.encode(text, "utf-8")
+    if any(char in encoded.tobytes() for char in b',"\n'):
+        encoded = np.char.encode(np.array([_quote(value) for value in text.tolist()], dtype=str), "utf-8")
+    return encoded.view(np.uint8).reshape(len(values), encoded.dtype.itemsize)
+
+
+def _format_tenths(values):
+    # "%.1f" without a Python call per value: round to integer tenths and write the digits right to left.
+    finite = np.isfinite(values)
+    scaled = np.where(finite, values, 0) * 10
+    tenths = np.rint(scaled)
+    # Near a half-tenth the product can round the other way from the exact value; let Python decide those.
+    near_tie = np.flatnonzero(np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6)
+    tenths[near_tie] = [float(f"{value:.1f}") * 10 for value in values[near_tie].tolist()]
+    magnitude = np.abs(tenths).astype(np.int64)
+    lengths = np.full(len(values), 2)          # digits including the tenth, at least "0.d"
+    power = 100
+    while power <= magnitude.max(initial=0):
+        lengths += magnitude >= power
+        power *= 10
+    width = max(lengths.max(initial=2) + 2, 4)
+    matrix = np.zeros((len(values), width), np.uint8)
+    matrix[:, -1] = ord("0") + magnitude % 10
+    matrix[:, -2] = ord(".")
+    remaining = magnitude // 10
+    for k in range(1, lengths.max(initial=2)):
+        matrix[:, -2 - k] = np.where(k < lengths, ord("0") + remaining % 10, 0)
+        remaining //= 10
+    negative = np.flatnonzero(finite & np.signbit(values))     # "%.1f" keeps the sign of -0.04 too
+    matrix[negative, width - 2 - lengths[negative]] = ord("-")
+    matrix[~finite] = 0
+    matrix[np.isposinf(values), -3:] = np.frombuffer(b"inf", np.uint8)
+    matrix[np.isneginf(values), -4:] = np.frombuffer(b"-inf", np.uint8)
+    return matrix
+
+
+_BOOL_TEXT = np.array([b"False", b"True"])
+
+
+def _quote(value):
+    if any(char in value for char in ',"\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
@@ -0,0 +1,192 @@
+"""Precomputed performance lookup tables with multilinear interpolation.
+
+build() evaluates the performance engine once over a dense grid of pressure
+altitude × OAT × weight × wind for every runway condition and aircraft type and
+writes it as a float32 .npy that LookupTables memory-maps; queries gather the
+16 surrounding grid nodes and blend them one axis at a time. Distances and
+climb are linear in pressure altitude, OAT and wind within the grid, so
+interpolation error comes almost entirely from the weight axis. Queries
+outside the grid are NaN rather than clamped to its edge.
+
+accuracy() is the contract: the worst error against the formulas, as a
+fraction of each output's full scale, must stay within TOLERANCE (enforced by
+``check`` and by tests/test_lookup.py). benchmark() times lookups against the
+closed-form engine, per scalar query and batched.
+
+Usage:
+    python -m agpilot.lookup build data/lookup
+    python -m agpilot.lookup check data/lookup      # accuracy vs. formulas + latency; exits 1 past TOLERANCE
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from agpilot import performance
+from agpilot.aircraft import database
+
+OUTPUTS = ("takeoff_ground_roll_ft", "takeoff_to_50ft_ft", "landing_ground_roll_ft", "landing_from_50ft_ft", "climb_rate_fpm")
+PRESSURE_ALT_FT = np.arange(-2000, 20001, 2000, dtype=float)
+OAT_C = np.arange(-30, 51, 10, dtype=float)
+WIND_KTS = np.arange(-20, 21, 5, dtype=float)
+N_WEIGHTS = 24
+MIN_WEIGHT_FRACTION = 0.3
+# Worst interpolation error allowed, as a fraction of each output's full scale.
+TOLERANCE = 0.005
+
+
+def weight_axis(data):
+    """Weight grid for one type: evenly spaced up to max takeoff weight, plus a node at max landing weight."""
+    mtow, mlw = data["max_takeoff_weight_lbs"], data["max_landing_weight_lbs"]
+    weights = np.linspace(MIN_WEIGHT_FRACTION * mtow, mtow, N_WEIGHTS - 1)
+    extra = mlw if MIN_WEIGHT_FRACTION * mtow < mlw < mtow and mlw not in weights else (weights[-2] + weights[-1]) / 2
+    return np.sort(np.append(weights, extra))
+
+
+def build(directory, aircraft_db=None):
+    aircraft_db = aircraft_db or database()
+    names = list(aircraft_db)
+    shape = (len(names), len(performance.RUNWAY_CONDITION_NAMES), PRESSURE_ALT_FT.size, OAT_C.size, N_WEIGHTS, WIND_KTS.size, len(OUTPUTS))
+    os.makedirs(directory, exist_ok=True)
+    tables = np.lib.format.open_memmap(os.path.join(directory, "tables.npy"), mode="w+", dtype=np.float32, shape=shape)
+    weights = np.empty((len(names), N_WEIGHTS))
+    pa, oat, weight, wind = np.ix_(PRESSURE_ALT_FT, OAT_C, np.arange(N_WEIGHTS), WIND_KTS)
+    for a, name in enumerate(names):
+        data = aircraft_db[name]
+        weights[a] = weight_axis(data)
+        for r, condition in enumerate(performance.RUNWAY_CONDITION_NAMES):
+            results = performance.evaluate(data, pa, oat, weights[a][weight], wind, condition)
+            # Store climb unfloored so the zero floor is applied after interpolation, not smeared across a cell.
+            results["climb_rate_fpm"] = np.broadcast_to(
+                performance.climb_rate(data, pa, oat, weights[a][weight], floor=False), results["takeoff_ground_roll_ft"].shape)
+            tables[a, r] = np.stack([results[key] for key in OUTPUTS], axis=-1)
+    tables.flush()
+    del tables
+    np.savez(os.path.join(directory, "axes.npz"), aircraft=np.array(names), outputs=np.array(OUTPUTS),
+             pressure_alt_ft=PRESSURE_ALT_FT, oat_c=OAT_C, wind_kts=WIND_KTS, weight_lbs=weights)
+
+
+def _locate(axis, values):
+    """Lower node index and fractional position of ``values`` on a sorted ``axis``, plus an inside-the-axis mask."""
+    inside = (values >= axis[0]) & (values <= axis[-1])
+    values = np.clip(values, axis[0], axis[-1])
+    index = np.clip(np.searchsorted(axis, values, side="right") - 1, 0, axis.size - 2)
+    return index, (values - axis[index]) / (axis[index + 1] - axis[index]), inside
+
+
+class LookupTables:
+    def __init__(self, directory):
+        self.tables = np.load(os.path.join(directory, "tables.npy"), mmap_mode="r")
+        with np.load(os.path.join(directory, "axes.npz")) as axes:
+            self.aircraft = {name: i for i, name in enumerate(axes["aircraft"].tolist())}
+            self.outputs = tuple(axes["outputs"].tolist())
+            self.pressure_alt_ft = axes["pressure_alt_ft"]
+            self.oat_c = axes["oat_c"]
+            self.wind_kts = axes["wind_kts"]
+            self.weight_lbs = axes["weight_lbs"]
+        # Flat (nodes, outputs) view of each type's block, and node strides for (runway, PA, OAT, weight, wind).
+        self._rows = self.tables.reshape(self.tables.shape[0], -1, self.tables.shape[-1])
+        self._strides = np.cumprod((1,) + self.tables.shape[-2:1:-1])[::-1]
+        # Offsets of the 16 surrounding nodes, PA bit most significant, so they reshape to (2, 2, 2, 2).
+        bits = np.array([[(corner >> bit) & 1 for bit in (3, 2, 1, 0)] for corner in range(16)])
+        self._corners = bits @ self._strides[1:]
+
+    def query(self, aircraft, pressure_alt_ft, oat_c, weight_lbs, wind_kts, runway_condition):
+        """Interpolated outputs for one aircraft type; inputs broadcast, and points off the grid are NaN."""
+        a = self.aircraft[aircraft]
+        pa, oat, weight, wind, runway = np.broadcast_arrays(
+            np.asarray(pressure_alt_ft, dtype=float), np.asarray(oat_c, dtype=float),
+            np.asarray(weight_lbs, dtype=float), np.asarray(wind_kts, dtype=float),
+            performance.runway_index(runway_condition))
+        located = [_locate(axis, values) for axis, values in (
+            (self.pressure_alt_ft, pa), (self.oat_c, oat), (self.weight_lbs[a], weight), (self.wind_kts, wind))]
+        # One gather of all 16 surrounding nodes, then one lerp per axis: (16,) → (2, 2, 2, 2) → ... → ().
+        base = runway * self._strides[0]
+        for (index, _, _), stride in zip(located, self._strides[1:]):
+            base = base + index * stride
+        values = self._rows[a][base[..., None] + self._corners].reshape(base.shape + (2, 2, 2, 2, len(self.outputs)))
+        for _, fraction, _ in located:
+            low, high = np.take(values, 0, axis=base.ndim), np.take(values, 1, axis=base.ndim)
+            values = low + (high - low) * fraction.reshape(base.shape + (1,) * (low.ndim - base.ndim))
+        inside = located[0][2] & located[1][2] & located[2][2] & located[3][2]
+        values = np.where(inside[..., None], values, np.nan)
+        outputs = {key: values[..., k] for k, key in enumerate(self.outputs)}
+        outputs["climb_rate_fpm"] = np.maximum(outputs["climb_rate_fpm"], 0)
+        return outputs
+
+
+def _samples(data, rng, samples):
+    mtow = data["max_takeoff_weight_lbs"]
+    return (rng.uniform(PRESSURE_ALT_FT[0], PRESSURE_ALT_FT[-1], samples), rng.uniform(OAT_C[0], OAT_C[-1], samples),
+            rng.uniform(MIN_WEIGHT_FRACTION * mtow, mtow, samples), rng.uniform(WIND_KTS[0], WIND_KTS[-1], samples),
+            rng.integers(0, len(performance.RUNWAY_CONDITION_NAMES), samples))
+
+
+def accuracy(lookup, aircraft_db=None, samples=100_000, seed=0):
+    """Worst error of each type's lookups against the formulas, as a fraction of each output's full scale."""
+    aircraft_db = aircraft_db or database()
+    rng = np.random.default_rng(seed)
+    errors = {}
+    for name in lookup.aircraft:
+        data = aircraft_db[name]
+        inputs = _samples(data, rng, samples)
+        looked_up = lookup.query(name, *inputs)
+        exact = performance.evaluate(data, *inputs)
+        errors[name] = max(np.max(np.abs(looked_up[key] - exact[key])) / max(np.max(np.abs(exact[key])), 1.0)
+                           for key in OUTPUTS)
+    return errors
+
+
+def benchmark(lookup, name, aircraft_db=None, samples=100_000, scalar_queries=1000, seed=0):
+    """Lookup vs. formula latency for one type: µs per scalar query and ms for ``samples`` batched queries."""
+    data = (aircraft_db or database())[name]
+    pa, oat, weight, wind, runway = _samples(data, np.random.default_rng(seed), max(samples, scalar_queries))
+
+    def formulas(*args):
+        performance.takeoff(data, *args)
+        performance.landing(data, *args)
+        performance.climb_rate(data, *args[:3])
+
+    timings = {}
+    for label, run in (("lookup", lambda *args: lookup.query(name, *args)), ("formulas", formulas)):
+        start = time.perf_counter()
+        for i in range(scalar_queries):
+            run(pa[i], oat[i], weight[i], wind[i], runway[i])
+        timings[f"{label}_scalar_us"] = (time.perf_counter() - start) / max(scalar_queries, 1) * 1e6
+        start = time.perf_counter()
+        run(pa[:samples], oat[:samples], weight[:samples], wind[:samples], runway[:samples])
+        timings[f"{label}_batched_ms"] = (time.perf_counter() - start) * 1e3
+    return timings
+
+
+def check(directory, aircraft_db=None, samples=100_000, seed=0):
+    """Print accuracy and latency against the formulas; False when any type is past TOLERANCE."""
+    lookup = LookupTables(directory)
+    errors = accuracy(lookup, aircraft_db, samples, seed)
+    print(f"{'aircraft':32s} {'max err %FS':>12s} {'µs/query lookup':>16s} {'formulas':>9s} "
+          f"{'batched ms lookup':>18s} {'formulas':>9s}")
+    for name, error in errors.items():
+        timings = benchmark(lookup, name, aircraft_db, samples, seed=seed)
+        print(f"{name:32s} {error * 100:12.3f} {timings['lookup_scalar_us']:16.1f} {timings['formulas_scalar_us']:9.1f} "
+              f"{timings['lookup_batched_ms']:18.1f} {timings['formulas_batched_ms']:9.1f}")
+    worst = max(errors.values(), default=0.0)
+    print(f"worst error {worst * 100:.3f}% of full scale (tolerance {TOLERANCE * 100:.1f}%), {samples} samples per type")
+    return worst <= TOLERANCE
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or check the precomputed performance lookup tables.")
+    parser.add_argument("command", choices=("build", "check"))
+    parser.add_argument("directory")
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        build(args.directory)
+    elif not check(args.directory):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Bounded, quantized memoization for the per-request compute_* functions.
+
+memoize() wraps a function in a Memo: an LRU cache of at most ``maxsize``
+entries whose key is the bound arguments, each one named in ``steps`` rounded
+to its step in a given direction (e.g. pressure altitude up to 10 ft, headwind
+down to 1 kt, so the rounded inputs are never kinder than the real ones). The
+function is called with the rounded values, so a cached result is exactly the
+result for its key and nearby inputs share one entry. Each Memo counts hits,
+misses and evictions; stats() reports every Memo in the process, so cache size
+can be chosen from real traffic.
+
+Entries are shared by every caller (and every Streamlit session), so each call
+gets its own deep copy of the cached result.
+"""
+
+import copy
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = 1024
+
+_registry = []
+
+
+def quantize(value, step, rounding=round):
+    """``value`` rounded to a multiple of ``step`` by ``rounding`` (round, math.ceil or math.floor); None passes through."""
+    if value is None or not step:
+        return value
+    return rounding(float(value) / step) * step
+
+
+class Memo:
+    def __init__(self, function, maxsize=DEFAULT_MAXSIZE, steps=None):
+        self.function = function
+        self.maxsize = maxsize
+        self._signature = inspect.signature(function)
+        # Only the (step, rounding) pairs for arguments this function actually takes.
+        self.steps = {name: step for name, step in (steps or {}).items() if name in self._signature.parameters}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+        functools.update_wrapper(self, function)
+
+    def _bind(self, args, kwargs):
+        bound = self._signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        for name, (step, rounding) in self.steps.items():
+            bound.arguments[name] = quantize(bound.arguments[name], step, rounding)
+        return bound
+
+    def __call__(self, *args, **kwargs):
+        bound = self._bind(args, kwargs)
+        key = tuple(bound.arguments.values())
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return copy.deepcopy(self._entries[key])
+        # Computed outside the lock; two sessions missing on the same key both compute it.
+        result = self.function(*bound.args, **bound.kwargs)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return copy.deepcopy(result)
+
+    def stats(self):
+        """Counters for this cache as a dict."""
+        with self._lock:
+            calls = self.hits + self.misses
+            return {
+                "function": self.function.__name__,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / calls if calls else 0.0,
+            }
+
+    def cache_clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+def memoize(maxsize=DEFAULT_MAXSIZE, steps=None):
+    """Decorator: wrap a function in a registered Memo (see the module docstring)."""
+    def decorate(function):
+        memo = Memo(function, maxsize, steps)
+        _registry.append(memo)
+        return memo
+    return decorate
+
+
+def stats():
+    """Counters of every memoized function, one dict each."""
+    return [memo.stats() for memo in _registry]
+
+
+def clear():
+    for memo in _registry:
+        memo.cache_clear()
@@ -0,0 +1,152 @@
+"""METAR decoder built on precompiled regular expressions.
+
+parse_metar() turns a raw report into a typed Metar record. The body groups
+(wind, visibility, weather, clouds, temperature, altimeter) are matched by one
+alternation regex in a single scan, which keeps decoding fast enough to run
+over archived observations as well as the live report. The same group scanner
+(parse_groups) is what TAF change groups are decoded with.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+
+from agpilot import performance
+
+STANDARD_ALTIMETER_INHG = 29.92
+HPA_TO_INHG = 0.0295300
+MPS_TO_KT = 1.943844
+
+_HEADER = re.compile(
+    r"^\s*(?:(?:METAR|SPECI)\s+)?(?P<station>[A-Z][A-Z0-9]{3})\s+(?P<day>\d{2})(?P<hour>\d{2})(?P<minute>\d{2})Z"
+    r"(?P<flags>(?:\s+(?:AUTO|COR|NIL))*)"
+)
+_GROUPS = re.compile(
+    r"(?<!\S)(?:"
+    r"(?P<wind>(?P<wind_dir>\d{3}|VRB)(?P<wind_speed>\d{2,3})(?:G(?P<wind_gust>\d{2,3}))?(?P<wind_unit>KT|MPS))"
+    r"|(?P<wind_var>(?P<var_from>\d{3})V(?P<var_to>\d{3}))"
+    r"|(?P<vis_sm>(?P<vis_mod>[PM])?(?:(?P<vis_whole>\d{1,2})\s+)?(?:(?P<vis_num>\d{1,2})/(?P<vis_den>\d{1,2})|(?P<vis_int>\d{1,2}))SM)"
+    r"|(?P<cavok>CAVOK)"
+    r"|(?P<vis_m>\d{4})(?:NDV)?"
+    r"|(?P<cloud>(?P<cover>FEW|SCT|BKN|OVC|VV)(?P<base>\d{3}|///)(?P<cloud_type>CB|TCU|///)?)"
+    r"|(?P<clear>SKC|CLR|NSC|NCD)"
+    r"|(?P<wx>[-+]?(?:VC)?(?:MI|PR|BC|DR|BL|SH|TS|FZ)?(?:DZ|RA|SN|SG|IC|PL|GR|GS|UP|BR|FG|FU|VA|DU|SA|HZ|PY|PO|SQ|FC|SS|DS)+|TS)"
+    r"|(?P<temp>(?P<temp_m>M)?(?P<temp_c>\d{2})/(?:(?P<dew_m>M)?(?P<dew_c>\d{2}))?)"
+    r"|(?P<altimeter>A(?P<alt_inhg>\d{4})|Q(?P<alt_hpa>\d{4}))"
+    r")(?!\S)"
+)
+_REMARK_TEMP = re.compile(r"(?<!\S)T(?P<t_sign>[01])(?P<t>\d{3})(?:(?P<d_sign>[01])(?P<d>\d{3}))?(?!\S)")
+
+
+@dataclass(slots=True)
+class Metar:
+    raw: str
+    station: str = None
+    day: int = None
+    hour: int = None
+    minute: int = None
+    auto: bool = False
+    wind_dir_deg: int = None          # None when variable (VRB)
+    wind_speed_kt: int = None
+    wind_gust_kt: int = None
+    wind_var_from_deg: int = None
+    wind_var_to_deg: int = None
+    visibility_sm: float = None
+    weather: tuple = ()
+    clouds: tuple = ()                # ((cover, base_ft or None, type or None), ...)
+    temp_c: float = None
+    dewpoint_c: float = None
+    altimeter_inhg: float = None
+    altimeter_hpa: float = None
+    remarks: str = ""
+
+    @property
+    def ceiling_ft(self):
+        bases = [base for cover, base, _ in self.clouds if cover in ("BKN", "OVC", "VV") and base is not None]
+        return min(bases) if bases else None
+
+    def pressure_altitude_ft(self, field_elevation_ft):
+        if self.altimeter_inhg is None:
+            return None
+        return pressure_altitude(field_elevation_ft, self.altimeter_inhg)
+
+    def density_altitude_ft(self, field_elevation_ft):
+        pressure_alt_ft = self.pressure_altitude_ft(field_elevation_ft)
+        if pressure_alt_ft is None or self.temp_c is None:
+            return None
+        return int(performance.density_altitude(pressure_alt_ft, self.temp_c))
+
+    def headwind_kt(self, runway_heading_deg):
+        """Steady-wind component along the runway (+ headwind, − tailwind); variable wind gives 0."""
+        if not self.wind_speed_kt or self.wind_dir_deg is None:
+            return 0.0
+        return self.wind_speed_kt * math.cos(math.radians(self.wind_dir_deg - runway_heading_deg))
+
+
+def pressure_altitude(field_elevation_ft, altimeter_inhg):
+    return field_elevation_ft + (STANDARD_ALTIMETER_INHG - altimeter_inhg) * 1000
+
+
+def parse_groups(text):
+    """Decode the wind/visibility/weather/cloud/temperature/altimeter groups in ``text``."""
+    groups = {"weather": [], "clouds": []}
+    for m in _GROUPS.finditer(text):
+        kind = m.lastgroup
+        if kind == "wind":
+            factor = MPS_TO_KT if m["wind_unit"] == "MPS" else 1
+            groups["wind_dir_deg"] = None if m["wind_dir"] == "VRB" else int(m["wind_dir"])
+            groups["wind_speed_kt"] = round(int(m["wind_speed"]) * factor)
+            groups["wind_gust_kt"] = round(int(m["wind_gust"]) * factor) if m["wind_gust"] else None
+        elif kind == "wind_var":
+            groups["wind_var_from_deg"] = int(m["var_from"])
+            groups["wind_var_to_deg"] = int(m["var_to"])
+        elif kind == "vis_sm":
+            if m["vis_int"]:
+                groups["visibility_sm"] = float(m["vis_int"])
+            else:
+                groups["visibility_sm"] = int(m["vis_whole"] or 0) + int(m["vis_num"]) / int(m["vis_den"])
+        elif kind == "cavok":
+            groups["visibility_sm"] = 6.2
+        elif kind == "vis_m":
+            groups["visibility_sm"] = round(int(m["vis_m"]) / 1609.344, 2)
+        elif kind == "cloud":
+            base = None if m["base"] == "///" else int(m["base"]) * 100
+            cloud_type = m["cloud_type"] if m["cloud_type"] in ("CB", "TCU") else None
+            groups["clouds"].append((m["cover"], base, cloud_type))
+        elif kind == "wx":
+            groups["weather"].append(m["wx"])
+        elif kind == "temp":
+            groups["temp_c"] = -int(m["temp_c"]) if m["temp_m"] else int(m["temp_c"])
+            if m["dew_c"]:
+                groups["dewpoint_c"] = -int(m["dew_c"]) if m["dew_m"] else int(m["dew_c"])
+        elif kind == "altimeter":
+            if m["alt_inhg"]:
+                groups["altimeter_inhg"] = int(m["alt_inhg"]) / 100
+                groups["altimeter_hpa"] = round(groups["altimeter_inhg"] / HPA_TO_INHG)
+            else:
+                groups["altimeter_hpa"] = int(m["alt_hpa"])
+                groups["altimeter_inhg"] = round(groups["altimeter_hpa"] * HPA_TO_INHG, 2)
+    groups["weather"] = tuple(groups["weather"])
+    groups["clouds"] = tuple(groups["clouds"])
+    return groups
+
+
+def parse_metar(text):
+    """Decode a raw METAR/SPECI into a Metar record; unknown groups are ignored."""
+    raw = " ".join(text.split())
+    body, _, remarks = raw.partition(" RMK ")
+    record = Metar(raw=raw, remarks=remarks)
+    header = _HEADER.match(body)
+    if header:
+        record.station = header["station"]
+        record.day, record.hour, record.minute = int(header["day"]), int(header["hour"]), int(header["minute"])
+        record.auto = "AUTO" in header["flags"]
+        body = body[header.end():]
+    for key, value in parse_groups(body).items():
+        setattr(record, key, value)
+    precise = _REMARK_TEMP.search(remarks) if remarks else None
+    if precise:
+        record.temp_c = (-1 if precise["t_sign"] == "1" else 1) * int(precise["t"]) / 10
+        if precise["d"]:
+            record.dewpoint_c = (-1 if precise["d_sign"] == "1" else 1) * int(precise["d"]) / 10
+    return record
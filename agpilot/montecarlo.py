@@ -0,0 +1,114 @@
+"""Monte Carlo uncertainty mode for takeoff and climb.
+
+Each uncertain input is drawn ``n`` times from its own distribution and the
+whole sample is pushed through the agpilot.performance formulas in one
+vectorized pass (density altitude, the adjust_for_* chain, weight & balance),
+so 100 000 samples take a few tens of milliseconds. Results are reproducible
+for a given ``seed``.
+
+Distributions are (kind, spread) pairs around the nominal input:
+
+    ("fixed", 0)          always the nominal value
+    ("normal", sd)        normal with standard deviation ``sd``
+    ("uniform", half)     uniform on nominal ± ``half``
+    ("triangular", half)  triangular on nominal ± ``half``, peaked at nominal
+"""
+
+import numpy as np
+
+from agpilot import performance
+
+DEFAULT_SAMPLES = 100_000
+PERCENTILES = (50, 95, 99)
+# Nominal input → distribution; override any entry through ``uncertainty``.
+DEFAULT_UNCERTAINTY = {
+    "pressure_alt_ft": ("normal", 50.0),
+    "oat_c": ("normal", 2.0),
+    "wind_kts": ("normal", 2.0),
+    "hopper_gal": ("normal", 5.0),
+    "fuel_gal": ("normal", 2.0),
+    "pilot_weight_lbs": ("normal", 5.0),
+}
+DISTRIBUTIONS = ("fixed", "normal", "uniform", "triangular")
+# Range the performance formulas are used over (the app's input limits); wide spreads are clipped to it.
+DOMAIN = {
+    "pressure_alt_ft": (0.0, 20000.0),
+    "oat_c": (-30.0, 50.0),
+}
+
+
+def draw(rng, kind, nominal, spread, n):
+    """``n`` samples of one input around ``nominal``."""
+    if kind == "fixed" or spread == 0:
+        return np.full(n, float(nominal))
+    if kind == "normal":
+        return rng.normal(nominal, spread, n)
+    if kind == "uniform":
+        return rng.uniform(nominal - spread, nominal + spread, n)
+    if kind == "triangular":
+        return rng.triangular(nominal - spread, nominal, nominal + spread, n)
+    raise ValueError(f"Unknown distribution {kind!r}; expected one of {DISTRIBUTIONS}")
+
+
+def sample_inputs(data, pressure_alt_ft, oat_c, wind_kts, fuel_gal, hopper_gal, pilot_weight_lbs,
+                  gust_kts=None, uncertainty=None, n=DEFAULT_SAMPLES, seed=None):
+    """Draw every uncertain input: a dict of length-``n`` arrays keyed like DEFAULT_UNCERTAINTY.
+
+    With ``gust_kts`` (the headwind component of the reported gust) the wind is
+    triangular between an equally deep lull and the gust, peaked at ``wind_kts``.
+    Pressure altitude and OAT are clipped to DOMAIN (widened to take in the
+    nominal value), and loads to zero and the fuel and hopper capacities.
+    """
+    rng = np.random.default_rng(seed)
+    spreads = {**DEFAULT_UNCERTAINTY, **(uncertainty or {})}
+    nominal = {"pressure_alt_ft": pressure_alt_ft, "oat_c": oat_c, "wind_kts": wind_kts, "hopper_gal": hopper_gal,
+               "fuel_gal": fuel_gal, "pilot_weight_lbs": pilot_weight_lbs}
+    if gust_kts is not None and gust_kts > wind_kts:
+        spreads["wind_kts"] = ("triangular", gust_kts - wind_kts)
+    samples = {}
+    for name, value in nominal.items():
+        kind, spread = spreads[name]
+        samples[name] = draw(rng, kind, value, spread, n)
+    for name, (low, high) in DOMAIN.items():
+        samples[name] = np.clip(samples[name], min(low, nominal[name]), max(high, nominal[name]))
+    samples["hopper_gal"] = np.clip(samples["hopper_gal"], 0, data["hopper_capacity_gal"])
+    samples["fuel_gal"] = np.clip(samples["fuel_gal"], 0, data["base_fuel_capacity_gal"])
+    samples["pilot_weight_lbs"] = np.maximum(samples["pilot_weight_lbs"], 0)
+    return samples
+
+
+def takeoff_climb_distribution(data, pressure_alt_ft, oat_c, wind_kts, runway_condition, fuel_gal, hopper_gal,
+                               pilot_weight_lbs, empty_weight_lbs=None, field_length_ft=None, min_climb_fpm=0,
+                               gust_kts=None, uncertainty=None, n=DEFAULT_SAMPLES, seed=None, percentiles=PERCENTILES):
+    """Percentiles of takeoff distances and climb rate over ``n`` sampled loadings and conditions.
+
+    Returns a dict of ``{percentile: value}`` tables for ``weight_lbs``,
+    ``takeoff_ground_roll_ft``, ``takeoff_to_50ft_ft`` and ``climb_rate_fpm``
+    (climb percentiles count from the bad end: P95 is the rate 95% of samples
+    beat), and the probabilities of exceeding ``field_length_ft`` and of
+    climbing slower than ``min_climb_fpm``.
+    """
+    samples = sample_inputs(data, pressure_alt_ft, oat_c, wind_kts, fuel_gal, hopper_gal, pilot_weight_lbs,
+                            gust_kts, uncertainty, n, seed)
+    weight, _, _ = performance.weight_balance(
+        data, samples["fuel_gal"], samples["hopper_gal"], samples["pilot_weight_lbs"], empty_weight_lbs)
+    ground_roll, to_50ft = performance.takeoff(
+        data, samples["pressure_alt_ft"], samples["oat_c"], weight, samples["wind_kts"], runway_condition)
+    climb = performance.climb_rate(data, samples["pressure_alt_ft"], samples["oat_c"], weight)
+    q = np.asarray(percentiles, dtype=float)
+    distances = np.percentile(np.stack([ground_roll, to_50ft]), q, axis=1)
+    climb_q = np.percentile(climb, 100 - q)
+    result = {
+        "samples": n,
+        "seed": seed,
+        "weight_lbs": dict(zip(percentiles, np.percentile(weight, q).tolist())),
+        "takeoff_ground_roll_ft": dict(zip(percentiles, distances[:, 0].tolist())),
+        "takeoff_to_50ft_ft": dict(zip(percentiles, distances[:, 1].tolist())),
+        "climb_rate_fpm": dict(zip(percentiles, climb_q.tolist())),
+        "p_climb_below_min": float(np.mean(climb < min_climb_fpm)),
+        "p_over_max_takeoff_weight": float(np.mean(weight > data["max_takeoff_weight_lbs"])),
+    }
+    if field_length_ft is not None:
+        result["p_ground_roll_exceeds_field"] = float(np.mean(ground_roll > field_length_ft))
+        result["p_to_50ft_exceeds_field"] = float(np.mean(to_50ft > field_length_ft))
+    return result
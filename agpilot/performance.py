@@ -0,0 +1,221 @@
+"""Array-native performance engine.
+
+Every function accepts scalars or NumPy arrays and broadcasts them, so a
+whole grid of pressure altitude × OAT × weight × wind × runway condition is
+evaluated in one pass. ``data`` is an aircraft record: a plain dict of
+scalars, a dict of per-row arrays, or a NumPy structured array — anything
+indexable by the AIRCRAFT_DATA field names.
+"""
+
+import numpy as np
+
+# ────────────────────────────────────────────────
+# Runway Conditions
+# ────────────────────────────────────────────────
+RUNWAY_CONDITIONS = {
+    "Paved / Dry Hard Surface": 1.00,
+    "Dry Grass / Firm Turf": 1.15,
+    "Wet Grass / Damp Turf": 1.45,
+    "Soft / Muddy / Rough": 1.80
+}
+RUNWAY_CONDITION_NAMES = tuple(RUNWAY_CONDITIONS)
+_RUNWAY_FACTORS = np.array(list(RUNWAY_CONDITIONS.values()))
+
+TAKEOFF_50FT_MARGIN = 1.10
+LANDING_50FT_MARGIN = 1.15
+
+
+def _field(data, key, default=0.0):
+    try:
+        return data[key]
+    except (KeyError, ValueError, IndexError):
+        return default
+
+
+def runway_index(condition):
+    """Index into RUNWAY_CONDITION_NAMES for a name or index (or an array of either); unknown names map to 0."""
+    arr = np.asarray(condition)
+    if arr.dtype.kind in "iu":
+        return arr
+    indexes = {name: i for i, name in enumerate(RUNWAY_CONDITION_NAMES)}
+    if arr.ndim == 0:
+        return np.intp(indexes.get(str(arr), 0))
+    names, inverse = np.unique(arr, return_inverse=True)
+    return np.array([indexes.get(str(name), 0) for name in names])[inverse].reshape(arr.shape)
+
+
+def runway_factor(condition):
+    """Multiplier for a runway condition name or index (or an array of either)."""
+    return _RUNWAY_FACTORS[runway_index(condition)]
+
+# ────────────────────────────────────────────────
+# Density Altitude
+# ────────────────────────────────────────────────
+def isa_temperature(pressure_alt_ft):
+    return 15 - (2 * (np.asarray(pressure_alt_ft, dtype=float) / 1000))
+
+
+def density_altitude(pressure_alt_ft, oat_c):
+    pressure_alt_ft = np.asarray(pressure_alt_ft, dtype=float)
+    deviation = np.asarray(oat_c, dtype=float) - isa_temperature(pressure_alt_ft)
+    return np.round(pressure_alt_ft + (120 * deviation))
+
+# ────────────────────────────────────────────────
+# Adjustment Factors
+# ────────────────────────────────────────────────
+def adjust_for_weight(value, current_weight, base_weight, exponent=1.5):
+    return value * (np.asarray(current_weight, dtype=float) / base_weight) ** exponent
+
+
+def adjust_for_runway_condition(value, condition):
+    return value * runway_factor(condition)
+
+
+def adjust_for_wind(value, wind_kts):
+    factor = 1 - (0.1 * np.asarray(wind_kts, dtype=float) / 9)
+    return value * np.maximum(factor, 0.5)
+
+
+def adjust_for_da(value, da_ft):
+    factor = 1 + (0.07 * np.asarray(da_ft, dtype=float) / 1000)
+    return value * factor
+
+# ────────────────────────────────────────────────
+# Performance
+# ────────────────────────────────────────────────
+def takeoff(data, pressure_alt_ft, oat_c, weight_lbs, wind_kts, runway_condition):
+    """Takeoff ground roll and distance to clear 50 ft, in feet."""
+    da_ft = density_altitude(pressure_alt_ft, oat_c)
+    factor = adjust_for_weight(1.0, weight_lbs, data["max_takeoff_weight_lbs"])
+    factor = adjust_for_da(factor, da_ft)
+    factor = adjust_for_wind(factor, wind_kts)
+    factor = adjust_for_runway_condition(factor, runway_condition)
+    ground_roll = data["base_takeoff_ground_roll_ft"] * factor
+    to_50ft = data["base_takeoff_to_50ft_ft"] * factor * TAKEOFF_50FT_MARGIN
+    return ground_roll, to_50ft
+
+
+def landing(data, pressure_alt_ft, oat_c, weight_lbs, wind_kts, runway_condition):
+    """Landing ground roll and distance from 50 ft, in feet."""
+    weight_lbs = np.minimum(weight_lbs, data["max_landing_weight_lbs"])
+    da_ft = density_altitude(pressure_alt_ft, oat_c)
+    factor = adjust_for_weight(1.0, weight_lbs, data["max_landing_weight_lbs"], exponent=1.0)
+    factor = adjust_for_da(factor, da_ft)
+    factor = adjust_for_wind(factor, wind_kts)
+    factor = adjust_for_runway_condition(factor, runway_condition)
+    ground_roll = data["base_landing_ground_roll_ft"] * factor
+    from_50ft = data["base_landing_to_50ft_ft"] * factor * LANDING_50FT_MARGIN
+    return ground_roll, from_50ft
+
+
+def climb_rate(data, pressure_alt_ft, oat_c, weight_lbs, floor=True):
+    """Rate of climb in fpm, floored at zero unless ``floor`` is False."""
+    da_ft = density_altitude(pressure_alt_ft, oat_c)
+    climb = adjust_for_weight(data["base_climb_rate_fpm"], weight_lbs, data["max_takeoff_weight_lbs"], exponent=-1)
+    climb = climb * (1 - (0.05 * da_ft / 1000))
+    return np.maximum(climb, 0) if floor else climb
+
+
+def stall_speed(data, weight_lbs):
+    """Flaps-down stall speed in mph (zero for helicopters)."""
+    return data["base_stall_flaps_down_mph"] * np.sqrt(np.asarray(weight_lbs, dtype=float) / data["max_landing_weight_lbs"])
+
+
+def glide_distance(data, height_ft, wind_kts, helicopter=False):
+    """Glide (or autorotation) distance in nm from ``height_ft`` AGL."""
+    height_ft = np.asarray(height_ft, dtype=float)
+    wind_kts = np.asarray(wind_kts, dtype=float)
+    autorotation = (height_ft / 1300) * (1 + (wind_kts / 20))
+    ground_speed_mph = 100 + wind_kts
+    glide = (height_ft / 6076) * data["glide_ratio"] * (ground_speed_mph / 60)
+    return np.where(helicopter, autorotation, glide)
+
+
+def hover_margin(data, da_ft, weight_lbs):
+    """IGE and OGE hover ceilings in feet above ``da_ft``, negative when ``weight_lbs`` cannot hover there."""
+    base_ceiling_ige = _field(data, "hover_ceiling_ige_max_gw", 0)
+    base_ceiling_oge = _field(data, "hover_ceiling_oge_max_gw", 0)
+    weight_factor = (data["max_takeoff_weight_lbs"] - np.asarray(weight_lbs, dtype=float)) / 500.0
+    da_loss = np.asarray(da_ft, dtype=float)
+    return base_ceiling_ige + (weight_factor * 1000) - da_loss, base_ceiling_oge + (weight_factor * 800) - da_loss
+
+
+def hover_ceiling(data, da_ft, weight_lbs):
+    """IGE and OGE hover ceilings in feet, floored at zero (zero for fixed-wing types)."""
+    ige_margin, oge_margin = hover_margin(data, da_ft, weight_lbs)
+    return np.maximum(0, ige_margin), np.maximum(0, oge_margin)
+
+
+def is_helicopter(data):
+    """True for rotorcraft records: category "helicopter", or a published hover ceiling when uncategorized."""
+    category = _field(data, "category", None)
+    if category is not None:
+        return np.asarray(category) == "helicopter"
+    return np.asarray(_field(data, "hover_ceiling_ige_max_gw", 0)) > 0
+
+
+def weight_balance(data, fuel_gal, hopper_gal, pilot_weight_lbs, empty_weight_lbs=None):
+    """Total weight in lbs plus within-max-takeoff and within-max-landing flags."""
+    if empty_weight_lbs is None:
+        empty_weight_lbs = data["base_empty_weight_lbs"]
+    fuel_weight = np.asarray(fuel_gal, dtype=float) * data["fuel_weight_per_gal"]
+    hopper_weight = np.asarray(hopper_gal, dtype=float) * data["hopper_weight_per_gal"]
+    total_weight = empty_weight_lbs + fuel_weight + hopper_weight + pilot_weight_lbs
+    return total_weight, total_weight <= data["max_takeoff_weight_lbs"], total_weight <= data["max_landing_weight_lbs"]
+
+
+# ────────────────────────────────────────────────
+# Weight Limits (closed-form inverses of the formulas above)
+# ────────────────────────────────────────────────
+def max_weight_for_takeoff(data, pressure_alt_ft, oat_c, wind_kts, runway_condition, available_ft, to_50ft=True):
+    """Heaviest weight whose takeoff distance fits in ``available_ft`` (inf when the type needs no runway)."""
+    base = np.where(to_50ft, data["base_takeoff_to_50ft_ft"] * TAKEOFF_50FT_MARGIN, data["base_takeoff_ground_roll_ft"])
+    factor = adjust_for_da(1.0, density_altitude(pressure_alt_ft, oat_c))
+    factor = adjust_for_wind(factor, wind_kts)
+    factor = adjust_for_runway_condition(factor, runway_condition)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.asarray(available_ft, dtype=float) / (base * factor)
+    return np.where(np.asarray(base) > 0, data["max_takeoff_weight_lbs"] * ratio ** (1 / 1.5), np.inf)
+
+
+def max_weight_for_climb(data, pressure_alt_ft, oat_c, min_climb_fpm):
+    """Heaviest weight that still climbs at ``min_climb_fpm`` (0 when even the lightest cannot)."""
+    da_factor = np.maximum(1 - (0.05 * density_altitude(pressure_alt_ft, oat_c) / 1000), 0)
+    min_climb_fpm = np.asarray(min_climb_fpm, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = data["max_takeoff_weight_lbs"] * data["base_climb_rate_fpm"] * da_factor / min_climb_fpm
+    return np.where(min_climb_fpm > 0, weight, np.where(da_factor > 0, np.inf, 0.0))
+
+
+def max_weight_for_hover(data, da_ft, out_of_ground_effect=True, margin_ft=0):
+    """Heaviest weight whose hover ceiling stays at or above ``margin_ft`` (inf for fixed-wing types)."""
+    if out_of_ground_effect:
+        base_ceiling, ft_per_500_lbs = _field(data, "hover_ceiling_oge_max_gw", 0), 800
+    else:
+        base_ceiling, ft_per_500_lbs = _field(data, "hover_ceiling_ige_max_gw", 0), 1000
+    headroom_ft = base_ceiling - np.asarray(da_ft, dtype=float) - margin_ft
+    weight = data["max_takeoff_weight_lbs"] + headroom_ft * 500.0 / ft_per_500_lbs
+    return np.where(is_helicopter(data), weight, np.inf)
+
+
+def evaluate(data, pressure_alt_ft, oat_c, weight_lbs, wind_kts=0, runway_condition=RUNWAY_CONDITION_NAMES[0],
+             glide_height_ft=1000, helicopter=False):
+    """Every performance output for the broadcast of all inputs, as a dict of equally shaped arrays."""
+    da_ft = density_altitude(pressure_alt_ft, oat_c)
+    ground_roll_to, to_50ft = takeoff(data, pressure_alt_ft, oat_c, weight_lbs, wind_kts, runway_condition)
+    ground_roll_land, from_50ft = landing(data, pressure_alt_ft, oat_c, weight_lbs, wind_kts, runway_condition)
+    ige_ceiling, oge_ceiling = hover_ceiling(data, da_ft, weight_lbs)
+    results = {
+        "density_altitude_ft": da_ft,
+        "takeoff_ground_roll_ft": ground_roll_to,
+        "takeoff_to_50ft_ft": to_50ft,
+        "landing_ground_roll_ft": ground_roll_land,
+        "landing_from_50ft_ft": from_50ft,
+        "climb_rate_fpm": climb_rate(data, pressure_alt_ft, oat_c, weight_lbs),
+        "stall_speed_mph": stall_speed(data, weight_lbs),
+        "glide_distance_nm": glide_distance(data, glide_height_ft, wind_kts, helicopter),
+        "hover_ceiling_ige_ft": ige_ceiling,
+        "hover_ceiling_oge_ft": oge_ceiling,
+    }
+    shape = np.broadcast_shapes(*(np.shape(value) for value in results.values()))
+    return {key: np.broadcast_to(value, shape) for key, value in results.items()}
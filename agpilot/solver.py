@@ -0,0 +1,47 @@
+"""Inverse solver: the heaviest hopper load the conditions allow.
+
+Each constraint in agpilot.performance is a power law (or linear) in weight, so
+its weight limit has a closed form; the hover limit is read straight off the
+type's hover chart (agpilot.hover). The answer is the tightest of them. All
+inputs broadcast, so a whole OAT × wind table is one call.
+"""
+
+import numpy as np
+
+from agpilot import hover, performance
+
+LIMITS = ("max takeoff weight", "takeoff distance", "climb rate", "hover ceiling")
+
+
+def max_hopper_load(data, pressure_alt_ft, oat_c, wind_kts, runway_condition, field_length_ft,
+                    fuel_gal, pilot_weight_lbs, empty_weight_lbs=None, min_climb_fpm=0,
+                    to_50ft=True, out_of_ground_effect=True):
+    """Maximum hopper gallons, the resulting gross weight and the binding limit, as a dict of arrays.
+
+    ``to_50ft`` selects the obstacle requirement (distance to clear 50 ft) rather than ground roll.
+    For helicopters the hover limit is the heaviest weight the type's hover chart (agpilot.hover)
+    allows at the field; ``limit`` is "hopper capacity" when the full hopper fits.
+    """
+    limits = np.broadcast_arrays(
+        np.asarray(data["max_takeoff_weight_lbs"], dtype=float),
+        performance.max_weight_for_takeoff(data, pressure_alt_ft, oat_c, wind_kts, runway_condition,
+                                           field_length_ft, to_50ft),
+        performance.max_weight_for_climb(data, pressure_alt_ft, oat_c, min_climb_fpm),
+        hover.max_hover_weight(data, pressure_alt_ft, oat_c, out_of_ground_effect),
+    )
+    limits = np.stack(limits)
+    weight_limit = limits.min(axis=0)
+    binding = limits.argmin(axis=0)
+
+    zero_hopper_weight, _, _ = performance.weight_balance(data, fuel_gal, 0, pilot_weight_lbs, empty_weight_lbs)
+    capacity = data["hopper_capacity_gal"]
+    hopper_gal = (weight_limit - zero_hopper_weight) / data["hopper_weight_per_gal"]
+    limit = np.where(hopper_gal >= capacity, "hopper capacity", np.array(LIMITS)[binding])
+    hopper_gal = np.clip(hopper_gal, 0, capacity)
+    weight_lbs, _, _ = performance.weight_balance(data, fuel_gal, hopper_gal, pilot_weight_lbs, empty_weight_lbs)
+    return {
+        "hopper_gal": hopper_gal,
+        "weight_lbs": weight_lbs,
+        "limit": limit,
+        "feasible": weight_limit >= zero_hopper_weight,
+    }
@@ -0,0 +1,182 @@
+"""Time-stepped sortie simulation: fuel burn and hopper dispense over a flight profile.
+
+A profile is a sequence of Segments (ferry, spray passes, turnarounds, ...),
+each with a duration, a fuel flow and a dispense rate. simulate() lays every
+sortie's profile out on one grid of ``step_min`` steps — shape (sorties,
+steps + 1), shorter sorties padded and masked — integrates fuel and hopper
+with cumulative sums, and re-evaluates weight, CG, climb rate, stall speed and
+hover ceiling at every point with the vectorized engine. Each limit's margin
+is reported with its worst value and the time and phase where it occurs, so a
+whole day's sorties for the fleet is one call.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from agpilot import hover, performance, weight_balance
+
+PHASES = ("takeoff", "ferry", "spray", "turn", "landing")
+DEFAULT_STEP_MIN = 0.25
+# Margin name → unit; every margin is "limit − value" so negative means the limit is exceeded.
+MARGINS = {
+    "max_takeoff_weight": "lbs",
+    "climb": "fpm",
+    "hover_oge": "ft",
+    "fuel_reserve": "gal",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Segment:
+    phase: str
+    minutes: float
+    fuel_gph: float
+    dispense_gpm: float = None    # None on spray segments = an even share of the hopper load
+
+
+@lru_cache(maxsize=256)
+def spray_profile(passes, pass_min=0.75, turn_min=0.5, ferry_min=5.0, fuel_gph=60.0, dispense_gpm=None):
+    """Takeoff, ferry out, ``passes`` spray passes separated by turnarounds, ferry back, landing."""
+    segments = [Segment("takeoff", 1.0, fuel_gph * 1.2, 0.0), Segment("ferry", ferry_min, fuel_gph, 0.0)]
+    for i in range(passes):
+        if i:
+            segments.append(Segment("turn", turn_min, fuel_gph, 0.0))
+        segments.append(Segment("spray", pass_min, fuel_gph, dispense_gpm))
+    segments += [Segment("ferry", ferry_min, fuel_gph, 0.0), Segment("landing", 1.0, fuel_gph * 0.8, 0.0)]
+    return tuple(segments)
+
+
+def _optional(data, key):
+    # Hover ceilings may be absent from fixed-wing records.
+    try:
+        return data[key]
+    except (KeyError, ValueError):
+        return 0.0
+
+
+def _compile(profile, step_min):
+    """Per-step phase codes, fuel burn (gal), fixed dispense (gal) and even-share weights for one profile."""
+    steps = np.array([max(int(round(segment.minutes / step_min)), 1) for segment in profile])
+    phase = np.repeat([PHASES.index(segment.phase) for segment in profile], steps)
+    burn = np.repeat([segment.fuel_gph / 60 * step_min for segment in profile], steps)
+    fixed = np.repeat([(segment.dispense_gpm or 0.0) * step_min for segment in profile], steps)
+    share = np.repeat([float(segment.phase == "spray" and segment.dispense_gpm is None) for segment in profile], steps)
+    return phase, burn, fixed, share / max(share.sum(), 1.0)
+
+
+def profile_grid(profiles, step_min=DEFAULT_STEP_MIN):
+    """Stack profiles into padded (sorties, steps) arrays: phase, burn, fixed dispense, share, active.
+
+    Identical profiles are compiled once (the same object is recognised without
+    hashing its segments); padding steps burn and dispense nothing.
+    """
+    compiled = {}
+    by_id = {}
+    index = []
+    for profile in profiles:
+        row = by_id.get(id(profile))
+        if row is None:
+            row = by_id[id(profile)] = compiled.setdefault(tuple(profile), len(compiled))
+        index.append(row)
+    layouts = [_compile(profile, step_min) for profile in compiled]
+    lengths = np.array([len(layout[0]) for layout in layouts])
+    n_steps = lengths.max()
+    grids = np.zeros((4, len(layouts), n_steps))
+    grids[0] = PHASES.index("landing")
+    for row, layout in enumerate(layouts):
+        grids[:, row, :lengths[row]] = layout
+    active = np.arange(n_steps) < lengths[:, None]
+    index = np.array(index)
+    return grids[0, index].astype(np.intp), grids[1, index], grids[2, index], grids[3, index], active[index]
+
+
+def simulate(data, profiles, fuel_gal, hopper_gal, pilot_weight_lbs, pressure_alt_ft, oat_c, empty_weight_lbs=None,
+             empty_arm_in=None, envelope=None, min_climb_fpm=0, reserve_gal=0, step_min=DEFAULT_STEP_MIN):
+    """Simulate sorties point by point; every argument but ``profiles`` broadcasts over the sorties.
+
+    ``profiles`` holds one Segment sequence per sortie (a single sequence is used
+    for every sortie). ``data`` is a record or per-sortie rows, as for
+    weight_balance.trajectory; ``envelope`` likewise defaults to data["cg_envelope"].
+    Returns per-point arrays of shape (sorties, points) — ``t_min``, ``phase``,
+    ``active``, fuel, hopper, weight, CG, climb, stall and hover — plus ``worst``,
+    {margin: {"value", "t_min", "phase"}} per sortie, and the ``fuel_ok`` /
+    ``cg_ok`` whole-sortie flags.
+    """
+    if profiles and isinstance(profiles[0], Segment):
+        profiles = [profiles] * np.broadcast(*(np.asarray(value) for value in (
+            fuel_gal, hopper_gal, pilot_weight_lbs, pressure_alt_ft, oat_c, data["max_takeoff_weight_lbs"]))).size
+    phase, burn, fixed, share, active = profile_grid(profiles, step_min)
+    n_sorties, n_steps = phase.shape
+
+    def per_sortie(value):
+        return np.broadcast_to(np.asarray(value, dtype=float), (n_sorties,))[:, None]
+
+    # Points are the state before each step plus the state at touchdown.
+    fuel_start, hopper_start = per_sortie(fuel_gal), per_sortie(hopper_gal)
+    zero = np.zeros((n_sorties, 1))
+    fuel_used = np.concatenate([zero, np.cumsum(burn, axis=1)], axis=1)
+    dispensed = np.concatenate([zero, np.cumsum(fixed + share * hopper_start, axis=1)], axis=1)
+    fuel = fuel_start - fuel_used
+    hopper = np.maximum(hopper_start - dispensed, 0.0)
+    points_active = np.concatenate([active[:, :1], active], axis=1)
+    phase = np.concatenate([phase, np.full((n_sorties, 1), PHASES.index("landing"))], axis=1)
+    last = active.sum(axis=1)
+    phase[np.arange(n_sorties), last] = PHASES.index("landing")
+
+    fields = ("base_empty_weight_lbs", "empty_arm_in", "fuel_weight_per_gal", "fuel_arm_in", "hopper_weight_per_gal",
+              "hopper_arm_in", "pilot_arm_in", "max_takeoff_weight_lbs", "max_landing_weight_lbs", "base_climb_rate_fpm",
+              "base_stall_flaps_down_mph", "hover_ceiling_ige_max_gw", "hover_ceiling_oge_max_gw")
+    stepped = {key: per_sortie(_optional(data, key)) for key in fields}
+    if isinstance(data, np.ndarray) or "name" in data:
+        stepped["name"] = np.broadcast_to(np.asarray(data["name"]), (n_sorties,))[:, None]
+    empty_weight = None if empty_weight_lbs is None else per_sortie(empty_weight_lbs)
+    empty_arm = None if empty_arm_in is None else per_sortie(empty_arm_in)
+    weight, _, cg = weight_balance.loading(stepped, np.maximum(fuel, 0.0), hopper, per_sortie(pilot_weight_lbs),
+                                           empty_weight, empty_arm)
+    pressure_alt, oat = per_sortie(pressure_alt_ft), per_sortie(oat_c)
+    climb = performance.climb_rate(stepped, pressure_alt, oat, weight)
+    stall = performance.stall_speed(stepped, weight)
+    _, oge_margin = hover.hover_margins(stepped, pressure_alt, oat, weight)
+    helicopter = np.broadcast_to(performance.is_helicopter(data), (n_sorties,))[:, None]
+
+    envelope = np.asarray(data["cg_envelope"] if envelope is None else envelope, dtype=float)
+    if envelope.ndim == 2:
+        envelope = envelope[None]
+    in_envelope = weight_balance.point_in_polygon(cg, weight, envelope[:, None, :, :]) | ~points_active
+
+    margins = {
+        "max_takeoff_weight": stepped["max_takeoff_weight_lbs"] - weight,
+        "climb": climb - per_sortie(min_climb_fpm),
+        "hover_oge": np.where(helicopter, oge_margin, np.inf),
+        "fuel_reserve": fuel - per_sortie(reserve_gal),
+    }
+    t_min = np.arange(n_steps + 1) * step_min
+    rows = np.arange(n_sorties)
+    worst = {}
+    for name, margin in margins.items():
+        masked = np.where(points_active, margin, np.inf)
+        at = masked.argmin(axis=1)
+        worst[name] = {"value": masked[rows, at], "t_min": t_min[at], "phase": np.array(PHASES)[phase[rows, at]]}
+    landing_margin = stepped["max_landing_weight_lbs"][:, 0] - weight[rows, last]
+    worst["max_landing_weight"] = {"value": landing_margin, "t_min": t_min[last],
+                                   "phase": np.full(n_sorties, "landing")}
+
+    return {
+        "t_min": np.broadcast_to(t_min, phase.shape),
+        "phase": phase,
+        "active": points_active,
+        "fuel_gal": fuel,
+        "hopper_gal": hopper,
+        "weight_lbs": weight,
+        "cg_in": cg,
+        "in_envelope": in_envelope,
+        "climb_rate_fpm": climb,
+        "stall_speed_mph": stall,
+        "hover_margin_oge_ft": np.where(helicopter, oge_margin, 0.0),
+        "duration_min": last * step_min,
+        "worst": worst,
+        "fuel_ok": worst["fuel_reserve"]["value"] >= 0,
+        "cg_ok": in_envelope.all(axis=1),
+    }
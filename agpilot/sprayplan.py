@@ -0,0 +1,285 @@
+"""Spray-block planner: passes, hopper loads and ferry legs for a field polygon.
+
+The field (a GeoJSON Polygon or MultiPolygon, holes allowed) is projected to a
+local flat plane in feet around its centroid and rotated so passes run along
+x. Passes are the inside spans of scanlines one swath apart. An interval index
+maps every edge to the range of scanlines it crosses, so clipping is one
+vectorized pass over the actual crossings — fields with thousands of vertices
+clip in milliseconds — and crossings are paired by the even-odd rule, so
+concave fields and exclusion holes split a scanline into several passes.
+
+Passes are flown as a serpentine and split into hopper loads by cumulative
+volume; every load ferries from the loading strip to where the previous load
+stopped and back. plan() tries each pass heading (the one needing the fewest
+passes, and the one pointing at the strip), both sweep start sides and both
+first-pass directions, and keeps the quickest.
+"""
+
+import json
+
+import numpy as np
+
+FT_PER_DEG_LAT = 364_813.0    # mean Earth radius in feet × π / 180
+FT_PER_NM = 6076.12
+FT2_PER_ACRE = 43_560.0
+# A gap between consecutive passes wider than this many swaths is flown as a transit, not a turn.
+TRANSIT_SWATHS = 1.5
+DEFAULT_SPRAY_SPEED_MPH = 130.0
+DEFAULT_FERRY_SPEED_MPH = 140.0
+DEFAULT_TURN_S = 30.0
+
+# Example field near Ellensburg (KELN), an irregular block with a farmstead cut out.
+SAMPLE_FIELD = {
+    "type": "Feature",
+    "properties": {"name": "Sample field – Ellensburg"},
+    "geometry": {
+        "type": "Polygon",
+        "coordinates": [
+            [[-120.5650, 47.0520], [-120.5440, 47.0522], [-120.5436, 47.0440], [-120.5500, 47.0418],
+             [-120.5560, 47.0425], [-120.5652, 47.0410], [-120.5650, 47.0520]],
+            [[-120.5600, 47.0500], [-120.5580, 47.0500], [-120.5580, 47.0488], [-120.5600, 47.0488], [-120.5600, 47.0500]],
+        ],
+    },
+}
+SAMPLE_STRIP = (-120.5306, 47.0337)   # lon, lat of the KELN loading pad
+
+
+def field_polygons(geojson):
+    """Polygons of a GeoJSON document (str or dict) as lists of (n, 2) lon/lat rings, outer ring first."""
+    if isinstance(geojson, (str, bytes)):
+        geojson = json.loads(geojson)
+    kind = geojson.get("type")
+    if kind == "FeatureCollection":
+        return [polygon for feature in geojson["features"] for polygon in field_polygons(feature)]
+    if kind == "Feature":
+        return field_polygons(geojson["geometry"])
+    if kind == "Polygon":
+        return [[np.asarray(ring, dtype=float)[:, :2] for ring in geojson["coordinates"]]]
+    if kind == "MultiPolygon":
+        return [[np.asarray(ring, dtype=float)[:, :2] for ring in polygon] for polygon in geojson["coordinates"]]
+    raise ValueError(f"Expected a GeoJSON Polygon or MultiPolygon, got {kind!r}")
+
+
+class _Frame:
+    """Local flat frame in feet: origin at ``origin`` (lon, lat), x along ``angle`` (radians from east)."""
+
+    def __init__(self, origin, angle=0.0):
+        self.origin = np.asarray(origin, dtype=float)
+        self.scale = np.array([FT_PER_DEG_LAT * np.cos(np.radians(self.origin[1])), FT_PER_DEG_LAT])
+        self.cos, self.sin = np.cos(angle), np.sin(angle)
+
+    def rotated(self, angle):
+        return _Frame(self.origin, angle)
+
+    def to_local(self, lonlat):
+        east, north = np.moveaxis((np.asarray(lonlat, dtype=float) - self.origin) * self.scale, -1, 0)
+        return np.stack([east * self.cos + north * self.sin, north * self.cos - east * self.sin], axis=-1)
+
+    def to_lonlat(self, xy):
+        x, y = np.moveaxis(np.asarray(xy, dtype=float), -1, 0)
+        east, north = x * self.cos - y * self.sin, x * self.sin + y * self.cos
+        return np.stack([east, north], axis=-1) / self.scale + self.origin
+
+
+def _edges(rings):
+    """All ring edges as (E, 4) arrays of x1, y1, x2, y2 (rings are closed if they are not already)."""
+    edges = []
+    for ring in rings:
+        closed = ring if np.array_equal(ring[0], ring[-1]) else np.vstack([ring, ring[:1]])
+        edges.append(np.hstack([closed[:-1], closed[1:]]))
+    return np.vstack(edges)
+
+
+def ring_area(ring):
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def scanline_passes(edges, swath_ft):
+    """Clip scanlines one swath apart (along x) against polygon ``edges``.
+
+    Returns (row, y, x_start, x_end) arrays, one entry per inside span, sorted by
+    row then x, plus the number of scanlines. Each edge is indexed by the contiguous range of scanlines its
+    half-open y interval covers, so only real crossings are ever evaluated.
+    """
+    x1, y1, x2, y2 = edges.T
+    low, high = np.minimum(y1, y2), np.maximum(y1, y2)
+    y0 = low.min()
+    n_rows = int(np.ceil((high.max() - y0) / swath_ft))
+    first = np.ceil((low - y0) / swath_ft - 0.5).astype(np.intp)
+    last = np.ceil((high - y0) / swath_ft - 0.5).astype(np.intp)   # exclusive: scanline y == high is not crossed
+    counts = np.clip(last - first, 0, None)
+    edge = np.repeat(np.arange(len(edges)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    row = first[edge] + offsets
+    y = y0 + (row + 0.5) * swath_ft
+    x = x1[edge] + (y - y1[edge]) * (x2[edge] - x1[edge]) / (y2[edge] - y1[edge])
+
+    order = np.lexsort((x, row))
+    row, x = row[order], x[order]
+    # Even-odd pairing within each scanline: (1st, 2nd), (3rd, 4th), ...
+    rank = np.arange(len(row)) - np.searchsorted(row, row)
+    start = (rank % 2 == 0)[:-1] & (row[1:] == row[:-1]) if len(row) else np.zeros(0, dtype=bool)
+    starts = np.flatnonzero(start)
+    keep = x[starts + 1] - x[starts] > 1e-6
+    starts = starts[keep]
+    spans_row = row[starts]
+    return spans_row, y0 + (spans_row + 0.5) * swath_ft, x[starts], x[starts + 1], n_rows
+
+
+def _best_angle(points, step_deg=1.0):
+    """Pass direction (radians from east, in [0, π)) whose perpendicular extent is smallest."""
+    angles = np.radians(np.arange(0.0, 180.0, step_deg))
+    across = points[:, 1, None] * np.cos(angles) - points[:, 0, None] * np.sin(angles)
+    return angles[np.argmin(np.ptp(across, axis=0))]
+
+
+def _sequence(spans, descending, first_direction):
+    """Serpentine flying order: (order, direction) with direction +1 = along +x."""
+    row, _, x_start, _, _ = spans
+    rows = np.unique(row)
+    rank = np.searchsorted(rows, row)
+    if descending:
+        rank = len(rows) - 1 - rank
+    direction = np.where(rank % 2 == 0, first_direction, -first_direction)
+    order = np.lexsort((x_start * direction, rank))
+    return order, direction[order]
+
+
+def _evaluate(spans, strip_xy, descending, first_direction, swath_ft, gal_per_ft, capacity_gal,
+              spray_fps, ferry_fps, turn_s):
+    row, y, x_start, x_end, _ = spans
+    order, direction = _sequence(spans, descending, first_direction)
+    y = y[order]
+    start_x = np.where(direction > 0, x_start[order], x_end[order])
+    end_x = np.where(direction > 0, x_end[order], x_start[order])
+    starts = np.stack([start_x, y], axis=-1)
+    ends = np.stack([end_x, y], axis=-1)
+    lengths = np.abs(end_x - start_x)
+
+    # Turns and transits between consecutive passes.
+    gaps = np.hypot(*(starts[1:] - ends[:-1]).T)
+    transit = gaps > TRANSIT_SWATHS * swath_ft
+    turn_time = len(gaps) * turn_s + gaps[transit].sum() / ferry_fps
+    # Turn toward the next pass: left when it lies to the left of this pass's track; "-" stays on the same line.
+    side = direction[:-1] * (y[1:] - y[:-1])
+    turns = np.where(side > 0, "L", np.where(side < 0, "R", "-"))
+
+    # Hopper loads: break wherever the cumulative volume crosses a multiple of the capacity.
+    volume = lengths * gal_per_ft
+    cumulative = np.cumsum(volume)
+    total = cumulative[-1]
+    n_loads = max(int(np.ceil(total / capacity_gal - 1e-9)), 1)
+    break_volume = capacity_gal * np.arange(1, n_loads)
+    at = np.searchsorted(cumulative, break_volume)
+    fraction = (break_volume - (cumulative[at] - volume[at])) / np.maximum(volume[at], 1e-12)
+    breaks = starts[at] + fraction[:, None] * (ends[at] - starts[at])
+    load = np.searchsorted(break_volume, cumulative - volume, side="right")
+
+    ferry_ft = (np.hypot(*(starts[0] - strip_xy)) + np.hypot(*(ends[-1] - strip_xy))
+                + 2 * np.hypot(*(breaks - strip_xy).T).sum())
+    time_s = lengths.sum() / spray_fps + turn_time + ferry_ft / ferry_fps
+    return {
+        "time_s": time_s,
+        "ferry_ft": ferry_ft,
+        "spray_ft": lengths.sum(),
+        "turn_time_s": turn_time,
+        "starts": starts,
+        "ends": ends,
+        "breaks": breaks,
+        "load": load,
+        "turns": turns,
+        "transits": int(transit.sum()),
+        "n_loads": n_loads,
+        "volume_gal": total,
+    }
+
+
+def plan(field, swath_ft, rate_gal_per_acre, hopper_capacity_gal, strip_lonlat=SAMPLE_STRIP,
+         spray_speed_mph=DEFAULT_SPRAY_SPEED_MPH, ferry_speed_mph=DEFAULT_FERRY_SPEED_MPH, turn_s=DEFAULT_TURN_S,
+         heading_deg=None):
+    """Plan a spray job over ``field`` (GeoJSON) from the loading strip at ``strip_lonlat``.
+
+    ``heading_deg`` fixes the pass direction (true, degrees); by default the
+    narrowest-extent direction and the direction toward the strip are both tried.
+    Returns a dict: the first pass's true heading, passes in flying order as lon/lat
+    (``passes``, shape (N, 2, 2)), each pass's load number and the L/R turn
+    after it, load break points (``breaks``), counts, areas, volume, distances
+    (nm) and times (minutes).
+    """
+    if swath_ft <= 0 or rate_gal_per_acre <= 0 or hopper_capacity_gal <= 0:
+        raise ValueError("Swath width, application rate and hopper capacity must be positive")
+    polygons = field_polygons(field)
+    if not polygons:
+        raise ValueError("The GeoJSON has no field polygon")
+    origin = np.vstack([ring for polygon in polygons for ring in polygon[:1]]).mean(axis=0)
+    frame = _Frame(origin)
+    local = [[frame.to_local(ring) for ring in polygon] for polygon in polygons]
+    area_ft2 = sum(ring_area(polygon[0]) - sum(ring_area(hole) for hole in polygon[1:]) for polygon in local)
+    strip_east = frame.to_local(strip_lonlat)
+
+    if heading_deg is None:
+        outer = np.vstack([polygon[0] for polygon in local])
+        to_strip = np.arctan2(strip_east[1] - outer[:, 1].mean(), strip_east[0] - outer[:, 0].mean()) % np.pi
+        angles = {_best_angle(outer), to_strip}
+    else:
+        angles = {np.radians(90.0 - heading_deg) % np.pi}
+
+    gal_per_ft = swath_ft * rate_gal_per_acre / FT2_PER_ACRE
+    spray_fps, ferry_fps = spray_speed_mph * 5280 / 3600, ferry_speed_mph * 5280 / 3600
+    best = None
+    candidates = 0
+    for angle in angles:
+        rotated = frame.rotated(angle)
+        spans = scanline_passes(_edges([rotated.to_local(ring) for polygon in polygons for ring in polygon]), swath_ft)
+        if not len(spans[0]):
+            continue
+        strip_xy = rotated.to_local(strip_lonlat)
+        for descending in (False, True):
+            for first_direction in (1, -1):
+                candidates += 1
+                result = _evaluate(spans, strip_xy, descending, first_direction, swath_ft, gal_per_ft,
+                                   hopper_capacity_gal, spray_fps, ferry_fps, turn_s)
+                if best is None or result["time_s"] < best["time_s"]:
+                    best = dict(result, frame=rotated, angle=angle)
+    if best is None:
+        raise ValueError("The field is narrower than one swath")
+
+    frame = best["frame"]
+    passes = frame.to_lonlat(np.stack([best["starts"], best["ends"]], axis=1))
+    heading_deg = (90.0 - np.degrees(best["angle"])) % 360.0
+    if best["ends"][0, 0] < best["starts"][0, 0]:
+        heading_deg = (heading_deg + 180.0) % 360.0
+    return {
+        "heading_deg": float(heading_deg),
+        "passes": passes,
+        "load": best["load"],
+        "turns": best["turns"],
+        "breaks": frame.to_lonlat(best["breaks"]) if len(best["breaks"]) else np.zeros((0, 2)),
+        "n_passes": len(passes),
+        "n_loads": best["n_loads"],
+        "n_transits": best["transits"],
+        "field_acres": area_ft2 / FT2_PER_ACRE,
+        "sprayed_acres": best["spray_ft"] * swath_ft / FT2_PER_ACRE,
+        "volume_gal": best["volume_gal"],
+        "spray_nm": best["spray_ft"] / FT_PER_NM,
+        "ferry_nm": best["ferry_ft"] / FT_PER_NM,
+        "ferry_min": best["ferry_ft"] / ferry_fps / 60,
+        "total_min": best["time_s"] / 60,
+        "candidates": candidates,
+    }
+
+
+def to_geojson(result):
+    """The planned route as a GeoJSON FeatureCollection of pass LineStrings and load break Points."""
+    features = [
+        {"type": "Feature", "properties": {"pass": i + 1, "load": int(load) + 1},
+         "geometry": {"type": "LineString", "coordinates": segment.tolist()}}
+        for i, (segment, load) in enumerate(zip(result["passes"], result["load"]))
+    ]
+    features += [
+        {"type": "Feature", "properties": {"break_after_load": k + 1},
+         "geometry": {"type": "Point", "coordinates": point.tolist()}}
+        for k, point in enumerate(result["breaks"])
+    ]
+    return {"type": "FeatureCollection", "features": features}
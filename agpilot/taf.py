@@ -0,0 +1,278 @@
+"""TAF decoder and hour-by-hour performance forecast.
+
+parse_taf() splits a raw TAF into its initial conditions and FM / BECMG /
+TEMPO / PROBnn change groups (each decoded with metar.parse_groups) and
+resolves the day/hour times against a reference date. timeline() expands
+them into hourly arrays of shape (scenarios, hours):
+
+* scenario 0 is the prevailing forecast — the initial group, replaced by each
+  FM group from its start time and updated by each BECMG group once its change
+  period is over;
+* every TEMPO, PROB and BECMG group adds one scenario that equals the
+  prevailing forecast outside the group's period and the prevailing forecast
+  updated with the group inside it (during a BECMG period both the old and the
+  new conditions are possible).
+
+forecast() pushes the whole timeline through the performance engine — wind
+components on every runway end (agpilot.wind), density altitude, takeoff,
+landing, climb and hover — for any number of aircraft at once and keeps the
+worst scenario per hour, so a 30-hour TAF for the whole fleet is one
+vectorized pass. launch_window() then picks the longest run of go hours.
+
+TAFs rarely forecast temperature or pressure: the hourly temperature is
+interpolated between the current observation and any TX/TN groups, and the
+altimeter setting is carried forward from the current observation.
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from agpilot import hover, metar, performance, wind
+
+MIN_CEILING_FT = 500
+MIN_VISIBILITY_SM = 1.0
+NO_GO_WEATHER = ("TS", "FC", "GR", "FZ", "SQ")
+WIND_FIELDS = ("wind_dir_deg", "wind_speed_kt", "wind_gust_kt", "wind_var_from_deg", "wind_var_to_deg")
+
+_HEADER = re.compile(
+    r"^\s*(?:TAF\s+)?(?:(?:AMD|COR|RTD)\s+)*(?P<station>[A-Z][A-Z0-9]{3})\s+"
+    r"(?:(?P<day>\d{2})(?P<hour>\d{2})(?P<minute>\d{2})Z\s+)?(?P<from>\d{4})/(?P<to>\d{4})"
+)
+_CHANGE = re.compile(
+    r"(?<!\S)(?:FM(?P<fm>\d{6})|(?:PROB(?P<prob>\d{2})\s+)?(?P<kind>TEMPO|BECMG)?\s*(?P<start>\d{4})/(?P<end>\d{4}))(?!\S)"
+)
+_TEMPERATURE = re.compile(r"(?<!\S)T(?P<kind>[XN])(?P<minus>M)?(?P<temp>\d{2})/(?P<day>\d{2})(?P<hour>\d{2})Z(?!\S)")
+_CLEAR = re.compile(r"(?<!\S)(?:SKC|CLR|NSC|NCD|CAVOK)(?!\S)")
+_NO_WEATHER = re.compile(r"(?<!\S)NSW(?!\S)")
+
+
+@dataclass(slots=True)
+class ChangeGroup:
+    kind: str                         # "INITIAL", "FM", "BECMG", "TEMPO" or "PROB"
+    start: datetime
+    end: datetime
+    text: str
+    probability: int = 100
+    fields: dict = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class Taf:
+    raw: str
+    station: str = None
+    issued: datetime = None
+    valid_from: datetime = None
+    valid_to: datetime = None
+    groups: tuple = ()
+    temperatures: tuple = ()          # ((datetime, °C), ...) from TX/TN groups
+
+
+def resolve_time(day, hour, minute, reference):
+    """The datetime nearest ``reference`` with this day of month, hour (24 allowed) and minute."""
+    candidates = []
+    for months_back in (-1, 0, 1):
+        year, month = reference.year, reference.month - months_back
+        if month < 1:
+            year, month = year - 1, month + 12
+        elif month > 12:
+            year, month = year + 1, month - 12
+        try:
+            candidates.append(datetime(year, month, day, tzinfo=timezone.utc) + timedelta(hours=hour, minutes=minute))
+        except ValueError:
+            continue
+    return min(candidates, key=lambda candidate: abs(candidate - reference))
+
+
+def _day_hour(text, reference):
+    return resolve_time(int(text[:2]), int(text[2:4]), 0, reference)
+
+
+def _fields(text):
+    # Only the groups a change group mentions; clouds and weather are replaced when mentioned or cleared.
+    groups = metar.parse_groups(text)
+    if not groups["clouds"] and not _CLEAR.search(text):
+        del groups["clouds"]
+    if not groups["weather"] and not _NO_WEATHER.search(text):
+        del groups["weather"]
+    if "wind_speed_kt" in groups:
+        groups.setdefault("wind_gust_kt", None)
+        groups.setdefault("wind_var_from_deg", None)
+        groups.setdefault("wind_var_to_deg", None)
+    return groups
+
+
+def parse_taf(text, reference=None):
+    """Decode a raw TAF; day/hour times resolve to the month nearest ``reference`` (default: now, UTC)."""
+    raw = " ".join(text.split())
+    taf = Taf(raw=raw)
+    header = _HEADER.match(raw)
+    if header is None:
+        raise ValueError(f"Not a TAF: {raw[:40]!r}")
+    reference = reference or datetime.now(timezone.utc)
+    taf.station = header["station"]
+    if header["day"]:
+        taf.issued = resolve_time(int(header["day"]), int(header["hour"]), int(header["minute"]), reference)
+        reference = taf.issued
+    taf.valid_from = _day_hour(header["from"], reference)
+    taf.valid_to = _day_hour(header["to"], taf.valid_from)
+    body = raw[header.end():]
+    taf.temperatures = tuple(sorted(
+        (resolve_time(int(m["day"]), int(m["hour"]), 0, taf.valid_from), -int(m["temp"]) if m["minus"] else int(m["temp"]))
+        for m in _TEMPERATURE.finditer(body)))
+    body = _TEMPERATURE.sub("", body)
+
+    groups = []
+    kind, start, end, probability, position = "INITIAL", taf.valid_from, taf.valid_to, 100, 0
+    for m in _CHANGE.finditer(body):
+        groups.append(ChangeGroup(kind, start, end, body[position:m.start()].strip(), probability))
+        position = m.end()
+        if m["fm"]:
+            kind, start, end, probability = "FM", resolve_time(int(m["fm"][:2]), int(m["fm"][2:4]), int(m["fm"][4:]),
+                                                               taf.valid_from), taf.valid_to, 100
+        else:
+            kind = m["kind"] or "PROB"
+            if m["prob"] and kind == "TEMPO":
+                kind = "PROB"
+            start, end = _day_hour(m["start"], taf.valid_from), _day_hour(m["end"], taf.valid_from)
+            probability = int(m["prob"]) if m["prob"] else 100
+    groups.append(ChangeGroup(kind, start, end, body[position:].strip(), probability))
+    for group in groups:
+        group.fields = _fields(group.text)
+    taf.groups = tuple(groups)
+    return taf
+
+
+def _state_arrays(states):
+    # One dict of hourly values per scenario → arrays of shape (scenarios, hours).
+    def column(key, default=np.nan):
+        return np.array([[default if state.get(key) is None else state[key] for state in row] for row in states], dtype=float)
+
+    ceilings = [[min((base for cover, base, _ in state.get("clouds", ()) if cover in ("BKN", "OVC", "VV") and base is not None),
+                     default=np.inf) for state in row] for row in states]
+    no_go = [[any(code in wx for wx in state.get("weather", ()) for code in NO_GO_WEATHER) for state in row] for row in states]
+    arrays = {key: column(key) for key in WIND_FIELDS}
+    arrays["wind_speed_kt"] = np.nan_to_num(arrays["wind_speed_kt"])
+    arrays["visibility_sm"] = column("visibility_sm", np.inf)
+    arrays["ceiling_ft"] = np.array(ceilings, dtype=float)
+    arrays["no_go_weather"] = np.array(no_go, dtype=bool)
+    arrays["weather"] = np.array([[" ".join(state.get("weather", ())) for state in row] for row in states], dtype=object)
+    return arrays
+
+
+def timeline(taf, oat_c=15.0, altimeter_inhg=metar.STANDARD_ALTIMETER_INHG, observed_at=None, include_prob=True):
+    """Hourly forecast arrays of shape (scenarios, hours) plus ``times`` (hours,) and per-scenario ``kind``/``probability``.
+
+    ``oat_c`` and ``altimeter_inhg`` are the current observation, taken at
+    ``observed_at`` (default: the start of the TAF). With ``include_prob``
+    False, PROB groups add no scenario.
+    """
+    n_hours = max(int((taf.valid_to - taf.valid_from).total_seconds() // 3600), 1)
+    times = [taf.valid_from + timedelta(hours=h) for h in range(n_hours)]
+    initial, changes = taf.groups[0], taf.groups[1:]
+
+    prevailing = []
+    state = dict(initial.fields)
+    pending = [group for group in changes if group.kind in ("FM", "BECMG")]
+    for time in times:
+        for group in [group for group in pending if (group.start if group.kind == "FM" else group.end) <= time]:
+            state = dict(group.fields) if group.kind == "FM" else {**state, **group.fields}
+            pending.remove(group)
+        prevailing.append(state)
+
+    overlays = [group for group in changes if group.kind in ("TEMPO", "BECMG") or (group.kind == "PROB" and include_prob)]
+    states = [prevailing]
+    for group in overlays:
+        states.append([{**base, **group.fields} if group.start <= time < group.end else base
+                       for time, base in zip(times, prevailing)])
+    arrays = _state_arrays(states)
+
+    hours = np.array([(time - taf.valid_from).total_seconds() / 3600 for time in times])
+    observed_at = taf.valid_from if observed_at is None else observed_at
+    points = [((observed_at - taf.valid_from).total_seconds() / 3600, float(oat_c))]
+    points += [((when - taf.valid_from).total_seconds() / 3600, float(temp)) for when, temp in taf.temperatures]
+    points.sort()
+    arrays["oat_c"] = np.broadcast_to(np.interp(hours, *zip(*points)), arrays["wind_speed_kt"].shape)
+    arrays["altimeter_inhg"] = np.full(arrays["wind_speed_kt"].shape, float(altimeter_inhg))
+    arrays["times"] = np.array(times, dtype=object)
+    arrays["kind"] = ("PREVAILING",) + tuple(group.kind for group in overlays)
+    arrays["probability"] = np.array([100] + [group.probability for group in overlays])
+    return arrays
+
+
+def forecast(data, hourly, runway_table, weight_lbs, runway_condition=performance.RUNWAY_CONDITION_NAMES[0],
+             min_climb_fpm=0, max_crosswind_kt=wind.DEFAULT_MAX_CROSSWIND_KT, to_50ft=True, hover_margin_ft=0,
+             min_ceiling_ft=MIN_CEILING_FT, min_visibility_sm=MIN_VISIBILITY_SM):
+    """Hour-by-hour go/no-go for one strip: arrays of shape A + (hours,) for aircraft shape A, worst scenario kept.
+
+    ``data`` is one record or per-aircraft rows (``database().rows(names)``);
+    ``weight_lbs`` broadcasts with it. ``runway_table`` is wind.runways() for a
+    single strip. An hour is ``go`` when, in every scenario, the weather is at
+    or above the ceiling and visibility minimums with no thunderstorm, hail or
+    squall, the climb rate meets ``min_climb_fpm`` and — for fixed-wing types —
+    some runway end is usable (wind.evaluate) or — for helicopters — the weight
+    is within the OGE hover limit (hover.max_hover_weight) ``hover_margin_ft``
+    above the field.
+    """
+    aircraft_shape = np.broadcast(np.asarray(data["max_takeoff_weight_lbs"]), np.asarray(weight_lbs)).shape
+    # Aircraft axes first, then (scenarios, hours); wind.evaluate appends (strips, ends).
+    def expand(value, axes):
+        return value[(Ellipsis,) + (None,) * axes] if isinstance(value, np.ndarray) else value
+
+    rows = expand(data, 2)
+    weight = expand(np.broadcast_to(np.asarray(weight_lbs, dtype=float), aircraft_shape), 2)
+
+    runway = wind.evaluate(expand(data, 4), runway_table, *(hourly[key] for key in WIND_FIELDS), hourly["oat_c"],
+                           hourly["altimeter_inhg"], weight, runway_condition, max_crosswind_kt, to_50ft)
+    best = np.maximum(runway["best"][..., 0], 0)[..., None, None]
+
+    def at_best(key):
+        return np.take_along_axis(runway[key][..., 0, :], best[..., 0, :], axis=-1)[..., 0]
+
+    pressure_alt = metar.pressure_altitude(runway_table["elevation_ft"][0], hourly["altimeter_inhg"])
+    da = performance.density_altitude(pressure_alt, hourly["oat_c"])
+    climb = performance.climb_rate(rows, pressure_alt, hourly["oat_c"], weight)
+    _, oge = hover.hover_margins(rows, pressure_alt, hourly["oat_c"], weight)
+    hover_ok = weight <= hover.max_hover_weight(rows, pressure_alt, hourly["oat_c"], margin_ft=hover_margin_ft)
+    helicopter = expand(np.broadcast_to(performance.is_helicopter(data), aircraft_shape), 2)
+    weather_ok = ((hourly["ceiling_ft"] >= min_ceiling_ft) & (hourly["visibility_sm"] >= min_visibility_sm)
+                  & ~hourly["no_go_weather"])
+    runway_ok = runway["best"][..., 0] >= 0
+    go = (weather_ok & (climb >= min_climb_fpm) & (weight <= rows["max_takeoff_weight_lbs"])
+          & np.where(helicopter, hover_ok, runway_ok))
+
+    worst_hour = {
+        "density_altitude_ft": np.broadcast_to(da, go.shape).max(axis=-2),
+        "headwind_kt": np.where(runway_ok, at_best("headwind_kt"), np.nan).min(axis=-2),
+        "crosswind_kt": np.where(runway_ok, at_best("crosswind_kt"), np.nan).max(axis=-2),
+        "takeoff_to_50ft_ft": np.where(runway_ok, at_best("takeoff_to_50ft_ft"), np.nan).max(axis=-2),
+        "margin_ft": np.where(runway_ok, at_best("margin_ft"), -np.inf).min(axis=-2),
+        "climb_rate_fpm": np.broadcast_to(climb, go.shape).min(axis=-2),
+        "hover_margin_ft": np.where(helicopter, oge, np.nan).min(axis=-2),
+        "weather_ok": np.broadcast_to(weather_ok, go.shape).all(axis=-2),
+        "go": go.all(axis=-2),
+    }
+    runway_ids = runway_table["ident"][0][np.maximum(runway["best"][..., 0], 0)]
+    worst_hour["runway"] = np.where(runway_ok[..., 0, :] & ~helicopter[..., 0, :], runway_ids[..., 0, :], "")
+    return worst_hour
+
+
+def launch_window(go):
+    """(start, stop) hour indexes of the longest run of go hours along the last axis; (0, 0) when there is none.
+
+    Earlier windows win ties.
+    """
+    go = np.asarray(go, dtype=bool)
+    padded = np.concatenate([np.zeros(go.shape[:-1] + (1,), bool), go, np.zeros(go.shape[:-1] + (1,), bool)], axis=-1)
+    edges = np.diff(padded.astype(np.int8), axis=-1)
+    starts = np.where(edges == 1, np.arange(edges.shape[-1]), -1)
+    stops = np.where(edges == -1, np.arange(edges.shape[-1]), -1)
+    # Pair every stop with the latest start before it: runs never overlap, so that start is its own.
+    latest_start = np.maximum.accumulate(starts, axis=-1)
+    lengths = np.where(stops >= 0, stops - latest_start, 0)
+    stop = lengths.argmax(axis=-1)
+    length = np.take_along_axis(lengths, stop[..., None], axis=-1)[..., 0]
+    start = stop - length
+    return start, stop
@@ -0,0 +1,354 @@
+"""METAR/TAF fetch layer: pooled HTTP session, concurrent fetches and a TTL cache.
+
+One WeatherClient is meant to be shared by every session in the process. Reports
+are cached per (kind, ICAO) — METARs for METAR_TTL_S, TAFs for TAF_TTL_S — and with
+``stale_ok=True`` an expired report is returned immediately while a background
+refresh runs (stale-while-revalidate). The URL templates are constructor
+arguments so the client can be pointed at a local stub server.
+
+With a ``cache_path`` the last good report per station is also kept on disk, so
+a restarted app at a strip without connectivity still has the most recent
+METAR/TAF (flagged ``offline`` and labelled with its age). Passing
+``offline=True`` never touches the network; a connection failure or timeout
+puts the whole client offline for ERROR_TTL_S so one dead link costs a single
+short timeout rather than one per station and report kind.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+
+import requests
+from requests.adapters import HTTPAdapter
+
+METAR_URL = "https://tgftp.nws.noaa.gov/data/observations/metar/stations/{icao}.TXT"
+TAF_URL = "https://aviationweather.gov/api/data/taf?ids={icao}&format=raw"
+# Bulk endpoints take a comma-separated id list in one request.
+BULK_METAR_URL = "https://aviationweather.gov/api/data/metar?ids={ids}&format=raw"
+BULK_TAF_URL = "https://aviationweather.gov/api/data/taf?ids={ids}&format=raw"
+
+CACHE_PATH = os.path.join("data", "cache", "weather.json")
+CACHE_VERSION = 1
+# (connect, read) seconds; a strip without connectivity should not stall a rerun.
+TIMEOUT_S = (2, 5)
+
+METAR_TTL_S = 5 * 60
+TAF_TTL_S = 30 * 60
+# Failed fetches are remembered briefly so a down server is not hit on every rerun.
+ERROR_TTL_S = 60
+# The DDHHMMZ issue time in a TAF header ("TAF AMD KELN 181130Z 1812/1912 ...").
+_TAF_ISSUED = re.compile(r"(?<!\S)\d{6}Z(?!\S)")
+
+
+@dataclass(frozen=True)
+class Report:
+    icao: str
+    kind: str
+    text: str = None
+    issued: str = None
+    fetched_at: float = 0.0
+    error: str = None
+    stale: bool = False
+    offline: bool = False
+
+    @property
+    def age_s(self):
+        return time.time() - self.fetched_at
+
+
+def parse_metar_response(icao, body, fetched_at):
+    lines = body.strip().splitlines()
+    if len(lines) >= 2:
+        return Report(icao, "metar", text=lines[1].strip(), issued=lines[0].strip(), fetched_at=fetched_at)
+    if lines:
+        return Report(icao, "metar", text=lines[0].strip(), fetched_at=fetched_at)
+    return Report(icao, "metar", fetched_at=fetched_at, error="empty response")
+
+
+def parse_taf_response(icao, body, fetched_at):
+    text = body.strip()
+    if not text:
+        return Report(icao, "taf", fetched_at=fetched_at, error="empty response")
+    issued = _TAF_ISSUED.search(text.split("/", 1)[0])
+    return Report(icao, "taf", text=text, issued=issued[0] if issued else None, fetched_at=fetched_at)
+
+
+def split_bulk_response(kind, body, icaos):
+    """Split a multi-station raw response into {ICAO: text}; stations not present are omitted."""
+    wanted = set(icaos)
+    blocks = {}
+    current = None
+    for line in body.strip().splitlines():
+        tokens = line.split()
+        if not tokens:
+            current = None
+            continue
+        if not line[0].isspace():
+            words = [token for token in tokens[:3] if token not in ("METAR", "SPECI", "TAF", "AMD", "COR")]
+            if words and words[0] in wanted:
+                current = words[0]
+                blocks[current] = [line.strip()] if kind == "metar" else [line.rstrip()]
+                continue
+        if current is not None and kind == "taf":
+            blocks[current].append(line.rstrip())
+    return {icao: "\n".join(lines) for icao, lines in blocks.items()}
+
+
+class WeatherClient:
+    def __init__(self, metar_url=METAR_URL, taf_url=TAF_URL, timeout=TIMEOUT_S, max_workers=8,
+                 metar_ttl_s=METAR_TTL_S, taf_ttl_s=TAF_TTL_S,
+                 bulk_metar_url=BULK_METAR_URL, bulk_taf_url=BULK_TAF_URL, cache_path=None):
+        self.urls = {"metar": metar_url, "taf": taf_url}
+        self.bulk_urls = {"metar": bulk_metar_url, "taf": bulk_taf_url}
+        self.ttls = {"metar": metar_ttl_s, "taf": taf_ttl_s}
+        self.parsers = {"metar": parse_metar_response, "taf": parse_taf_response}
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agpilot-weather")
+        self._kind_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agpilot-weather-kind")
+        # Bulk refreshes claim their in-flight entries before they start, so they must never
+        # queue behind tasks that may wait on those entries.
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="agpilot-weather-refresh")
+        self._cache = {}
+        self._inflight = {}
+        self._failed_at = {}
+        self._offline_until = 0.0
+        self._lock = threading.Lock()
+        self.cache_path = cache_path
+        self._save_lock = threading.Lock()
+        if cache_path:
+            self._cache.update(self._load_saved())
+
+    @property
+    def network_down(self):
+        return time.time() < self._offline_until
+
+    def metar(self, icao, stale_ok=False, offline=False):
+        return self._report("metar", icao.upper(), stale_ok, offline)
+
+    def taf(self, icao, stale_ok=False, offline=False):
+        return self._report("taf", icao.upper(), stale_ok, offline)
+
+    def station(self, icao, stale_ok=False, offline=False):
+        """METAR and TAF for one station, fetched concurrently when not cached."""
+        icao = icao.upper()
+        taf = self._executor.submit(self._report, "taf", icao, stale_ok, offline)
+        metar = self._report("metar", icao, stale_ok, offline)
+        return metar, taf.result()
+
+    def stations(self, icaos, stale_ok=False, offline=False):
+        """METAR and TAF for many stations: {ICAO: (metar, taf)}.
+
+        Stations needing a fetch are requested with one bulk call per report kind;
+        any the bulk call could not supply fall back to concurrent per-station fetches.
+        With ``stale_ok``, expired reports are returned at once and refreshed by
+        one background bulk call per report kind.
+        """
+        icaos = list(dict.fromkeys(icao.upper() for icao in icaos))
+        # The per-kind work waits on self._executor, so it runs on its own pool; a task
+        # blocking on the pool it runs in deadlocks once every worker is doing so.
+        tafs = self._kind_executor.submit(self._kind_reports, "taf", icaos, stale_ok, offline)
+        metars = self._kind_reports("metar", icaos, stale_ok, offline)
+        tafs = tafs.result()
+        return {icao: (metars[icao], tafs[icao]) for icao in icaos}
+
+    def _kind_reports(self, kind, icaos, stale_ok, offline):
+        reports = {}
+        missing = []
+        expired = []
+        for icao in icaos:
+            report = self.cached(kind, icao)
+            if offline or self.network_down or (report is not None and self._is_fresh(report)):
+                reports[icao] = self._report(kind, icao, stale_ok, offline)
+            elif report is not None and report.text and (stale_ok or self._failed_recently(kind, icao)):
+                reports[icao] = replace(report, stale=True)
+                if stale_ok and not self._failed_recently(kind, icao):
+                    expired.append(icao)
+            else:
+                missing.append(icao)
+        if expired:
+            self._refresh(kind, expired)
+        if len(missing) > 1 and self.bulk_urls[kind] and not self.network_down:
+            reports.update(self._fetch_bulk(kind, missing))
+        fallback = [icao for icao in missing if icao not in reports]
+        reports.update(zip(fallback, self._executor.map(lambda icao: self._report(kind, icao, stale_ok, offline), fallback)))
+        return reports
+
+    def _refresh(self, kind, icaos):
+        """Refresh expired reports in the background: one bulk call, then per-station fetches for the rest."""
+        claimed = {}
+        with self._lock:
+            for icao in icaos:
+                if (kind, icao) not in self._inflight:
+                    claimed[icao] = self._inflight[(kind, icao)] = Future()
+        if claimed:
+            self._refresh_executor.submit(self._refresh_claimed, kind, claimed)
+
+    def _refresh_claimed(self, kind, claimed):
+        try:
+            icaos = list(claimed)
+            reports = self._fetch_bulk(kind, icaos) if len(icaos) > 1 and self.bulk_urls[kind] else {}
+            for icao in icaos:
+                if icao not in reports:
+                    reports[icao] = self._fetch(kind, icao) if not self.network_down else replace(
+                        self.cached(kind, icao), stale=True)
+            for icao, future in claimed.items():
+                future.set_result(reports[icao])
+        except BaseException as e:
+            for future in claimed.values():
+                if not future.done():
+                    future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                for icao in claimed:
+                    del self._inflight[(kind, icao)]
+
+    def cached(self, kind, icao):
+        with self._lock:
+            return self._cache.get((kind, icao.upper()))
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def close(self):
+        self._kind_executor.shutdown(wait=False)
+        self._refresh_executor.shutdown(wait=False)
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    def _failed_recently(self, kind, icao):
+        return time.time() - self._failed_at.get((kind, icao), 0) < ERROR_TTL_S
+
+    def _is_fresh(self, report):
+        ttl = ERROR_TTL_S if report.error else self.ttls[report.kind]
+        return report.age_s < ttl
+
+    def _report(self, kind, icao, stale_ok, offline=False):
+        report = self.cached(kind, icao)
+        if report is not None and self._is_fresh(report) and not offline:
+            return report
+        if offline or self.network_down:
+            if report is not None and report.text:
+                return replace(report, stale=True, offline=True, error=None)
+            reason = "offline" if offline else "network unreachable"
+            return Report(icao, kind, fetched_at=time.time(), error=f"{reason} – no saved report", offline=True)
+        if report is not None and report.text and self._failed_recently(kind, icao):
+            return replace(report, stale=True)
+        if report is not None and stale_ok and report.text:
+            with self._lock:
+                refreshing = (kind, icao) in self._inflight
+            if not refreshing:
+                self._executor.submit(self._fetch_once, kind, icao)
+            return replace(report, stale=True)
+        return self._fetch_once(kind, icao)
+
+    def _fetch_once(self, kind, icao):
+        """Fetch, sharing a single in-flight request between concurrent callers."""
+        key = (kind, icao)
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            report = self._fetch(kind, icao)
+            future.set_result(report)
+            return report
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _fetch_bulk(self, kind, icaos):
+        fetched_at = time.time()
+        try:
+            response = self.session.get(self.bulk_urls[kind].format(ids=",".join(icaos)), timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            self._offline_until = time.time() + ERROR_TTL_S
+            return {}
+        except requests.RequestException:
+            return {}
+        if response.status_code != 200:
+            return {}
+        texts = split_bulk_response(kind, response.text, icaos)
+        reports = {}
+        with self._lock:
+            for icao in icaos:
+                if icao in texts:
+                    report = self.parsers[kind](icao, texts[icao], fetched_at)
+                elif kind == "taf":
+                    # A successful bulk answer without this station means it issues no TAF.
+                    report = Report(icao, kind, fetched_at=fetched_at, error="no TAF issued")
+                else:
+                    continue
+                self._failed_at.pop((kind, icao), None)
+                self._cache[(kind, icao)] = reports[icao] = report
+        self._save()
+        return reports
+
+    def _fetch(self, kind, icao):
+        fetched_at = time.time()
+        try:
+            response = self.session.get(self.urls[kind].format(icao=icao), timeout=self.timeout)
+            if response.status_code == 200:
+                report = self.parsers[kind](icao, response.text, fetched_at)
+            else:
+                report = Report(icao, kind, fetched_at=fetched_at, error=f"HTTP {response.status_code}")
+        except (requests.ConnectionError, requests.Timeout) as e:
+            self._offline_until = time.time() + ERROR_TTL_S
+            report = Report(icao, kind, fetched_at=fetched_at, error=str(e))
+        except requests.RequestException as e:
+            report = Report(icao, kind, fetched_at=fetched_at, error=str(e))
+        with self._lock:
+            previous = self._cache.get((kind, icao))
+            if report.error and previous is not None and previous.text:
+                # Keep serving the last good report, flagged stale, until a fetch succeeds.
+                self._failed_at[(kind, icao)] = fetched_at
+                report = replace(previous, stale=True, error=report.error)
+            else:
+                self._failed_at.pop((kind, icao), None)
+                self._cache[(kind, icao)] = report
+        if report.text and not report.stale:
+            self._save()
+        return report
+
+    def _load_saved(self):
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                document = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(document, dict) or document.get("version") != CACHE_VERSION:
+            return {}
+        return {(saved["kind"], saved["icao"]): Report(**saved) for saved in document.get("reports", [])}
+
+    def _save(self):
+        """Write every report with text to ``cache_path`` (atomically; failures are ignored)."""
+        if not self.cache_path:
+            return
+        with self._lock:
+            reports = [{"icao": report.icao, "kind": report.kind, "text": report.text, "issued": report.issued,
+                        "fetched_at": report.fetched_at}
+                       for report in self._cache.values() if report.text and not report.stale]
+        with self._save_lock:
+            tmp = f"{self.cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump({"version": CACHE_VERSION, "reports": reports}, f)
+                os.replace(tmp, self.cache_path)
+            except OSError:
+                pass
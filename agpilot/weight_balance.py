@@ -0,0 +1,144 @@
+"""Center of gravity: station moments, the burn/dump trajectory and envelope checks.
+
+A sortie is modelled as a straight line through the loading: fuel burns off
+linearly over the whole sortie while the hopper empties linearly across the
+spray window. trajectory() evaluates weight, moment and CG at every step along a
+trailing axis for plotting, and checks the whole path against the type's
+(convex) CG envelope exactly: weight and moment are piecewise linear in time,
+so each piece is tested edge by edge in closed form rather than point by
+point. A day of sorties (per-row arrays from agpilot.loadplan.stack_aircraft)
+is one call.
+"""
+
+import numpy as np
+
+TRAJECTORY_STEPS = 41
+# Fraction of the sortie (ferry out → spray → ferry back) during which the hopper is emptied.
+SPRAY_WINDOW = (0.2, 0.8)
+# Envelope edges are inclusive; points this close to an edge (in the arm/weight plane) count as inside.
+EDGE_TOLERANCE = 1e-6
+
+
+def loading(data, fuel_gal, hopper_gal, pilot_weight_lbs, empty_weight_lbs=None, empty_arm_in=None):
+    """Total weight (lbs), moment (in·lbs) and CG (in aft of datum); all inputs broadcast."""
+    if empty_weight_lbs is None:
+        empty_weight_lbs = data["base_empty_weight_lbs"]
+    if empty_arm_in is None:
+        empty_arm_in = data["empty_arm_in"]
+    fuel_weight = np.asarray(fuel_gal, dtype=float) * data["fuel_weight_per_gal"]
+    hopper_weight = np.asarray(hopper_gal, dtype=float) * data["hopper_weight_per_gal"]
+    weight = empty_weight_lbs + fuel_weight + hopper_weight + pilot_weight_lbs
+    moment = (np.multiply(empty_weight_lbs, empty_arm_in) + fuel_weight * data["fuel_arm_in"]
+              + hopper_weight * data["hopper_arm_in"] + np.multiply(pilot_weight_lbs, data["pilot_arm_in"]))
+    return weight, moment, moment / weight
+
+
+def point_in_polygon(x, y, polygon):
+    """Whether each (x, y) lies inside or on ``polygon``, an (..., V, 2) vertex array.
+
+    Crossing-number test vectorized over points and edges; the polygon's leading
+    dimensions broadcast against ``x`` and ``y``. Polygons may be padded with
+    repeated vertices, since zero-length edges never count as a crossing.
+    """
+    polygon = np.asarray(polygon, dtype=float)
+    x = np.asarray(x, dtype=float)[..., None]
+    y = np.asarray(y, dtype=float)[..., None]
+    x1, y1 = polygon[..., 0], polygon[..., 1]
+    x2, y2 = np.roll(x1, -1, axis=-1), np.roll(y1, -1, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    crossings = ((y1 > y) != (y2 > y)) & (x < x_cross)
+    inside = np.count_nonzero(crossings, axis=-1) % 2 == 1
+
+    cross = (x2 - x1) * (y - y1) - (y2 - y1) * (x - x1)
+    on_line = np.abs(cross) <= EDGE_TOLERANCE * np.hypot(x2 - x1, y2 - y1)
+    within = ((np.minimum(x1, x2) - EDGE_TOLERANCE <= x) & (x <= np.maximum(x1, x2) + EDGE_TOLERANCE)
+              & (np.minimum(y1, y2) - EDGE_TOLERANCE <= y) & (y <= np.maximum(y1, y2) + EDGE_TOLERANCE))
+    return inside | (on_line & within).any(axis=-1)
+
+
+def path_in_polygon(weight0, moment0, weight1, moment1, polygon):
+    """Whether the loading path from (weight0, moment0) to (weight1, moment1) stays inside or on ``polygon``.
+
+    Weight and moment change linearly along the path, so the CG is
+    moment / weight. ``polygon`` is a convex (..., V, 2) [arm, weight] vertex
+    array in either winding (padding with repeated vertices is fine). Against each
+    edge line, (signed distance × weight) is quadratic in the path parameter,
+    so its minimum over the path is at an end or at the parabola's vertex.
+    """
+    polygon = np.asarray(polygon, dtype=float)
+    x1, y1 = polygon[..., 0], polygon[..., 1]
+    dx = np.roll(x1, -1, axis=-1) - x1
+    dy = np.roll(y1, -1, axis=-1) - y1
+    # Shoelace sign: +1 counter-clockwise, −1 clockwise; inside is on the left of each edge for +1.
+    sign = np.sign(np.sum(x1 * dy - y1 * dx, axis=-1))[..., None]
+    w0, m0 = (np.asarray(value, dtype=float)[..., None] for value in (weight0, moment0))
+    dw = np.asarray(weight1, dtype=float)[..., None] - w0
+    dm = np.asarray(moment1, dtype=float)[..., None] - m0
+
+    # q(u) = sign · (dx·(W − y1) − dy·(cg − x1)) · W  with  W = w0 + u·dw,  cg·W = m0 + u·dm.
+    a2 = sign * dx * dw ** 2
+    a1 = sign * (2 * dx * w0 * dw + (dy * x1 - dx * y1) * dw - dy * dm)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vertex = np.where(a2 > 0, np.clip(-a1 / (2 * a2), 0.0, 1.0), 0.0)
+    tolerance = EDGE_TOLERANCE * np.hypot(dx, dy)
+    inside = True
+    for u in (0.0, 1.0, vertex):
+        weight = w0 + u * dw
+        distance = sign * (dx * (weight - y1) - dy * ((m0 + u * dm) / weight - x1))
+        inside = inside & (distance >= -tolerance).all(axis=-1)
+    return inside
+
+
+def envelope_polygons(aircraft_db, names):
+    """CG envelopes for ``names`` as one (N, V, 2) array, shorter polygons padded with their last vertex."""
+    unique, inverse = np.unique(np.asarray(names, dtype=str), return_inverse=True)
+    envelopes = [np.asarray(aircraft_db[name]["cg_envelope"], dtype=float) for name in unique]
+    n_vertices = max(len(envelope) for envelope in envelopes)
+    padded = np.stack([np.pad(envelope, ((0, n_vertices - len(envelope)), (0, 0)), mode="edge") for envelope in envelopes])
+    return padded[inverse]
+
+
+def trajectory(data, fuel_gal, hopper_gal, pilot_weight_lbs, fuel_burn_gal=None, empty_weight_lbs=None,
+               empty_arm_in=None, envelope=None, steps=TRAJECTORY_STEPS, spray_window=SPRAY_WINDOW):
+    """Weight, moment and CG through a sortie, with per-step and whole-sortie envelope checks.
+
+    Every input broadcasts; results gain a trailing axis of ``steps`` points from takeoff
+    to landing (``steps=1`` gives the takeoff point only). ``cg_ok`` covers the whole
+    path, not only those points. ``fuel_burn_gal`` defaults to the whole fuel load, which
+    sweeps every fuel state the sortie could reach. ``envelope`` defaults to
+    ``data["cg_envelope"]``; pass envelope_polygons() output when ``data`` holds per-row arrays.
+    """
+    fuel_gal = np.asarray(fuel_gal, dtype=float)
+    fuel_burn_gal = fuel_gal if fuel_burn_gal is None else np.asarray(fuel_burn_gal, dtype=float)
+    hopper_gal = np.asarray(hopper_gal, dtype=float)
+    start, end = spray_window
+    stepped = {key: np.asarray(data[key], dtype=float)[..., None] for key in (
+        "base_empty_weight_lbs", "empty_arm_in", "fuel_weight_per_gal", "fuel_arm_in",
+        "hopper_weight_per_gal", "hopper_arm_in", "pilot_arm_in")}
+    per_step = [None if value is None else np.asarray(value, dtype=float)[..., None]
+                for value in (pilot_weight_lbs, empty_weight_lbs, empty_arm_in)]
+
+    def at(t):
+        fuel = np.maximum(fuel_gal[..., None] - fuel_burn_gal[..., None] * t, 0.0)
+        hopper = hopper_gal[..., None] * np.clip((end - t) / (end - start), 0.0, 1.0)
+        return loading(stepped, fuel, hopper, *per_step)
+
+    weight, moment, cg = at(np.linspace(0.0, 1.0, steps))
+    envelope = np.asarray(data["cg_envelope"] if envelope is None else envelope, dtype=float)
+    in_envelope = point_in_polygon(cg, weight, envelope[..., None, :, :])
+
+    # Loading is linear in t between these breakpoints: the spray window and where the fuel runs out.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dry = np.where(fuel_burn_gal > 0, fuel_gal / fuel_burn_gal, 1.0)
+    breaks = np.broadcast_arrays(0.0, start, end, 1.0, np.clip(dry, 0.0, 1.0))
+    node_weight, node_moment, _ = at(np.sort(np.stack(breaks, axis=-1), axis=-1))
+    cg_ok = path_in_polygon(node_weight[..., :-1], node_moment[..., :-1], node_weight[..., 1:], node_moment[..., 1:],
+                            envelope[..., None, :, :]).all(axis=-1)
+    return {
+        "weight_lbs": weight,
+        "moment_in_lbs": moment,
+        "cg_in": cg,
+        "in_envelope": in_envelope,
+        "cg_ok": cg_ok,
+    }
@@ -0,0 +1,200 @@
+"""Wind components against runway and strip headings.
+
+Reported wind (direction in degrees true, speed, gust and a variable range
+such as 250V310) is resolved against every runway end into a headwind (+) /
+tailwind (−) component and a crosswind component, taken conservatively:
+
+- headwind is credited at the steady speed only; a tailwind is taken at the gust;
+- crosswind is taken at the gust;
+- a variable range uses its worst direction for each component, and VRB wind
+  is treated as able to come from anywhere (full tailwind and full crosswind).
+
+Runways come from strips.json (shipped next to this module): public airports
+and private strips with their elevation, magnetic variation and runways as
+magnetic headings. runways() lays any set of strips out as padded
+(strips, ends) arrays, and evaluate() pushes wind arrays of any leading shape
+— e.g. one entry per TAF hour — through agpilot.performance against all of
+them at once, so every strip × every hour is one vectorized pass. Strip data
+are representative values for planning, not survey data.
+"""
+
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from agpilot import metar, performance
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "strips.json")
+SCHEMA_VERSION = 1
+DEFAULT_MAX_CROSSWIND_KT = 15.0
+STANDARD_ALTIMETER_INHG = metar.STANDARD_ALTIMETER_INHG
+OUTPUTS = ("headwind_kt", "crosswind_kt", "takeoff_ground_roll_ft", "takeoff_to_50ft_ft",
+           "landing_ground_roll_ft", "landing_from_50ft_ft")
+
+
+def read_strips(path):
+    """Parse a strip file into a list of validated strip dicts."""
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    if document.get("version") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported strip file version {document.get('version')!r}")
+    for strip in document["strips"]:
+        missing = [field for field in ("id", "elevation_ft", "runways") if field not in strip]
+        if missing:
+            raise ValueError(f"{path}: {strip.get('id', '?')} is missing {', '.join(missing)}")
+    return document["strips"]
+
+
+@lru_cache(maxsize=None)
+def strips(path=DATA_PATH):
+    """Strip id → strip dict."""
+    return {strip["id"]: strip for strip in read_strips(path)}
+
+
+def runway_ends(ident, heading_deg):
+    """Both ends of one runway: ((ident, magnetic heading), ...), e.g. "16L/34R" → (("16L", 160), ("34R", 340))."""
+    first, _, second = ident.partition("/")
+    ends = [(first, heading_deg % 360)]
+    if second:
+        ends.append((second, (heading_deg + 180) % 360))
+    return tuple(ends)
+
+
+@lru_cache(maxsize=64)
+def runways(ids=None, path=DATA_PATH):
+    """Runway ends of the strips ``ids`` (a tuple; all strips by default) as padded (strips, ends) arrays.
+
+    Returns a dict: ``ids``, ``elevation_ft`` (strips,), ``ident``,
+    ``heading_deg`` (true), ``length_ft`` and ``valid`` (strips, ends); padding
+    ends have NaN heading and length and ``valid`` False.
+    """
+    table = strips(path)
+    ids = tuple(table) if ids is None else tuple(ids)
+    ends = []
+    for strip_id in ids:
+        strip = table[strip_id]
+        variation = strip.get("variation_deg", 0)
+        ends.append([(ident, (heading + variation) % 360, runway["length_ft"])
+                     for runway in strip["runways"] for ident, heading in runway_ends(runway["ident"], runway["heading_deg"])])
+    width = max(map(len, ends), default=0)
+    shape = (len(ids), width)
+    ident = np.full(shape, "", dtype=f"U{max((len(end[0]) for row in ends for end in row), default=1)}")
+    heading = np.full(shape, np.nan)
+    length = np.full(shape, np.nan)
+    for row, strip_ends in enumerate(ends):
+        for col, (name, true_heading, length_ft) in enumerate(strip_ends):
+            ident[row, col], heading[row, col], length[row, col] = name, true_heading, length_ft
+    result = {
+        "ids": ids,
+        "elevation_ft": np.array([table[strip_id]["elevation_ft"] for strip_id in ids], dtype=float),
+        "ident": ident,
+        "heading_deg": heading,
+        "length_ft": length,
+        "valid": ~np.isnan(heading),
+    }
+    for value in result.values():
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+    return result
+
+
+def _contains(angle, start, width):
+    # Is ``angle`` on the clockwise arc of ``width`` degrees from ``start``?
+    return (angle - start) % 360 <= width
+
+
+def components(wind_dir_deg, wind_speed_kt, runway_heading_deg, gust_kt=None, var_from_deg=None, var_to_deg=None):
+    """Conservative (headwind, crosswind) in knots; all arguments broadcast.
+
+    ``wind_dir_deg`` is NaN (or None) for VRB; ``gust_kt`` and the variable range
+    may be NaN/None where not reported. Headwind is signed (+ head, − tail),
+    crosswind is the magnitude from the worse side.
+    """
+    direction = np.asarray(np.nan if wind_dir_deg is None else wind_dir_deg, dtype=float)
+    speed = np.asarray(wind_speed_kt, dtype=float)
+    heading = np.asarray(runway_heading_deg, dtype=float)
+    gust = speed if gust_kt is None else np.fmax(np.asarray(gust_kt, dtype=float), speed)
+    var_from = np.asarray(np.nan if var_from_deg is None else var_from_deg, dtype=float)
+    var_to = np.asarray(np.nan if var_to_deg is None else var_to_deg, dtype=float)
+
+    # The arc of possible directions: the variable range when reported, else the single direction.
+    ranged = ~np.isnan(var_from) & ~np.isnan(var_to)
+    start = np.where(ranged, var_from, direction) - heading
+    width = np.where(ranged, (var_to - var_from) % 360, 0.0)
+    end = start + width
+    cos_min = np.minimum(np.cos(np.radians(start)), np.cos(np.radians(end)))
+    cos_min = np.where(_contains(180.0, start, width), -1.0, cos_min)
+    sin_max = np.maximum(np.abs(np.sin(np.radians(start))), np.abs(np.sin(np.radians(end))))
+    sin_max = np.where(_contains(90.0, start, width) | _contains(270.0, start, width), 1.0, sin_max)
+    variable = np.isnan(direction) & ~ranged
+    cos_min = np.where(variable, -1.0, cos_min)
+    sin_max = np.where(variable, 1.0, sin_max)
+
+    headwind = np.where(cos_min > 0, speed * cos_min, gust * cos_min)
+    return headwind, gust * sin_max
+
+
+def evaluate(data, runway_table, wind_dir_deg, wind_speed_kt, gust_kt=None, var_from_deg=None, var_to_deg=None,
+             oat_c=15.0, altimeter_inhg=STANDARD_ALTIMETER_INHG, weight_lbs=None,
+             runway_condition=performance.RUNWAY_CONDITION_NAMES[0], max_crosswind_kt=DEFAULT_MAX_CROSSWIND_KT,
+             to_50ft=True, per_strip=False):
+    """Takeoff and landing on every runway end of ``runway_table`` (from runways()) for every wind.
+
+    Wind, temperature, altimeter and weight arrays share a leading shape ``S``
+    (scalars for one observation, (hours,) for a TAF timeline); every output
+    has shape S + (strips, ends). With ``per_strip`` the last axis of those
+    arrays is the strip axis instead (each strip with its own station's
+    weather), and outputs have shape S[:-1] + (strips, ends).
+
+    ``weight_lbs`` defaults to the maximum takeoff weight. An end is ``usable``
+    when it is a real end, the crosswind is within ``max_crosswind_kt`` and both
+    the takeoff and the landing distance (over 50 ft when ``to_50ft``, else
+    ground roll) fit the runway; ``margin_ft`` is the runway left over after the
+    longer of the two. ``best`` holds, per strip, the usable end with the
+    largest margin (−1 when none is usable).
+    """
+    def conditions(value):
+        if value is None:
+            return None
+        value = np.asarray(value, dtype=float)
+        return value[..., None] if per_strip else value[..., None, None]
+
+    weight = data["max_takeoff_weight_lbs"] if weight_lbs is None else weight_lbs
+    headwind, crosswind = components(conditions(wind_dir_deg), conditions(wind_speed_kt), runway_table["heading_deg"],
+                                     conditions(gust_kt), conditions(var_from_deg), conditions(var_to_deg))
+    pressure_alt = metar.pressure_altitude(runway_table["elevation_ft"][:, None], conditions(altimeter_inhg))
+    oat, weight = conditions(oat_c), conditions(weight)
+    ground_roll, to_50 = performance.takeoff(data, pressure_alt, oat, weight, headwind, runway_condition)
+    landing_roll, from_50 = performance.landing(data, pressure_alt, oat, weight, headwind, runway_condition)
+    needed = np.maximum(to_50, from_50) if to_50ft else np.maximum(ground_roll, landing_roll)
+    margin = runway_table["length_ft"] - needed
+    usable = runway_table["valid"] & (crosswind <= max_crosswind_kt) & (margin >= 0)
+    ranked = np.where(usable, margin, -np.inf)
+    best = np.where(usable.any(axis=-1), ranked.argmax(axis=-1), -1)
+    shape = margin.shape
+    return {
+        "headwind_kt": np.broadcast_to(headwind, shape),
+        "crosswind_kt": np.broadcast_to(crosswind, shape),
+        "takeoff_ground_roll_ft": np.broadcast_to(ground_roll, shape),
+        "takeoff_to_50ft_ft": np.broadcast_to(to_50, shape),
+        "landing_ground_roll_ft": np.broadcast_to(landing_roll, shape),
+        "landing_from_50ft_ft": np.broadcast_to(from_50, shape),
+        "margin_ft": margin,
+        "usable": usable,
+        "best": best,
+    }
+
+
+def best_runway(result, runway_table, index=()):
+    """(ident, headwind_kt, crosswind_kt, margin_ft) of the best end per strip at ``index`` into the leading shape.
+
+    Strips with no usable end get (None, nan, nan, nan).
+    """
+    best = result["best"][index]
+    rows = np.arange(best.shape[-1])
+    cols = np.maximum(best, 0)
+    picked = [result[key][index][rows, cols] for key in ("headwind_kt", "crosswind_kt", "margin_ft")]
+    return [(str(runway_table["ident"][row, col]) if ok else None, *(float(value[row]) if ok else np.nan for value in picked))
+            for row, col, ok in zip(rows, cols, best >= 0)]
@@ -1,9 +1,25 @@
-from PIL import Image
 import streamlit as st
 import numpy as np
-import matplotlib.pyplot as plt
-import requests
-from datetime import datetime
+from datetime import datetime, timezone
+import glob
+import json
+import os
+
+# Feature modules behind a toggle or upload (climatology, sortie, sprayplan, taf) are imported where they are used.
+from agpilot import (assets, calculations, charts, fleet, hover, loadplan, memo, metar, montecarlo, performance, solver,
+                     wind)
+from agpilot.aircraft import AIRCRAFT_DATA
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Fast-start (default): no remote assets, no weather fetch or TFR map until asked for,
+# plotting imported only when a chart is drawn. AGPILOT_FAST_START=0 loads every panel eagerly.
+FAST_START = os.environ.get("AGPILOT_FAST_START", "1") != "0"
+# Offline: weather comes only from the on-disk cache of the last fetch and no outbound
+# call is made (the "Offline mode" toggle starts from AGPILOT_OFFLINE=1).
+OFFLINE_DEFAULT = os.environ.get("AGPILOT_OFFLINE", "0") == "1"
+# Charts are drawn in the browser from Vega-Lite specs; AGPILOT_CHART_RENDERER=png
+# falls back to server-rendered matplotlib images.
+CHART_RENDERER = os.environ.get("AGPILOT_CHART_RENDERER", "vega")
 
 # ────────────────────────────────────────────────
 # Page Config & Safe Logo
@@ -18,28 +34,36 @@ st.set_page_config(
 # Green preview theme
 st.markdown("""
     <meta name="theme-color" content="#4CAF50">
-    <link rel="icon" href="https://img.icons8.com/color/48/000000/helicopter.png" type="image/png">
 """, unsafe_allow_html=True)
 
-# Try to load custom logo from GitHub raw URL
-LOGO_URL = "https://raw.githubusercontent.com/captn357417/agpilot-app/main/AgPilotApp.png"
+# Bundled logo, downscaled once per process and served by Streamlit itself
+@st.cache_resource
+def logo_path():
+    return assets.downscaled(os.path.join(APP_DIR, "AgPilotApp.png"), 320, os.path.join(APP_DIR, "data", "cache"))
+
 try:
-    st.logo(LOGO_URL, size="medium")
+    st.logo(logo_path(), size="medium")
 except Exception:
-    try:
-        st.logo("AgPilotApp.png", size="medium")  # fallback to local
-    except Exception:
-        st.markdown("### AgPilotApp ⌯✈︎ (logo not loaded – check file/URL)")
+    st.markdown("### AgPilotApp ⌯✈︎ (logo not loaded – check AgPilotApp.png)")
+
+def pyplot():
+    """matplotlib.pyplot, imported on the first chart rather than at startup."""
+    import matplotlib.pyplot as plt
+    return plt
 
 # ────────────────────────────────────────────────
 # Session State Initialization
 # ────────────────────────────────────────────────
-if 'fleet' not in st.session_state:
-    st.session_state.fleet = []
 if 'custom_empty_weight' not in st.session_state:
     st.session_state.custom_empty_weight = None
 if 'show_risk' not in st.session_state:
     st.session_state.show_risk = False
+if 'pressure_alt_ft' not in st.session_state:
+    st.session_state.pressure_alt_ft = 0
+if 'oat_c' not in st.session_state:
+    st.session_state.oat_c = 15
+if 'wind_kts' not in st.session_state:
+    st.session_state.wind_kts = 0
 
 # ────────────────────────────────────────────────
 # Default performance values (PREVENTS NameError before first calculation)
@@ -50,451 +74,75 @@ ige_ceiling = oge_ceiling = 0
 cg_status = "Not calculated yet"
 
 # ────────────────────────────────────────────────
-# Aircraft Database
-# ────────────────────────────────────────────────
-AIRCRAFT_DATA = {
-    "Air Tractor AT-502B": {
-        "name": "Air Tractor AT-502B",
-        "base_takeoff_ground_roll_ft": 1140,
-        "base_takeoff_to_50ft_ft": 2600,
-        "base_landing_ground_roll_ft": 600,
-        "base_landing_to_50ft_ft": 1350,
-        "base_climb_rate_fpm": 870,
-        "base_stall_flaps_down_mph": 68,
-        "best_climb_speed_mph": 111,
-        "base_empty_weight_lbs": 4546,
-        "base_fuel_capacity_gal": 170,
-        "fuel_weight_per_gal": 6.0,
-        "hopper_capacity_gal": 500,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 9400,
-        "max_landing_weight_lbs": 8000,
-        "glide_ratio": 8.0,
-        "description": "Single-engine piston ag aircraft"
-    },
-    "Air Tractor AT-602": {
-        "name": "Air Tractor AT-602",
-        "base_takeoff_ground_roll_ft": 1400,
-        "base_takeoff_to_50ft_ft": 2800,
-        "base_landing_ground_roll_ft": 850,
-        "base_landing_to_50ft_ft": 1850,
-        "base_climb_rate_fpm": 1050,
-        "base_stall_flaps_down_mph": 74,
-        "best_climb_speed_mph": 118,
-        "base_empty_weight_lbs": 6200,
-        "base_fuel_capacity_gal": 380,
-        "fuel_weight_per_gal": 6.7,
-        "hopper_capacity_gal": 600,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 12500,
-        "max_landing_weight_lbs": 11000,
-        "glide_ratio": 7.2,
-        "description": "Turbine ag aircraft – balanced payload & performance",
-        "hover_ceiling_ige_max_gw": 0,
-        "hover_ceiling_oge_max_gw": 0
-    },
-    "Air Tractor AT-802": {
-        "name": "Air Tractor AT-802",
-        "base_takeoff_ground_roll_ft": 1800,
-        "base_takeoff_to_50ft_ft": 3400,
-        "base_landing_ground_roll_ft": 1100,
-        "base_landing_to_50ft_ft": 2200,
-        "base_climb_rate_fpm": 1050,
-        "base_stall_flaps_down_mph": 78,
-        "best_climb_speed_mph": 120,
-        "base_empty_weight_lbs": 6750,
-        "base_fuel_capacity_gal": 380,
-        "fuel_weight_per_gal": 6.7,
-        "hopper_capacity_gal": 800,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 16000,
-        "max_landing_weight_lbs": 14000,
-        "glide_ratio": 7.0,
-        "description": "Large turbine ag aircraft – high payload & range"
-    },
-    "Thrush 510P": {
-        "name": "Thrush 510P",
-        "base_takeoff_ground_roll_ft": 1300,
-        "base_takeoff_to_50ft_ft": 2800,
-        "base_landing_ground_roll_ft": 750,
-        "base_landing_to_50ft_ft": 1600,
-        "base_climb_rate_fpm": 950,
-        "base_stall_flaps_down_mph": 72,
-        "best_climb_speed_mph": 115,
-        "base_empty_weight_lbs": 6800,
-        "base_fuel_capacity_gal": 380,
-        "fuel_weight_per_gal": 6.0,
-        "hopper_capacity_gal": 510,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 12000,
-        "max_landing_weight_lbs": 10500,
-        "glide_ratio": 7.5,
-        "description": "Turbine-powered high-capacity ag aircraft"
-    },
-    "Ayres Thrush S2R-T34 Eagle": {
-        "name": "Ayres Thrush S2R-T34 Eagle",
-        "base_takeoff_ground_roll_ft": 1650,
-        "base_takeoff_to_50ft_ft": 2500,
-        "base_landing_ground_roll_ft": 600,
-        "base_landing_to_50ft_ft": 1500,
-        "base_climb_rate_fpm": 666,
-        "base_stall_flaps_down_mph": 50,
-        "best_climb_speed_mph": 110,
-        "base_empty_weight_lbs": 4900,
-        "base_fuel_capacity_gal": 228,
-        "fuel_weight_per_gal": 6.7,
-        "hopper_capacity_gal": 510,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 10500,
-        "max_landing_weight_lbs": 10500,
-        "glide_ratio": 7.0,
-        "description": "Turbine-powered high-capacity ag sprayer – excellent short-field & payload",
-        "hover_ceiling_ige_max_gw": 0,
-        "hover_ceiling_oge_max_gw": 0
-    },
-    "Grumman G-164B Ag-Cat": {
-        "name": "Grumman G-164B Ag-Cat",
-        "base_takeoff_ground_roll_ft": 1200,
-        "base_takeoff_to_50ft_ft": 2200,
-        "base_landing_ground_roll_ft": 800,
-        "base_landing_to_50ft_ft": 1800,
-        "base_climb_rate_fpm": 1080,
-        "base_stall_flaps_down_mph": 64,
-        "best_climb_speed_mph": 90,
-        "base_empty_weight_lbs": 3150,
-        "base_fuel_capacity_gal": 190,
-        "fuel_weight_per_gal": 6.0,
-        "hopper_capacity_gal": 400,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 4500,
-        "max_landing_weight_lbs": 4500,
-        "glide_ratio": 7.5,
-        "description": "Classic radial-engine biplane ag sprayer – rugged & low stall speed"
-    },
-    "Cessna 188 Ag Truck": {
-        "name": "Cessna 188 Ag Truck",
-        "base_takeoff_ground_roll_ft": 680,
-        "base_takeoff_to_50ft_ft": 1090,
-        "base_landing_ground_roll_ft": 420,
-        "base_landing_to_50ft_ft": 1265,
-        "base_climb_rate_fpm": 690,
-        "base_stall_flaps_down_mph": 50,
-        "best_climb_speed_mph": 80,
-        "base_empty_weight_lbs": 2220,
-        "base_fuel_capacity_gal": 54,
-        "fuel_weight_per_gal": 6.0,
-        "hopper_capacity_gal": 280,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 4200,
-        "max_landing_weight_lbs": 4200,
-        "glide_ratio": 8.0,
-        "description": "Classic single-engine piston ag sprayer"
-    },
-    "Piper PA-36 Pawnee Brave": {
-        "name": "Piper PA-36 Pawnee Brave",
-        "base_takeoff_ground_roll_ft": 1200,
-        "base_takeoff_to_50ft_ft": 1500,
-        "base_landing_ground_roll_ft": 850,
-        "base_landing_to_50ft_ft": 1800,
-        "base_climb_rate_fpm": 920,
-        "base_stall_flaps_down_mph": 65,
-        "best_climb_speed_mph": 100,
-        "base_empty_weight_lbs": 2560,
-        "base_fuel_capacity_gal": 86,
-        "fuel_weight_per_gal": 6.0,
-        "hopper_capacity_gal": 275,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 4800,
-        "max_landing_weight_lbs": 4800,
-        "glide_ratio": 7.5,
-        "description": "Single-engine piston ag sprayer – large hopper & good swath width"
-    },
-    "Robinson R44 Raven II": {
-        "name": "Robinson R44 Raven II",
-        "base_takeoff_ground_roll_ft": 0,
-        "base_takeoff_to_50ft_ft": 0,
-        "base_landing_ground_roll_ft": 0,
-        "base_landing_to_50ft_ft": 0,
-        "base_climb_rate_fpm": 1000,
-        "base_stall_flaps_down_mph": 0,
-        "best_climb_speed_mph": 55,
-        "base_empty_weight_lbs": 1505,
-        "base_fuel_capacity_gal": 50,
-        "fuel_weight_per_gal": 6.7,
-        "hopper_capacity_gal": 83,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 2500,
-        "max_landing_weight_lbs": 2500,
-        "glide_ratio": 4.0,
-        "description": "Light utility/training helicopter (spray capable)",
-        "hover_ceiling_ige_max_gw": 8950,
-        "hover_ceiling_oge_max_gw": 7500
-    },
-    "Bell 206 JetRanger III": {
-        "name": "Bell 206 JetRanger III",
-        "base_takeoff_ground_roll_ft": 0,
-        "base_takeoff_to_50ft_ft": 0,
-        "base_landing_ground_roll_ft": 0,
-        "base_landing_to_50ft_ft": 0,
-        "base_climb_rate_fpm": 1280,
-        "base_stall_flaps_down_mph": 0,
-        "best_climb_speed_mph": 60,
-        "base_empty_weight_lbs": 1635,
-        "base_fuel_capacity_gal": 91,
-        "fuel_weight_per_gal": 6.7,
-        "hopper_capacity_gal": 100,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 3200,
-        "max_landing_weight_lbs": 3200,
-        "glide_ratio": 4.0,
-        "description": "Light utility helicopter (spray capable)",
-        "hover_ceiling_ige_max_gw": 12800,
-        "hover_ceiling_oge_max_gw": 8800
-    },
-    "Airbus AS350 B2": {
-        "name": "Airbus AS350 B2",
-        "base_takeoff_ground_roll_ft": 0,
-        "base_takeoff_to_50ft_ft": 0,
-        "base_landing_ground_roll_ft": 0,
-        "base_landing_to_50ft_ft": 0,
-        "base_climb_rate_fpm": 1675,
-        "base_stall_flaps_down_mph": 0,
-        "best_climb_speed_mph": 60,
-        "base_empty_weight_lbs": 2800,
-        "base_fuel_capacity_gal": 143,
-        "fuel_weight_per_gal": 6.7,
-        "hopper_capacity_gal": 150,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 4960,
-        "max_landing_weight_lbs": 4960,
-        "glide_ratio": 4.0,
-        "description": "Turbine ag spray helicopter – high performance utility",
-        "hover_ceiling_ige_max_gw": 9850,
-        "hover_ceiling_oge_max_gw": 7550
-    },
-    "Enstrom 480": {
-        "name": "Enstrom 480",
-        "base_takeoff_ground_roll_ft": 0,
-        "base_takeoff_to_50ft_ft": 0,
-        "base_landing_ground_roll_ft": 0,
-        "base_landing_to_50ft_ft": 0,
-        "base_climb_rate_fpm": 1100,
-        "base_stall_flaps_down_mph": 0,
-        "best_climb_speed_mph": 60,
-        "base_empty_weight_lbs": 1750,
-        "base_fuel_capacity_gal": 95,
-        "fuel_weight_per_gal": 6.7,
-        "hopper_capacity_gal": 100,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 2800,
-        "max_landing_weight_lbs": 2800,
-        "glide_ratio": 4.0,
-        "description": "Turbine light utility helicopter (spray capable)",
-        "hover_ceiling_ige_max_gw": 11000,
-        "hover_ceiling_oge_max_gw": 8500
-    },
-    "Enstrom 480B": {
-        "name": "Enstrom 480B",
-        "base_takeoff_ground_roll_ft": 0,
-        "base_takeoff_to_50ft_ft": 0,
-        "base_landing_ground_roll_ft": 0,
-        "base_landing_to_50ft_ft": 0,
-        "base_climb_rate_fpm": 1200,
-        "base_stall_flaps_down_mph": 0,
-        "best_climb_speed_mph": 60,
-        "base_empty_weight_lbs": 1800,
-        "base_fuel_capacity_gal": 95,
-        "fuel_weight_per_gal": 6.7,
-        "hopper_capacity_gal": 100,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 2850,
-        "max_landing_weight_lbs": 2850,
-        "glide_ratio": 4.0,
-        "description": "Improved turbine light utility helicopter (spray capable)",
-        "hover_ceiling_ige_max_gw": 12000,
-        "hover_ceiling_oge_max_gw": 9000
-    },
-    "Robinson R66": {
-        "name": "Robinson R66",
-        "base_takeoff_ground_roll_ft": 0,
-        "base_takeoff_to_50ft_ft": 0,
-        "base_landing_ground_roll_ft": 0,
-        "base_landing_to_50ft_ft": 0,
-        "base_climb_rate_fpm": 1100,
-        "base_stall_flaps_down_mph": 0,
-        "best_climb_speed_mph": 60,
-        "base_empty_weight_lbs": 1290,
-        "base_fuel_capacity_gal": 73.6,
-        "fuel_weight_per_gal": 6.7,
-        "hopper_capacity_gal": 130,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 2700,
-        "max_landing_weight_lbs": 2700,
-        "glide_ratio": 4.0,
-        "description": "Turbine light utility helicopter (spray capable)",
-        "hover_ceiling_ige_max_gw": 11000,
-        "hover_ceiling_oge_max_gw": 10000
-    },
-    "Enstrom F28F": {
-        "name": "Enstrom F28F",
-        "base_takeoff_ground_roll_ft": 0,
-        "base_takeoff_to_50ft_ft": 0,
-        "base_landing_ground_roll_ft": 0,
-        "base_landing_to_50ft_ft": 0,
-        "base_climb_rate_fpm": 1450,
-        "base_stall_flaps_down_mph": 0,
-        "best_climb_speed_mph": 57,
-        "base_empty_weight_lbs": 1640,
-        "base_fuel_capacity_gal": 40,
-        "fuel_weight_per_gal": 6.0,
-        "hopper_capacity_gal": 100,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 2600,
-        "max_landing_weight_lbs": 2600,
-        "glide_ratio": 4.0,
-        "description": "Piston helicopter (Falcon) – utility/ag capable",
-        "hover_ceiling_ige_max_gw": 13200,
-        "hover_ceiling_oge_max_gw": 8700
-    },
-    "Scott's Bell 47": {
-        "name": "Scott's Bell 47",
-        "base_takeoff_ground_roll_ft": 0,
-        "base_takeoff_to_50ft_ft": 0,
-        "base_landing_ground_roll_ft": 0,
-        "base_landing_to_50ft_ft": 0,
-        "base_climb_rate_fpm": 900,
-        "base_stall_flaps_down_mph": 0,
-        "best_climb_speed_mph": 60,
-        "base_empty_weight_lbs": 1900,
-        "base_fuel_capacity_gal": 43,
-        "fuel_weight_per_gal": 6.0,
-        "hopper_capacity_gal": 100,
-        "hopper_weight_per_gal": 8.3,
-        "max_takeoff_weight_lbs": 2950,
-        "max_landing_weight_lbs": 2950,
-        "glide_ratio": 4.0,
-        "description": "Light piston utility/ag helicopter – classic bubble canopy, spray capable",
-        "hover_ceiling_ige_max_gw": 10000,
-        "hover_ceiling_oge_max_gw": 8000
-    },
-}
+# Calculations (agpilot.calculations)
+# ────────────────────────────────────────────────
+# The compute_* physics functions carry their own bounded, quantized cache (agpilot.memo);
+# the heavier calls below are cached here. Every input is an explicit argument so it is part of the cache key.
+CACHE_MAX_ENTRIES = calculations.CACHE_MAX_ENTRIES
+
+calculate_density_altitude = calculations.calculate_density_altitude
+compute_takeoff = calculations.compute_takeoff
+compute_landing = calculations.compute_landing
+compute_climb_rate = calculations.compute_climb_rate
+compute_stall_speed = calculations.compute_stall_speed
+compute_glide_distance = calculations.compute_glide_distance
+compute_weight_balance = calculations.compute_weight_balance
+compute_hover_margins = calculations.compute_hover_margins
+compute_takeoff_uncertainty = st.cache_data(calculations.compute_takeoff_uncertainty, max_entries=64)
+compute_runway_winds = st.cache_data(calculations.compute_runway_winds, max_entries=CACHE_MAX_ENTRIES)
 
 # ────────────────────────────────────────────────
-# Density Altitude Calculation
-# ────────────────────────────────────────────────
-def calculate_density_altitude(pressure_alt_ft, oat_c):
-    isa_temp_c = 15 - (2 * (pressure_alt_ft / 1000))
-    deviation = oat_c - isa_temp_c
-    da_ft = pressure_alt_ft + (120 * deviation)
-    return round(da_ft)
-
-# ────────────────────────────────────────────────
-# Helper Functions
-# ────────────────────────────────────────────────
-def adjust_for_weight(value, current_weight, base_weight, exponent=1.5):
-    return value * (current_weight / base_weight) ** exponent
-
-def adjust_for_runway_condition(value, condition):
-    multipliers = {
-        "Paved / Dry Hard Surface": 1.00,
-        "Dry Grass / Firm Turf": 1.15,
-        "Wet Grass / Damp Turf": 1.45,
-        "Soft / Muddy / Rough": 1.80
-    }
-    factor = multipliers.get(condition, 1.00)
-    return value * factor
-
-def adjust_for_wind(value, wind_kts):
-    factor = 1 - (0.1 * wind_kts / 9)
-    return value * max(factor, 0.5)
-
-def adjust_for_da(value, da_ft):
-    factor = 1 + (0.07 * da_ft / 1000)
-    return value * factor
-
-@st.cache_data
-def compute_takeoff(pressure_alt_ft, oat_c, weight_lbs, wind_kts, runway_condition, aircraft):
-    data = AIRCRAFT_DATA[aircraft]
-    da_ft = calculate_density_altitude(pressure_alt_ft, oat_c)
-    ground_roll = adjust_for_weight(data["base_takeoff_ground_roll_ft"], weight_lbs, data["max_takeoff_weight_lbs"])
-    ground_roll = adjust_for_da(ground_roll, da_ft)
-    ground_roll = adjust_for_wind(ground_roll, wind_kts)
-    ground_roll = adjust_for_runway_condition(ground_roll, runway_condition)
-    to_50ft = adjust_for_weight(data["base_takeoff_to_50ft_ft"], weight_lbs, data["max_takeoff_weight_lbs"])
-    to_50ft = adjust_for_da(to_50ft, da_ft)
-    to_50ft = adjust_for_wind(to_50ft, wind_kts)
-    to_50ft = adjust_for_runway_condition(to_50ft, runway_condition) * 1.10
-    return ground_roll, to_50ft
-
-@st.cache_data
-def compute_landing(pressure_alt_ft, oat_c, weight_lbs, wind_kts, runway_condition, aircraft):
-    data = AIRCRAFT_DATA[aircraft]
-    weight_lbs = min(weight_lbs, data["max_landing_weight_lbs"])
-    da_ft = calculate_density_altitude(pressure_alt_ft, oat_c)
-    ground_roll = adjust_for_weight(data["base_landing_ground_roll_ft"], weight_lbs, data["max_landing_weight_lbs"], exponent=1.0)
-    ground_roll = adjust_for_da(ground_roll, da_ft)
-    ground_roll = adjust_for_wind(ground_roll, wind_kts)
-    ground_roll = adjust_for_runway_condition(ground_roll, runway_condition)
-    from_50ft = adjust_for_weight(data["base_landing_to_50ft_ft"], weight_lbs, data["max_landing_weight_lbs"], exponent=1.0)
-    from_50ft = adjust_for_da(from_50ft, da_ft)
-    from_50ft = adjust_for_wind(from_50ft, wind_kts)
-    from_50ft = adjust_for_runway_condition(from_50ft, runway_condition) * 1.15
-    return ground_roll, from_50ft
-
-@st.cache_data
-def compute_climb_rate(pressure_alt_ft, oat_c, weight_lbs, aircraft):
-    data = AIRCRAFT_DATA[aircraft]
-    da_ft = calculate_density_altitude(pressure_alt_ft, oat_c)
-    climb = adjust_for_weight(data["base_climb_rate_fpm"], weight_lbs, data["max_takeoff_weight_lbs"], exponent=-1)
-    climb *= (1 - (0.05 * da_ft / 1000))
-    return max(climb, 0)
-
-@st.cache_data
-def compute_stall_speed(weight_lbs, aircraft):
-    data = AIRCRAFT_DATA[aircraft]
-    return data["base_stall_flaps_down_mph"] * np.sqrt(weight_lbs / data["max_landing_weight_lbs"])
-
-@st.cache_data
-def compute_glide_distance(height_ft, wind_kts, aircraft):
-    data = AIRCRAFT_DATA[aircraft]
-    is_helicopter = any(heli in aircraft for heli in ["R44", "Bell 206", "Enstrom 480", "Enstrom 480B", "Robinson R66", "Airbus AS350", "Enstrom F28F", "Bell 47"])
-    if is_helicopter:
-        base_distance_nm = height_ft / 1300
-        wind_factor = 1 + (wind_kts / 20)
-        return base_distance_nm * wind_factor
+# Fleet (shared SQLite store)
+# ────────────────────────────────────────────────
+@st.cache_resource
+def get_fleet_store():
+    return fleet.FleetStore(os.environ.get("AGPILOT_FLEET_DB", fleet.FLEET_DB_PATH))
+
+# ────────────────────────────────────────────────
+# Weather (shared, TTL-cached client with an on-disk copy for offline use)
+# ────────────────────────────────────────────────
+@st.cache_resource
+def get_weather_client():
+    from agpilot import weather  # pulls in requests; only needed once weather is shown
+    return weather.WeatherClient(cache_path=os.path.join(APP_DIR, weather.CACHE_PATH))
+
+def metar_summary(decoded):
+    if decoded.wind_speed_kt is None:
+        wind_part = "—"
     else:
-        ground_speed_mph = 100 + wind_kts
-        return (height_ft / 6076) * data["glide_ratio"] * (ground_speed_mph / 60)
-
-@st.cache_data
-def compute_weight_balance(fuel_gal, hopper_gal, pilot_weight_lbs, aircraft):
-    data = AIRCRAFT_DATA[aircraft]
-    empty_weight = st.session_state.get('custom_empty_weight')
-    if empty_weight is None:
-        empty_weight = data["base_empty_weight_lbs"]
+        direction = "VRB" if decoded.wind_dir_deg is None else f"{decoded.wind_dir_deg:03d}°"
+        gust = f"G{decoded.wind_gust_kt}" if decoded.wind_gust_kt else ""
+        wind_part = f"{direction} {decoded.wind_speed_kt}{gust} kt"
+        if decoded.wind_var_from_deg is not None:
+            wind_part += f" ({decoded.wind_var_from_deg:03d}–{decoded.wind_var_to_deg:03d}°)"
+    if decoded.temp_c is None:
+        temp_dew_part = "—"
     else:
-        empty_weight = int(empty_weight)
-    fuel_weight = fuel_gal * data["fuel_weight_per_gal"]
-    hopper_weight = hopper_gal * data["hopper_weight_per_gal"]
-    total_weight = empty_weight + fuel_weight + hopper_weight + pilot_weight_lbs
-    status = "Within limits" if total_weight <= data["max_takeoff_weight_lbs"] else "Overweight!"
-    if total_weight > data["max_landing_weight_lbs"]:
-        status += " (Exceeds max landing weight)"
-    return total_weight, status
-
-def compute_hover_ceiling(da_ft, weight_lbs, aircraft):
-    data = AIRCRAFT_DATA[aircraft]
-    base_ceiling_ige = data.get("hover_ceiling_ige_max_gw", 0)
-    base_ceiling_oge = data.get("hover_ceiling_oge_max_gw", 0)
-    weight_factor = (data["max_takeoff_weight_lbs"] - weight_lbs) / 500.0
-    ige_ceiling = base_ceiling_ige + (weight_factor * 1000)
-    oge_ceiling = base_ceiling_oge + (weight_factor * 800)
-    da_loss = da_ft / 1000 * 1000
-    ige_ceiling -= da_loss
-    oge_ceiling -= da_loss
-    ige_ceiling = max(0, ige_ceiling)
-    oge_ceiling = max(0, oge_ceiling)
-    return ige_ceiling, oge_ceiling
+        dew = "—" if decoded.dewpoint_c is None else f"{decoded.dewpoint_c:.0f}"
+        temp_dew_part = f"{decoded.temp_c:.0f} / {dew} °C"
+    if decoded.altimeter_inhg is None:
+        altimeter_part = "—"
+    else:
+        altimeter_part = f"{decoded.altimeter_inhg:.2f} inHg ({decoded.altimeter_hpa} hPa)"
+    return wind_part, temp_dew_part, altimeter_part
+
+def format_age(seconds):
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes} min"
+    if minutes < 48 * 60:
+        return f"{minutes // 60} h {minutes % 60} min"
+    return f"{minutes // (24 * 60)} days"
+
+def report_age_label(report):
+    if report.offline:
+        return f" – offline, saved {format_age(report.age_s)} ago"
+    if report.stale:
+        return f" – cached {format_age(report.age_s)} ago, refreshing"
+    return f" – cached {format_age(report.age_s)} ago" if report.age_s >= 60 else ""
+
+def fetched_label(report):
+    return "fetched " + datetime.fromtimestamp(report.fetched_at, timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
 
 # ────────────────────────────────────────────────
 # Risk Assessment
@@ -605,15 +253,24 @@ st.caption("Prototype – educational use only. Always refer to the official Pil
 
 # Fleet Management
 st.subheader("My Fleet")
-if st.session_state.fleet:
-    fleet_nicknames = ["— Select a saved aircraft —"] + [entry["nickname"] for entry in st.session_state.fleet]
+fleet_store = get_fleet_store()
+fleet_entries = fleet_store.entries()
+fleet_entry = None
+if fleet_entries:
+    fleet_nicknames = ["— Select a saved aircraft —"] + list(fleet_entries)
     selected_nickname = st.selectbox("Load from Fleet", fleet_nicknames)
     if selected_nickname != "— Select a saved aircraft —":
-        entry = next(e for e in st.session_state.fleet if e["nickname"] == selected_nickname)
-        st.session_state.selected_aircraft = entry["aircraft"]
-        custom = entry.get("custom_empty")
-        st.session_state.custom_empty_weight = int(custom) if custom is not None else None
-        st.success(f"Loaded **{selected_nickname}** ({entry['aircraft']}) – Empty: {custom or 'base'} lb")
+        fleet_entry = fleet_entries[selected_nickname]
+        if fleet_entry.aircraft not in AIRCRAFT_DATA:
+            st.error(f"**{selected_nickname}** is a {fleet_entry.aircraft}, which is not in the aircraft database.")
+            fleet_entry = None
+        else:
+            st.session_state.selected_aircraft = fleet_entry.aircraft
+            custom = fleet_entry.empty_weight_lbs
+            st.session_state.custom_empty_weight = int(custom) if custom is not None else None
+            st.success(f"Loaded **{selected_nickname}** ({fleet_entry.aircraft}) – Empty: {int(custom) if custom else 'base'} lb")
+            if fleet_entry.notes:
+                st.caption(fleet_entry.notes)
 else:
     st.info("No aircraft saved to fleet yet.")
 
@@ -621,16 +278,13 @@ else:
 selected_aircraft = st.selectbox(
     "Select Aircraft",
     options=list(AIRCRAFT_DATA.keys()),
-    index=0 if 'selected_aircraft' not in st.session_state else list(AIRCRAFT_DATA.keys()).index(st.session_state.get("selected_aircraft", list(AIRCRAFT_DATA.keys())[0])),
+    index=AIRCRAFT_DATA.by_name.get(st.session_state.get("selected_aircraft"), 0),
     format_func=lambda x: f"{AIRCRAFT_DATA[x]['name']} – {AIRCRAFT_DATA[x]['description']}"
 )
 aircraft_data = AIRCRAFT_DATA[selected_aircraft]
 
 # Helicopter detection
-is_helicopter = any(heli in selected_aircraft for heli in [
-    "R44", "Bell 206", "Enstrom 480", "Enstrom 480B", "Robinson R66",
-    "Airbus AS350", "Enstrom F28F", "Bell 47"
-])
+is_helicopter = aircraft_data["category"] == "helicopter"
 
 # Custom Empty Weight Input
 st.subheader("Custom Empty Weight (optional)")
@@ -651,21 +305,25 @@ with col_empty1:
     )
 with col_empty2:
     st.markdown("<div style='padding-top: 28px;'></div>", unsafe_allow_html=True)
-    if st.button("Save to Fleet"):
-        nickname = st.text_input("Give this configuration a nickname (e.g. 'N123AB R66')", key="fleet_nickname")
-        if nickname.strip():
-            st.session_state.fleet = [e for e in st.session_state.fleet if e["nickname"] != nickname.strip()]
-            st.session_state.fleet.append({
-                "nickname": nickname.strip(),
-                "aircraft": selected_aircraft,
-                "custom_empty": custom_empty
-            })
-            st.success(f"Saved **{nickname}** to fleet!")
-        else:
-            st.warning("Please enter a nickname to save.")
+    with st.popover("Save to Fleet"):
+        with st.form("save_to_fleet"):
+            nickname = st.text_input("Nickname / tail number (e.g. 'N123AB R66')",
+                                     value=fleet_entry.nickname if fleet_entry else "")
+            empty_arm = st.number_input("Empty-weight CG arm (in, optional)", value=fleet_entry.empty_arm_in if fleet_entry else None,
+                                        step=0.1, help=f"Leave blank for the {aircraft_data['name']} base arm ({aircraft_data['empty_arm_in']} in)")
+            notes = st.text_area("Notes", value=fleet_entry.notes if fleet_entry else "")
+            if st.form_submit_button("Save"):
+                if nickname.strip():
+                    fleet_store.save(nickname, selected_aircraft,
+                                     custom_empty if custom_empty != aircraft_data["base_empty_weight_lbs"] else None,
+                                     empty_arm, notes)
+                    st.success(f"Saved **{nickname.strip()}** to fleet!")
+                else:
+                    st.warning("Please enter a nickname to save.")
 
 effective_empty = custom_empty if custom_empty != aircraft_data["base_empty_weight_lbs"] else aircraft_data["base_empty_weight_lbs"]
 st.caption(f"**Effective Empty Weight:** {effective_empty} lb {'(custom)' if custom_empty != aircraft_data['base_empty_weight_lbs'] else '(base)'}")
+empty_arm_in = fleet_entry.empty_arm_in if fleet_entry and fleet_entry.aircraft == selected_aircraft else None
 
 # Risk Assessment button
 if st.button("Risk Assessment", type="secondary"):
@@ -686,6 +344,7 @@ common_airports = {
     "KSEA": "Seattle-Tacoma Intl (KSEA)",
     "None": "—— No airport selected ——"
 }
+FIELD_ELEVATION_FT = {"KELN": 1764, "KYKM": 1099, "KEAT": 1249, "KPUW": 2556, "KSEA": 433}
 selected_icao = st.selectbox(
     "Select Nearby Airport",
     options=list(common_airports.keys()),
@@ -700,52 +359,94 @@ custom_icao = st.text_input(
 ).strip().upper()
 icao_upper = custom_icao if custom_icao and len(custom_icao) == 4 and custom_icao.isalnum() else selected_icao
 metar_text = None
+decoded_metar = None
 metar_timestamp = None
 taf_text = None
 taf_issued = None
-if icao_upper and icao_upper != "None":
-    try:
-        url = f"https://tgftp.nws.noaa.gov/data/observations/metar/stations/{icao_upper}.TXT"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            lines = response.text.strip().splitlines()
-            if len(lines) >= 2:
-                metar_timestamp = lines[0].strip()
-                metar_text = lines[1].strip()
-            elif lines:
-                metar_text = lines[0].strip()
-    except Exception as e:
-        st.warning(f"METAR fetch error for {icao_upper}: {e}")
-    try:
-        url = f"https://aviationweather.gov/api/data/taf?ids={icao_upper}&format=raw"
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200 and response.text.strip():
-            taf_text = response.text.strip()
-            lines = taf_text.splitlines()
-            if lines and "Z" in lines[0]:
-                taf_issued = lines[0].split()[1] if len(lines[0].split()) > 1 else None
-    except Exception as e:
-        st.warning(f"TAF fetch error for {icao_upper}: {e}")
-if icao_upper and icao_upper != "None":
+metar_gust_increment_kt = 0
+weather_cols = st.columns(2)
+show_weather = weather_cols[0].toggle("Load weather", value=not FAST_START, help="Fetch METAR/TAF for the selected airport")
+offline = weather_cols[1].toggle("Offline mode", value=OFFLINE_DEFAULT,
+                                 help="No network calls: show the last saved METAR/TAF with its age, hide the live TFR map")
+if show_weather and icao_upper and icao_upper != "None":
+    metar_report, taf_report = get_weather_client().station(icao_upper, stale_ok=True, offline=offline)
+    metar_text, metar_timestamp = metar_report.text, metar_report.issued
+    taf_text, taf_issued = taf_report.text, taf_report.issued
+    if metar_report.offline and not offline:
+        st.info("Network unreachable – showing saved weather; calculations are unaffected.")
+    if metar_report.error:
+        st.warning(f"METAR fetch error for {icao_upper}: {metar_report.error}")
+    if taf_report.error:
+        st.warning(f"TAF fetch error for {icao_upper}: {taf_report.error}")
+if show_weather and icao_upper and icao_upper != "None":
     st.markdown(f"**Latest Weather for {icao_upper}**")
     st.markdown("**METAR (Current)**")
     if metar_text:
-        st.markdown(f"({metar_timestamp or 'fetched ' + datetime.now().strftime('%Y-%m-%d %H:%M UTC')})")
+        st.markdown(f"({metar_timestamp or fetched_label(metar_report)}){report_age_label(metar_report)}")
         st.code(metar_text, language="text")
-        parts = metar_text.split()
-        wind_part = next((p for p in parts if "KT" in p and len(p) >= 6), "—")
-        temp_dew_part = next((p for p in parts if "/" in p and len(p.split("/")) == 2), "—")
-        altimeter_part = next((p for p in parts if (p.startswith("A") and len(p) == 5) or p.startswith("Q")), "—")
+        decoded_metar = metar.parse_metar(metar_text)
+        wind_part, temp_dew_part, altimeter_part = metar_summary(decoded_metar)
         cols = st.columns(3)
         cols[0].metric("Wind", wind_part)
         cols[1].metric("Temp / Dew", temp_dew_part)
         cols[2].metric("Altimeter", altimeter_part)
+        prefill_cols = st.columns(3)
+        field_elevation_ft = prefill_cols[0].number_input(
+            "Field Elevation (ft)",
+            min_value=-1000,
+            max_value=15000,
+            value=FIELD_ELEVATION_FT.get(icao_upper, 0),
+            step=10,
+            key=f"field_elevation_{icao_upper}"
+        )
+        metar_wind = (decoded_metar.wind_dir_deg, decoded_metar.wind_speed_kt or 0, decoded_metar.wind_gust_kt,
+                      decoded_metar.wind_var_from_deg, decoded_metar.wind_var_to_deg)
+        if icao_upper in wind.strips():
+            runway_winds = compute_runway_winds(
+                (icao_upper,), *metar_wind,
+                decoded_metar.temp_c if decoded_metar.temp_c is not None else 15,
+                decoded_metar.altimeter_inhg or wind.STANDARD_ALTIMETER_INHG, None,
+                performance.RUNWAY_CONDITION_NAMES[0], selected_aircraft)[0]
+            runway_options = [end["runway"] for end in runway_winds["ends"]]
+            selected_runway = prefill_cols[1].selectbox(
+                "Runway", options=runway_options,
+                index=runway_options.index(runway_winds["runway"]) if runway_winds["runway"] else 0,
+                help="Defaults to the usable runway with the most distance to spare")
+            metar_headwind_kt = runway_winds["ends"][runway_options.index(selected_runway)]["headwind_kt"]
+            st.dataframe([{
+                "Runway": end["runway"],
+                "Headwind (kt)": round(end["headwind_kt"], 1),
+                "Crosswind (kt)": round(end["crosswind_kt"], 1),
+                "Takeoff to 50 ft (ft)": round(end["takeoff_to_50ft_ft"]),
+                "Landing from 50 ft (ft)": round(end["landing_from_50ft_ft"]),
+                "Spare (ft)": round(end["margin_ft"]),
+                "Usable": "✅" if end["usable"] else "❌",
+            } for end in runway_winds["ends"]], use_container_width=True, hide_index=True)
+            st.caption(f"At max takeoff weight on a paved/dry surface, crosswind limit {wind.DEFAULT_MAX_CROSSWIND_KT:g} kt. "
+                       "Headwind credits the steady wind only; tailwind and crosswind use the gust and the worst "
+                       "direction of a variable range.")
+        else:
+            runway_heading_deg = prefill_cols[1].number_input("Runway Heading (° true)", min_value=0, max_value=360, value=0, step=10)
+            metar_headwind_kt = float(wind.components(metar_wind[0], metar_wind[1], runway_heading_deg, *metar_wind[2:])[0])
+        if decoded_metar.wind_gust_kt and decoded_metar.wind_speed_kt:
+            metar_gust_increment_kt = decoded_metar.wind_gust_kt - decoded_metar.wind_speed_kt
+        prefill_cols[2].markdown("<div style='padding-top: 28px;'></div>", unsafe_allow_html=True)
+        if prefill_cols[2].button("Use METAR for inputs", help="Fill pressure altitude, OAT and headwind from this METAR"):
+            metar_pa = decoded_metar.pressure_altitude_ft(field_elevation_ft)
+            if metar_pa is None or decoded_metar.temp_c is None:
+                st.warning("METAR has no altimeter or temperature – enter inputs manually.")
+            else:
+                st.session_state.pressure_alt_ft = int(min(max(round(metar_pa), 0), 20000))
+                st.session_state.oat_c = int(min(max(round(decoded_metar.temp_c), -30), 50))
+                st.session_state.wind_kts = int(min(max(round(metar_headwind_kt), -20), 20))
+                st.success(f"Inputs set from METAR: PA {st.session_state.pressure_alt_ft} ft, OAT {st.session_state.oat_c} °C, "
+                           f"headwind {st.session_state.wind_kts} kt (gusts not credited, tailwind at the gust).")
     else:
         st.info("No METAR available – check ICAO code or try later.")
     st.markdown("**TAF (Forecast)**")
     if taf_text:
-        issued_str = f"Issued ~ {taf_issued}" if taf_issued else f"Fetched {datetime.now().strftime('%Y-%m-%d %H:%M UTC')}"
-        st.markdown(f"({issued_str})")
+        issued_str = f"Issued ~ {taf_issued}" if taf_issued else fetched_label(taf_report).capitalize()
+        st.markdown(f"({issued_str}){report_age_label(taf_report)}")
         st.code(taf_text, language="text")
     else:
         st.info("No TAF available (common for small fields).")
@@ -753,23 +454,92 @@ if icao_upper and icao_upper != "None":
     st.caption("**Always check current NOTAMs via official FAA sources before flight.**")
     st.markdown(f"[Open FAA NOTAM Search for {icao_upper}](https://notams.aim.faa.gov/notamSearch/search?search=location&loc={icao_upper}) – view active NOTAMs, TFRs, and details.")
     st.caption("Recommended: Use 1800-WX-BRIEF phone briefing or apps like ForeFlight / Garmin Pilot.")
+
+# Region Briefing – all operating-area stations in one bulk fetch
+if st.toggle("Region briefing (compare several fields)"):
+    region_icaos = st.multiselect(
+        "Stations",
+        options=list(FIELD_ELEVATION_FT),
+        default=["KELN", "KYKM", "KEAT", "KPUW"],
+        accept_new_options=True
+    )
+    region_rows = []
+    for icao, (region_metar, region_taf) in get_weather_client().stations(region_icaos, stale_ok=True, offline=offline).items():
+        if region_metar.text:
+            decoded_region = metar.parse_metar(region_metar.text)
+            wind_part, temp_dew_part, altimeter_part = metar_summary(decoded_region)
+            elevation = FIELD_ELEVATION_FT.get(icao)
+            region_da = decoded_region.density_altitude_ft(elevation) if elevation is not None else None
+        else:
+            wind_part = temp_dew_part = altimeter_part = "—"
+            region_da = None
+        region_rows.append({
+            "Station": icao,
+            "Wind": wind_part,
+            "Temp / Dew": temp_dew_part,
+            "Altimeter": altimeter_part,
+            "Density Altitude (ft)": region_da,
+            "TAF": "yes" if region_taf.text else "—",
+            "Age (min)": int(region_metar.age_s // 60) if region_metar.text else None,
+        })
+    if region_rows:
+        st.dataframe(region_rows, use_container_width=True, hide_index=True)
+        st.caption("Density altitude needs a known field elevation; stations without one show blank.")
+
+# Strip winds – every airport and private strip against its nearest METAR
+if st.toggle("Strip winds (best runway at every strip)"):
+    all_strips = wind.strips()
+    strip_cols = st.columns(2)
+    max_crosswind_kt = strip_cols[0].number_input("Crosswind limit (kt)", min_value=5, max_value=30,
+                                                  value=int(wind.DEFAULT_MAX_CROSSWIND_KT), step=1)
+    strip_to_50ft = strip_cols[1].toggle("Require 50 ft obstacle clearance", value=True,
+                                         help="Off: takeoff and landing ground rolls must fit the strip")
+    strip_weather = get_weather_client().stations(sorted({strip["metar"] for strip in all_strips.values()}),
+                                                  stale_ok=True, offline=offline)
+    strip_metars = {icao: metar.parse_metar(report.text) for icao, (report, _) in strip_weather.items() if report.text}
+    reporting = [strip_id for strip_id, strip in all_strips.items() if strip["metar"] in strip_metars]
+    if reporting:
+        observed = [strip_metars[all_strips[strip_id]["metar"]] for strip_id in reporting]
+        strip_rows = compute_runway_winds(
+            tuple(reporting),
+            [obs.wind_dir_deg for obs in observed], [obs.wind_speed_kt or 0 for obs in observed],
+            [obs.wind_gust_kt for obs in observed], [obs.wind_var_from_deg for obs in observed],
+            [obs.wind_var_to_deg for obs in observed], [15 if obs.temp_c is None else obs.temp_c for obs in observed],
+            [obs.altimeter_inhg or wind.STANDARD_ALTIMETER_INHG for obs in observed], None,
+            performance.RUNWAY_CONDITION_NAMES[0], selected_aircraft, max_crosswind_kt, strip_to_50ft)
+        st.dataframe([{
+            "Strip": all_strips[row["strip"]].get("name", row["strip"]),
+            "METAR": all_strips[row["strip"]]["metar"],
+            "Wind": metar_summary(obs)[0],
+            "Best runway": row["runway"] or "none usable",
+            "Headwind (kt)": None if row["runway"] is None else round(row["headwind_kt"], 1),
+            "Crosswind (kt)": None if row["runway"] is None else round(row["crosswind_kt"], 1),
+            "Spare (ft)": None if row["runway"] is None else round(row["margin_ft"]),
+        } for row, obs in zip(strip_rows, observed)], use_container_width=True, hide_index=True)
+        st.caption(f"{aircraft_data['name']} at max takeoff weight, paved/dry. Private strips use the wind of the "
+                   "METAR station listed; check the windsock on arrival.")
+    else:
+        st.info("No METAR available for the strip stations.")
 st.markdown("---")
 
 # TFR Map
 st.subheader("Temporary Flight Restrictions (TFR) Map")
 st.caption("Live interactive FAA TFR map – shows current restrictions. Zoom to your area/state.")
-st.components.v1.iframe(
-    src="https://tfr.faa.gov/tfr3/?page=map",
-    height=600,
-    scrolling=True
-)
+if offline:
+    st.info("Offline – the live TFR map needs a connection. Check TFRs before flight.")
+elif st.toggle("Show TFR map", value=not FAST_START):
+    st.components.v1.iframe(
+        src="https://tfr.faa.gov/tfr3/?page=map",
+        height=600,
+        scrolling=True
+    )
 st.markdown("[Open full-screen FAA TFR Map](https://tfr.faa.gov/tfr3/?page=map) – recommended for detailed view.")
 
 # Inputs
 col1, col2 = st.columns(2)
 with col1:
-    pressure_alt_ft = st.number_input("Pressure Altitude (ft)", min_value=0, max_value=20000, value=0, step=100)
-    oat_c = st.number_input("OAT (°C)", min_value=-30, max_value=50, value=15, step=1)
+    pressure_alt_ft = st.number_input("Pressure Altitude (ft)", min_value=0, max_value=20000, step=100, key="pressure_alt_ft")
+    oat_c = st.number_input("OAT (°C)", min_value=-30, max_value=50, step=1, key="oat_c")
     min_weight = 1000 if is_helicopter else 4000
     weight_lbs = st.number_input(
         "Gross Weight (lbs)",
@@ -779,15 +549,10 @@ with col1:
         step=50,
         help="Adjust based on actual loadout. Helicopter min lowered for realistic empty weights."
     )
-    wind_kts = st.number_input("Headwind (+) / Tailwind (-) (kts)", min_value=-20, max_value=20, value=0, step=1)
+    wind_kts = st.number_input("Headwind (+) / Tailwind (-) (kts)", min_value=-20, max_value=20, step=1, key="wind_kts")
     runway_condition = st.selectbox(
         "Runway Condition",
-        options=[
-            "Paved / Dry Hard Surface",
-            "Dry Grass / Firm Turf",
-            "Wet Grass / Damp Turf",
-            "Soft / Muddy / Rough"
-        ],
+        options=list(performance.RUNWAY_CONDITION_NAMES),
         index=0,
         help="Adjusts takeoff/landing distances. Baseline = paved/dry."
     )
@@ -883,7 +648,7 @@ if st.button("Calculate Performance", type="primary"):
     climb_rate = compute_climb_rate(pressure_alt_ft, oat_c, weight_lbs, selected_aircraft)
     stall_speed = compute_stall_speed(weight_lbs, selected_aircraft)
     glide_dist = compute_glide_distance(glide_height_ft, wind_kts, selected_aircraft)
-    total_weight, cg_status = compute_weight_balance(fuel_gal, hopper_gal, pilot_weight_lbs, selected_aircraft)
+    total_weight, cg_status, cg_trajectory = compute_weight_balance(fuel_gal, hopper_gal, pilot_weight_lbs, effective_empty, selected_aircraft, empty_arm_in)
 
     st.subheader("Results")
     col_a, col_b = st.columns(2)
@@ -910,25 +675,454 @@ if st.button("Calculate Performance", type="primary"):
         else:
             st.caption("Fixed-wing glide estimate (best glide speed config). Adjust for actual conditions.")
     st.markdown(f"**Total Weight:** {total_weight:.0f} lbs – **{cg_status}**")
+    with st.expander("CG Envelope – fuel burn & hopper dump"):
+        envelope = np.array(aircraft_data["cg_envelope"] + aircraft_data["cg_envelope"][:1])
+        fig, ax = pyplot().subplots(figsize=(8, 4.5))
+        ax.plot(envelope[:, 0], envelope[:, 1], color='black', linewidth=1.5, label="CG envelope")
+        ax.plot(cg_trajectory["cg_in"], cg_trajectory["weight_lbs"], color='darkgreen', linewidth=2, label="Sortie")
+        outside = ~cg_trajectory["in_envelope"]
+        ax.scatter(cg_trajectory["cg_in"][outside], cg_trajectory["weight_lbs"][outside], color='red', zorder=3, label="Outside")
+        ax.scatter(cg_trajectory["cg_in"][:1], cg_trajectory["weight_lbs"][:1], color='darkgreen', marker='^', zorder=3, label="Takeoff")
+        ax.set_xlabel("CG (in aft of datum)")
+        ax.set_ylabel("Weight (lbs)")
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.legend()
+        st.pyplot(fig)
+        pyplot().close(fig)
+        st.caption("Fuel burns off over the whole sortie; the hopper empties during the middle 60%. "
+                   "Arms and envelope are representative values – use your aircraft's weight & balance data.")
     if is_helicopter:
-        ige_ceiling, oge_ceiling = compute_hover_ceiling(da_ft, total_weight, selected_aircraft)
+        ige_margin, oge_margin = compute_hover_margins(pressure_alt_ft, oat_c, total_weight, selected_aircraft)
         st.subheader("Hover Performance")
-        st.metric("Estimated IGE Hover Ceiling", f"{ige_ceiling:.0f} ft")
-        st.metric("Estimated OGE Hover Ceiling", f"{oge_ceiling:.0f} ft")
-        if total_weight > 2300:
-            st.warning("Note: OGE hover at high gross weight may be limited — check POH chart.")
+        st.metric("IGE Hover Margin", f"{max(ige_margin, 0):.0f} ft", help="Hover ceiling at this weight and OAT minus field pressure altitude")
+        st.metric("OGE Hover Margin", f"{max(oge_margin, 0):.0f} ft", help="Hover ceiling at this weight and OAT minus field pressure altitude")
+        if oge_margin < 0:
+            st.warning("No OGE hover at this weight and field — reduce the load or check the POH chart.")
         if da_ft > 8000:
             st.warning("High density altitude — hover performance reduced. Consult POH.")
-    st.subheader("Rate of Climb vs Pressure Altitude")
-    altitudes = np.linspace(0, 12000, 60)
-    climb_rates = [compute_climb_rate(alt, oat_c, weight_lbs, selected_aircraft) for alt in altitudes]
-    fig, ax = plt.subplots(figsize=(10, 5.5))
-    ax.plot(altitudes, climb_rates, color='darkgreen', linewidth=2.2)
-    ax.set_xlabel("Pressure Altitude (ft)")
-    ax.set_ylabel("Rate of Climb (fpm)")
-    ax.set_title(f"Climb Performance – {aircraft_data['name']} – OAT {oat_c}°C, Weight {weight_lbs} lbs")
-    ax.grid(True, linestyle='--', alpha=0.7)
-    st.pyplot(fig)
+
+# ────────────────────────────────────────────────
+# Rate of Climb vs Pressure Altitude (cached chart, optional overlays)
+# ────────────────────────────────────────────────
+st.subheader("Rate of Climb vs Pressure Altitude")
+overlay_cols = st.columns(2)
+overlay_oats = overlay_cols[0].multiselect("Overlay OATs (°C)", options=list(range(-20, 51, 5)),
+                                           help="Extra curves at these temperatures")
+overlay_weights = overlay_cols[1].multiselect(
+    "Overlay weights (lbs)",
+    options=[int(round(w, -1)) for w in np.linspace(min_weight, aircraft_data["max_takeoff_weight_lbs"], 5)],
+    accept_new_options=True,
+    help="Extra curves at these gross weights"
+)
+chart_weights = [float(weight_lbs)]
+for overlay_weight in overlay_weights:
+    try:
+        chart_weights.append(float(overlay_weight))
+    except ValueError:
+        st.warning(f"Ignoring overlay weight '{overlay_weight}' – enter a number in lbs.")
+chart_oats = tuple(dict.fromkeys([float(oat_c)] + [float(t) for t in overlay_oats]))
+chart_weights = tuple(dict.fromkeys(chart_weights))
+if CHART_RENDERER == "png":
+    st.image(charts.climb_chart_png(selected_aircraft, chart_oats, chart_weights))
+else:
+    st.vega_lite_chart(charts.climb_chart(selected_aircraft, chart_oats, chart_weights), use_container_width=True)
+
+# ────────────────────────────────────────────────
+# Hover margin (helicopters, live from the hover charts)
+# ────────────────────────────────────────────────
+if is_helicopter:
+    st.subheader("Hover Margin vs Gross Weight")
+    hover_weight, _, _ = performance.weight_balance(aircraft_data, fuel_gal, hopper_gal, pilot_weight_lbs, effective_empty)
+    hover_hopper = hover.max_hopper_for_hover(aircraft_data, pressure_alt_ft, oat_c, fuel_gal, pilot_weight_lbs, effective_empty)
+    hover_cols = st.columns(3)
+    hover_cols[0].metric("Max OGE hover weight", f"{hover.max_hover_weight(aircraft_data, pressure_alt_ft, oat_c):,.0f} lbs")
+    hover_cols[1].metric("Max IGE hover weight",
+                         f"{hover.max_hover_weight(aircraft_data, pressure_alt_ft, oat_c, out_of_ground_effect=False):,.0f} lbs")
+    hover_cols[2].metric("Max hopper for OGE hover", f"{int(hover_hopper)} gal",
+                         help=f"With {fuel_gal} gal fuel and a {pilot_weight_lbs} lb pilot; also capped at max takeoff weight")
+    st.vega_lite_chart(charts.hover_margin_chart(selected_aircraft, float(pressure_alt_ft), float(oat_c), float(hover_weight),
+                                                 float(min_weight)), use_container_width=True)
+    hover_source = hover.charts().sources.get(selected_aircraft)
+    st.caption(f"Red line: current loading ({hover_weight:,.0f} lbs). "
+               + (f"Hover chart: {hover_source}." if hover_source else "No hover chart for this type – formula estimate."))
+
+# ────────────────────────────────────────────────
+# Maximum Hopper Load (inverse solver)
+# ────────────────────────────────────────────────
+st.subheader("Maximum Hopper Load")
+st.caption("Heaviest spray load that keeps takeoff within the field, climb above your minimum, "
+           "gross weight within max takeoff weight and (helicopters) OGE hover at the field.")
+solver_cols = st.columns(3)
+field_length_ft = solver_cols[0].number_input("Available Field Length (ft)", min_value=0, max_value=10000, value=3000, step=100)
+min_climb_fpm = solver_cols[1].number_input("Minimum Climb Rate (fpm)", min_value=0, max_value=2000, value=200, step=50)
+solver_cols[2].markdown("<div style='padding-top: 28px;'></div>", unsafe_allow_html=True)
+clear_50ft = solver_cols[2].checkbox("Clear 50 ft obstacle", value=True, help="Unchecked: ground roll only")
+max_load = solver.max_hopper_load(
+    aircraft_data, pressure_alt_ft, oat_c, wind_kts, runway_condition, field_length_ft,
+    fuel_gal, pilot_weight_lbs, custom_empty, min_climb_fpm, clear_50ft
+)
+if max_load["feasible"]:
+    st.metric("Max Hopper Load", f"{int(max_load['hopper_gal'])} gal",
+              help=f"Gross weight {max_load['weight_lbs']:.0f} lb – limited by {max_load['limit']}")
+    st.caption(f"Limited by **{max_load['limit']}** at gross weight {max_load['weight_lbs']:.0f} lb.")
+else:
+    st.error(f"No hopper load is possible – limited by {max_load['limit']} even with an empty hopper.")
+with st.expander("Max hopper load table across OAT and wind"):
+    table_oats = np.arange(-10, 46, 5)
+    table_winds = np.arange(-10, 21, 5)
+    max_load_table = solver.max_hopper_load(
+        aircraft_data, pressure_alt_ft, table_oats[:, None], table_winds[None, :], runway_condition, field_length_ft,
+        fuel_gal, pilot_weight_lbs, custom_empty, min_climb_fpm, clear_50ft
+    )
+    st.dataframe(
+        {"OAT (°C)": table_oats, **{f"{w:+d} kt": np.floor(max_load_table["hopper_gal"][:, j]).astype(int) for j, w in enumerate(table_winds)}},
+        use_container_width=True, hide_index=True
+    )
+    st.caption(f"Gallons at {pressure_alt_ft} ft pressure altitude, {runway_condition.lower()}. Wind: headwind (+) / tailwind (−).")
+
+# Job comparison – every type and saved tail against one job
+if st.toggle("Job comparison (which aircraft can do this job)"):
+    job_cols = st.columns(4)
+    job_gallons = job_cols[0].number_input("Gallons needed", min_value=1, max_value=100_000, value=3000, step=100)
+    job_field_ft = job_cols[1].number_input("Field length (ft)", min_value=0, max_value=10000,
+                                            value=field_length_ft, step=100, key="job_field_ft")
+    job_elevation_ft = job_cols[2].number_input("Field elevation (ft)", min_value=-1000, max_value=15000,
+                                                value=int(pressure_alt_ft), step=100, key="job_elevation_ft")
+    job_oat_c = job_cols[3].number_input("Expected OAT (°C)", min_value=-30, max_value=50, value=int(oat_c), step=1,
+                                         key="job_oat_c")
+    job_cols = st.columns(4)
+    job_condition = job_cols[0].selectbox("Surface", options=performance.RUNWAY_CONDITION_NAMES,
+                                          index=performance.RUNWAY_CONDITION_NAMES.index(runway_condition),
+                                          key="job_condition")
+    job_altimeter = job_cols[1].number_input("Altimeter (inHg)", min_value=28.0, max_value=31.5,
+                                             value=wind.STANDARD_ALTIMETER_INHG, step=0.01, format="%.2f",
+                                             key="job_altimeter")
+    job_cols[2].markdown("<div style='padding-top: 28px;'></div>", unsafe_allow_html=True)
+    job_full_fuel = job_cols[2].checkbox("Full fuel", value=True, help="Unchecked: the current fuel load, clipped to each type's tanks")
+    job_fleet_only = job_cols[3].toggle("Saved fleet only", value=False, disabled=not fleet_entries)
+    comparison = calculations.job_comparison(
+        job_gallons, job_field_ft, job_elevation_ft, job_oat_c, pilot_weight_lbs, fleet_entries.values(),
+        None if job_full_fuel else fuel_gal, wind_kts, job_condition, job_altimeter, min_climb_fpm, clear_50ft)
+    st.dataframe([{
+        "Aircraft": row["name"] + ("" if not row["fleet"] else f" ({row['aircraft']})"),
+        "Loads": row["loads"],
+        "Max hopper (gal)": int(row["hopper_gal"]),
+        "Limited by": row["limit"],
+        "Gross weight (lbs)": round(row["weight_lbs"]),
+        "Takeoff margin (ft)": None if row["takeoff_margin_ft"] is None else round(row["takeoff_margin_ft"]),
+        "Climb (fpm)": round(row["climb_rate_fpm"]),
+        "Hover margin OGE (ft)": None if row["hover_margin_ft"] is None else round(row["hover_margin_ft"]),
+    } for row in comparison if row["fleet"] or not job_fleet_only], use_container_width=True, hide_index=True)
+    st.caption(f"Every type at its base empty weight and every saved tail at its own, each at its max hopper load "
+               f"for the job; ranked by loads, then load size. Pilot {pilot_weight_lbs} lb, wind {wind_kts:+d} kt, "
+               f"{min_climb_fpm} fpm minimum climb; helicopters must hover OGE at the field.")
+
+# Performance envelope – where the loaded aircraft stops meeting the limits above
+if st.toggle("Performance envelope heatmaps (PA × OAT)", value=not FAST_START):
+    envelope_weight = st.slider(
+        "Envelope gross weight (lbs)",
+        min_value=min_weight,
+        max_value=aircraft_data["max_takeoff_weight_lbs"],
+        value=weight_lbs,
+        step=50
+    )
+    st.vega_lite_chart(charts.envelope_heatmaps(
+        selected_aircraft, float(envelope_weight), float(wind_kts), runway_condition, clear_50ft,
+        float(field_length_ft), float(min_climb_fpm), current=(float(oat_c), float(pressure_alt_ft))
+    ))
+    envelope_limits = (f"{min_climb_fpm} fpm minimum climb and zero hover margin" if is_helicopter
+                       else f"{field_length_ft} ft available field and {min_climb_fpm} fpm minimum climb")
+    st.caption(f"Black lines: {envelope_limits}; conditions above a line are outside that limit. "
+               f"The cross marks the current PA and OAT. Wind {wind_kts:+d} kt, {runway_condition.lower()}.")
+
+# Uncertainty – takeoff and climb percentiles over sampled inputs
+if st.toggle("Uncertainty mode (Monte Carlo)", help="Sample uncertain inputs and report takeoff/climb percentiles"):
+    mc_cols = st.columns(5)
+    mc_oat_sd = mc_cols[0].number_input("OAT σ (°C)", min_value=0.0, max_value=10.0, value=2.0, step=0.5)
+    mc_gust = mc_cols[1].number_input(
+        "Gust headwind (kt)",
+        min_value=-20,
+        max_value=40,
+        value=int(wind_kts + metar_gust_increment_kt),
+        step=1,
+        help="Wind varies between an equally deep lull and this gust (prefilled from the METAR gust)"
+    )
+    mc_hopper_sd = mc_cols[2].number_input("Hopper load σ (gal)", min_value=0.0, max_value=100.0, value=5.0, step=1.0)
+    mc_pilot_sd = mc_cols[3].number_input("Pilot weight σ (lbs)", min_value=0.0, max_value=50.0, value=5.0, step=1.0)
+    mc_seed = mc_cols[4].number_input("Seed", min_value=0, value=0, step=1, help="Same seed, same result")
+    mc = compute_takeoff_uncertainty(
+        pressure_alt_ft, oat_c, wind_kts, runway_condition, fuel_gal, hopper_gal, pilot_weight_lbs, effective_empty,
+        selected_aircraft, field_length_ft, min_climb_fpm, gust_kts=mc_gust,
+        uncertainty={"oat_c": ("normal", mc_oat_sd), "hopper_gal": ("normal", mc_hopper_sd),
+                     "pilot_weight_lbs": ("normal", mc_pilot_sd)},
+        seed=mc_seed
+    )
+    st.dataframe({
+        "Percentile": [f"P{p}" for p in mc["takeoff_ground_roll_ft"]],
+        "Gross weight (lbs)": [round(v) for v in mc["weight_lbs"].values()],
+        "Takeoff ground roll (ft)": [round(v) for v in mc["takeoff_ground_roll_ft"].values()],
+        "Takeoff to 50 ft (ft)": [round(v) for v in mc["takeoff_to_50ft_ft"].values()],
+        "Climb rate (fpm)": [round(v) for v in mc["climb_rate_fpm"].values()],
+    }, use_container_width=True, hide_index=True)
+    mc_metrics = st.columns(3)
+    mc_distance = "p_to_50ft_exceeds_field" if clear_50ft else "p_ground_roll_exceeds_field"
+    mc_metrics[0].metric(f"P(exceeds {field_length_ft} ft field)", f"{mc[mc_distance]:.1%}",
+                         help="To 50 ft" if clear_50ft else "Ground roll")
+    mc_metrics[1].metric(f"P(climb < {min_climb_fpm} fpm)", f"{mc['p_climb_below_min']:.1%}")
+    mc_metrics[2].metric("P(over max takeoff weight)", f"{mc['p_over_max_takeoff_weight']:.1%}")
+    st.caption(f"{mc['samples']:,} samples, seed {mc['seed']}. Pressure altitude σ "
+               f"{montecarlo.DEFAULT_UNCERTAINTY['pressure_alt_ft'][1]:g} ft, fuel σ {montecarlo.DEFAULT_UNCERTAINTY['fuel_gal'][1]:g} gal; "
+               "climb percentiles are the rate that share of samples meets or beats.")
+
+# TAF launch window – hour-by-hour go/no-go for the current load
+if st.toggle("TAF launch window", help="Hour-by-hour takeoff, climb and hover for the current load over the TAF period"):
+    from agpilot import taf
+    try:
+        decoded_taf = taf.parse_taf(taf_text) if taf_text else None
+    except ValueError:
+        decoded_taf = None
+    launch_strips = [strip_id for strip_id, strip in wind.strips().items()
+                     if decoded_taf is not None and strip.get("metar") == decoded_taf.station]
+    if decoded_taf is None:
+        st.info("Load weather for an airport that issues a TAF to see the launch window.")
+    elif not launch_strips:
+        st.info(f"No runway data for strips near {decoded_taf.station} – add them to agpilot/strips.json.")
+    else:
+        launch_cols = st.columns(3)
+        launch_strip = launch_cols[0].selectbox("Launch from", options=launch_strips,
+                                                format_func=lambda strip_id: wind.strips()[strip_id].get("name", strip_id))
+        launch_crosswind_kt = launch_cols[1].number_input("Crosswind limit (kt)", min_value=5, max_value=30,
+                                                          value=int(wind.DEFAULT_MAX_CROSSWIND_KT), step=1,
+                                                          key="launch_crosswind_kt")
+        launch_prob = launch_cols[2].toggle("Count PROB30/40 groups", value=True)
+        observed_at = datetime.now(timezone.utc)
+        observed_oat, observed_altimeter = oat_c, wind.STANDARD_ALTIMETER_INHG
+        if decoded_metar is not None:
+            if decoded_metar.day is not None:
+                observed_at = taf.resolve_time(decoded_metar.day, decoded_metar.hour, decoded_metar.minute, observed_at)
+            if decoded_metar.temp_c is not None:
+                observed_oat = decoded_metar.temp_c
+            observed_altimeter = decoded_metar.altimeter_inhg or observed_altimeter
+        hourly = taf.timeline(decoded_taf, observed_oat, observed_altimeter, observed_at, launch_prob)
+
+        # Every type carries the current load (clipped to its tanks); the selected type uses the exact loading.
+        fleet_names = list(AIRCRAFT_DATA)
+        fleet_rows = AIRCRAFT_DATA.rows(fleet_names)
+        fleet_weights, _, _ = performance.weight_balance(
+            fleet_rows, np.minimum(fuel_gal, fleet_rows["base_fuel_capacity_gal"]),
+            np.minimum(hopper_gal, fleet_rows["hopper_capacity_gal"]), pilot_weight_lbs)
+        selected_index = fleet_names.index(selected_aircraft)
+        fleet_weights[selected_index], _, _ = performance.weight_balance(
+            aircraft_data, fuel_gal, hopper_gal, pilot_weight_lbs, effective_empty)
+        launch = taf.forecast(fleet_rows, hourly, wind.runways((launch_strip,)), fleet_weights, runway_condition,
+                              min_climb_fpm, launch_crosswind_kt, clear_50ft)
+        window_start, window_stop = taf.launch_window(launch["go"])
+
+        def window_label(i):
+            if window_stop[i] == window_start[i]:
+                return "no go hours"
+            return (f"{hourly['times'][window_start[i]]:%d %H}Z–"
+                    f"{hourly['times'][window_stop[i] - 1] + (hourly['times'][1] - hourly['times'][0]):%d %H}Z")
+
+        st.metric("Best launch window", window_label(selected_index),
+                  help=f"Longest run of hours that pass every limit in every TAF scenario at {fleet_weights[selected_index]:,.0f} lbs")
+        st.dataframe([{
+            "Hour (UTC)": f"{hourly['times'][h]:%d %H}Z",
+            "Go": "✅" if launch["go"][selected_index, h] else "❌",
+            "Runway": launch["runway"][selected_index, h] or ("—" if is_helicopter else "none usable"),
+            "Headwind (kt)": None if np.isnan(launch["headwind_kt"][selected_index, h]) else round(launch["headwind_kt"][selected_index, h], 1),
+            "Crosswind (kt)": None if np.isnan(launch["crosswind_kt"][selected_index, h]) else round(launch["crosswind_kt"][selected_index, h], 1),
+            "Spare runway (ft)": None if is_helicopter or np.isinf(launch["margin_ft"][selected_index, h]) else round(launch["margin_ft"][selected_index, h]),
+            "Hover margin (ft)": round(launch["hover_margin_ft"][selected_index, h])
+            if is_helicopter and np.isfinite(launch["hover_margin_ft"][selected_index, h]) else None,
+            "Climb (fpm)": round(launch["climb_rate_fpm"][selected_index, h]),
+            "DA (ft)": round(launch["density_altitude_ft"][selected_index, h]),
+            "Weather": "OK" if launch["weather_ok"][selected_index, h] else "below minimums",
+        } for h in range(len(hourly["times"]))], use_container_width=True, hide_index=True)
+        with st.expander("Fleet launch windows at this load"):
+            st.dataframe([{
+                "Aircraft": name,
+                "Weight (lbs)": round(fleet_weights[i]),
+                "Launch window": window_label(i),
+                "Go hours": int(launch["go"][i].sum()),
+            } for i, name in enumerate(fleet_names)], use_container_width=True, hide_index=True)
+        st.caption(f"Worst of {len(hourly['kind'])} TAF scenarios each hour (prevailing plus each TEMPO/BECMG"
+                   f"{'/PROB' if launch_prob else ''} group). Weather minimums {taf.MIN_CEILING_FT} ft ceiling, "
+                   f"{taf.MIN_VISIBILITY_SM:g} sm visibility, no thunderstorms or squalls. Temperature follows the METAR "
+                   "and any TX/TN groups; the altimeter is carried forward.")
+
+# Sortie simulation – fuel burn and hopper dispense minute by minute
+if st.toggle("Sortie simulation (fuel burn & hopper dispense)"):
+    from agpilot import sortie
+    sim_cols = st.columns(5)
+    sim_passes = sim_cols[0].number_input("Spray passes", min_value=1, max_value=60, value=12, step=1)
+    sim_pass_min = sim_cols[1].number_input("Pass length (min)", min_value=0.25, max_value=10.0, value=0.75, step=0.25)
+    sim_turn_min = sim_cols[2].number_input("Turnaround (min)", min_value=0.25, max_value=5.0, value=0.5, step=0.25)
+    sim_ferry_min = sim_cols[3].number_input("Ferry each way (min)", min_value=0.0, max_value=60.0, value=5.0, step=1.0)
+    sim_fuel_gph = sim_cols[4].number_input(
+        "Fuel flow (gph)",
+        min_value=1.0,
+        max_value=200.0,
+        value=float(round(aircraft_data["base_fuel_capacity_gal"] / 3)),
+        step=1.0,
+        help="Default assumes about three hours' endurance – use your aircraft's figure"
+    )
+    sim_reserve_gal = st.number_input("Fuel reserve (gal)", min_value=0.0, max_value=float(aircraft_data["base_fuel_capacity_gal"]),
+                                      value=float(round(sim_fuel_gph / 2)), step=1.0, help="Default ≈ 30 minutes at the fuel flow above")
+    sim = sortie.simulate(
+        aircraft_data,
+        sortie.spray_profile(int(sim_passes), sim_pass_min, sim_turn_min, sim_ferry_min, sim_fuel_gph),
+        fuel_gal, hopper_gal, pilot_weight_lbs, pressure_alt_ft, oat_c,
+        empty_weight_lbs=effective_empty, empty_arm_in=empty_arm_in, min_climb_fpm=min_climb_fpm, reserve_gal=sim_reserve_gal
+    )
+    sim_worst = {name: sim["worst"][name] for name in ("max_takeoff_weight", "max_landing_weight", "climb", "hover_oge", "fuel_reserve")
+                 if sim["worst"][name]["value"][0] < np.inf}
+    sim_units = {**sortie.MARGINS, "max_landing_weight": "lbs"}
+    st.dataframe({
+        "Limit": [name.replace("_", " ") for name in sim_worst],
+        "Worst margin": [f"{worst['value'][0]:+.0f} {sim_units[name]}" for name, worst in sim_worst.items()],
+        "At (min)": [worst["t_min"][0] for worst in sim_worst.values()],
+        "Phase": [worst["phase"][0] for worst in sim_worst.values()],
+    }, use_container_width=True, hide_index=True)
+    if not sim["fuel_ok"][0]:
+        st.error("Fuel reserve is used before landing – shorten the sortie or carry more fuel.")
+    if not sim["cg_ok"][0]:
+        st.error("CG leaves the envelope during the sortie.")
+    sim_points = sim["active"][0]
+    st.line_chart({
+        "Time (min)": sim["t_min"][0][sim_points],
+        "Gross weight (lbs)": sim["weight_lbs"][0][sim_points],
+        "Climb rate (fpm)": sim["climb_rate_fpm"][0][sim_points],
+        "Stall speed (mph)": sim["stall_speed_mph"][0][sim_points],
+    }, x="Time (min)")
+    st.caption(f"{sim['duration_min'][0]:.1f} min sortie in {sortie.DEFAULT_STEP_MIN} min steps; "
+               "the hopper empties evenly over the spray passes. Negative margin = limit exceeded.")
+st.markdown("---")
+
+# ────────────────────────────────────────────────
+# Spray Block Planner
+# ────────────────────────────────────────────────
+st.subheader("Spray Block Planner")
+st.caption("Passes, hopper loads and ferry legs for a field. Upload the field boundary as GeoJSON "
+           "(Polygon or MultiPolygon; holes are treated as no-spray areas) or try the sample field.")
+field_file = st.file_uploader("Field boundary (GeoJSON)", type=["geojson", "json"])
+use_sample_field = st.toggle("Use sample field near KELN", value=False)
+if field_file is not None or use_sample_field:
+    from agpilot import sprayplan
+    plan_cols = st.columns(4)
+    swath_ft = plan_cols[0].number_input("Swath width (ft)", min_value=10, max_value=200, value=60 if not is_helicopter else 40, step=5)
+    rate_gpa = plan_cols[1].number_input("Application rate (gal/acre)", min_value=0.1, max_value=50.0, value=3.0, step=0.5)
+    strip_lat = plan_cols[2].number_input("Loading strip latitude", min_value=-90.0, max_value=90.0,
+                                          value=sprayplan.SAMPLE_STRIP[1], step=0.001, format="%.4f")
+    strip_lon = plan_cols[3].number_input("Loading strip longitude", min_value=-180.0, max_value=180.0,
+                                          value=sprayplan.SAMPLE_STRIP[0], step=0.001, format="%.4f")
+    speed_cols = st.columns(3)
+    spray_speed = speed_cols[0].number_input("Spray speed (mph)", min_value=20, max_value=200,
+                                             value=int(sprayplan.DEFAULT_SPRAY_SPEED_MPH) if not is_helicopter else 60, step=5)
+    ferry_speed = speed_cols[1].number_input("Ferry speed (mph)", min_value=20, max_value=250,
+                                             value=int(sprayplan.DEFAULT_FERRY_SPEED_MPH) if not is_helicopter else 90, step=5)
+    turn_s = speed_cols[2].number_input("Turnaround (s)", min_value=5, max_value=180, value=int(sprayplan.DEFAULT_TURN_S), step=5)
+    try:
+        field = field_file.getvalue() if field_file is not None else sprayplan.SAMPLE_FIELD
+        spray_plan = sprayplan.plan(field, swath_ft, rate_gpa, aircraft_data["hopper_capacity_gal"], (strip_lon, strip_lat),
+                                    spray_speed, ferry_speed, turn_s)
+    except (ValueError, KeyError, TypeError) as e:
+        st.error(f"Could not plan this field: {e}")
+    else:
+        plan_metrics = st.columns(4)
+        plan_metrics[0].metric("Passes", spray_plan["n_passes"], help=f"First pass heading {spray_plan['heading_deg']:.0f}° true")
+        plan_metrics[1].metric("Loads", spray_plan["n_loads"], help=f"{aircraft_data['hopper_capacity_gal']} gal hopper")
+        plan_metrics[2].metric("Ferry", f"{spray_plan['ferry_nm']:.1f} nm", help=f"{spray_plan['ferry_min']:.0f} min")
+        plan_metrics[3].metric("Total time", f"{spray_plan['total_min']:.0f} min")
+        st.caption(f"{spray_plan['field_acres']:.0f} acres, {spray_plan['volume_gal']:.0f} gal at {rate_gpa} gal/acre; "
+                   f"{spray_plan['n_transits']} transits around obstacles or concave edges. "
+                   f"Best of {spray_plan['candidates']} pass orientations and orderings.")
+        st.vega_lite_chart(charts.spray_plan_chart(sprayplan.field_polygons(field), spray_plan, (strip_lon, strip_lat)),
+                           use_container_width=True)
+        st.download_button("Download route GeoJSON", json.dumps(sprayplan.to_geojson(spray_plan)),
+                           file_name="agpilot_spray_route.geojson", mime="application/geo+json")
+st.markdown("---")
+
+# ────────────────────────────────────────────────
+# Load Plan (batch)
+# ────────────────────────────────────────────────
+st.subheader("Load Plan – Batch Sortie Check")
+st.caption("Upload a CSV with one sortie per row to check the whole day's plan at once. "
+           "Leave empty_weight_lbs blank to use the base empty weight and field_length_ft blank to skip the runway check.")
+st.download_button("Download CSV template", loadplan.TEMPLATE_CSV, file_name="agpilot_load_plan_template.csv", mime="text/csv")
+load_plan_file = st.file_uploader("Load plan CSV", type=["csv"])
+if load_plan_file is not None:
+    try:
+        load_plan = loadplan.evaluate_sorties(loadplan.read_sorties(load_plan_file.getvalue()), AIRCRAFT_DATA)
+    except ValueError as e:
+        st.error(f"Could not evaluate load plan: {e}")
+    else:
+        n_sorties = len(load_plan["pass"])
+        n_failed = n_sorties - int(load_plan["pass"].sum())
+        if n_failed:
+            st.warning(f"{n_failed} of {n_sorties} sorties fail at least one check.")
+        else:
+            st.success(f"All {n_sorties} sorties pass.")
+        st.dataframe(load_plan, use_container_width=True)
+        st.download_button("Download results CSV", loadplan.to_csv(load_plan), file_name="agpilot_load_plan_results.csv", mime="text/csv")
+st.markdown("---")
+
+# ────────────────────────────────────────────────
+# Seasonal Climatology (built offline by agpilot.climatology)
+# ────────────────────────────────────────────────
+CLIMATOLOGY_DIR = os.environ.get("AGPILOT_CLIMATOLOGY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "climatology"))
+
+@st.cache_resource
+def load_climatology(path):
+    from agpilot import climatology
+    return climatology.load(path)
+
+st.subheader("Seasonal Climatology")
+climatology_files = sorted(glob.glob(os.path.join(CLIMATOLOGY_DIR, "*.npz")))
+if climatology_files:
+    clim_cols = st.columns(3)
+    clim_path = clim_cols[0].selectbox("Climatology file", climatology_files, format_func=os.path.basename)
+    clim, clim_meta = load_climatology(clim_path)
+    clim_aircraft = list(clim["aircraft"])
+    clim_type = clim_cols[1].selectbox(
+        "Aircraft type", clim_aircraft,
+        index=clim_aircraft.index(selected_aircraft) if selected_aircraft in clim_aircraft else 0
+    )
+    clim_month = clim_cols[2].selectbox("Month", range(1, 13), index=datetime.now().month - 1,
+                                        format_func=lambda m: datetime(2000, m, 1).strftime("%B"))
+    i, m = clim_aircraft.index(clim_type), clim_month - 1
+    p10, p50, p90 = (list(clim["percentiles"]).index(p) for p in (10, 50, 90))
+    st.caption(f"{clim_meta['station'] or 'All stations'} – {clim_meta['observations']} observations, "
+               f"{clim_meta['field_length_ft']:.0f} ft {clim_meta['runway_condition']}, hours are local (UTC{clim_meta['utc_offset_h']:+g}).")
+    st.dataframe({
+        "Hour": list(range(24)),
+        "Obs": clim["count"][m],
+        "DA P50 (ft)": clim["density_altitude_ft"][m, :, p50].round(),
+        "DA P90 (ft)": clim["density_altitude_ft"][m, :, p90].round(),
+        "Full hopper possible (%)": (clim["full_hopper_fraction"][i, m] * 100).round(),
+        "Max hopper P10 (gal)": clim["max_hopper_gal"][i, m, :, p10].round(),
+        "Max hopper P50 (gal)": clim["max_hopper_gal"][i, m, :, p50].round(),
+        "Takeoff to 50 ft P90 (ft)": clim["takeoff_to_50ft_ft"][i, m, :, p90].round(),
+    }, use_container_width=True, hide_index=True)
+else:
+    st.caption("No climatology files yet. Build one from archived METARs with "
+               "`python -m agpilot.climatology ARCHIVES... --station KYKM --elevation 1099 --out data/climatology/KYKM.npz`.")
+st.markdown("---")
+
+# Calculation cache – shared by every session in this server process
+with st.expander("Calculation cache statistics"):
+    st.dataframe([{
+        "Function": row["function"],
+        "Hits": row["hits"],
+        "Misses": row["misses"],
+        "Hit rate (%)": round(row["hit_rate"] * 100, 1),
+        "Entries": f"{row['size']} / {row['maxsize']}",
+        "Evictions": row["evictions"],
+    } for row in memo.stats()], use_container_width=True, hide_index=True)
+    st.caption("Inputs are rounded conservatively before lookup: "
+               + ", ".join(f"{name} {'up' if rounding.__name__ == 'ceil' else 'down'} to {step}"
+                           for name, (step, rounding) in calculations.CACHE_STEPS.items())
+               + ". Counters cover every session since the server started.")
 
 # Feedback
 st.subheader("Your Feedback – Help Improve AgPilot")
@@ -0,0 +1,88 @@
+"""Time-to-first-render benchmark and startup profile for app.py.
+
+Each sample runs the app's first script execution in a fresh Python process
+(Streamlit itself already imported, as in a running server), so module
+imports, cache_resource initialisation and any blocking network calls on the
+critical path are all counted. The median is checked against a budget.
+
+Usage:
+    python startup_bench.py                       # fast-start mode, 5 samples, 2.0 s budget
+    python startup_bench.py --mode both --runs 3  # compare fast-start with the full page
+    python startup_bench.py --profile             # top functions of one first render
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+TTFR_BUDGET_S = 2.0
+
+_SAMPLE = """
+import sys, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+start = time.perf_counter()
+at.run()
+elapsed = time.perf_counter() - start
+if at.exception:
+    sys.exit("app raised: " + at.exception[0].value)
+deferred = ("matplotlib.pyplot", "PIL.Image", "requests",
+            "agpilot.climatology", "agpilot.sortie", "agpilot.sprayplan", "agpilot.taf", "agpilot.weather")
+heavy = [name for name in deferred if name in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+# The profile executes the script in "bare" mode on the main thread (st.* calls render nothing),
+# which isolates the script's own critical path: imports, cached resources and top-level work.
+_PROFILE = """
+import cProfile, logging, pstats, runpy, sys
+import streamlit
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+profiler = cProfile.Profile()
+profiler.enable()
+runpy.run_path(sys.argv[1], run_name="__main__")
+profiler.disable()
+pstats.Stats(profiler).sort_stats("cumulative").print_stats(30)
+"""
+
+
+def sample(mode):
+    env = dict(os.environ, AGPILOT_FAST_START="1" if mode == "fast" else "0")
+    result = subprocess.run([sys.executable, "-c", _SAMPLE, APP_PATH], env=env, cwd=os.path.dirname(APP_PATH),
+                            capture_output=True, text=True, check=True)
+    fields = result.stdout.strip().splitlines()[-1].split(" ")
+    elapsed, heavy = float(fields[0]), (fields[1] if len(fields) > 1 else "")
+    return elapsed, heavy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("fast", "full", "both"), default="fast")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=TTFR_BUDGET_S, help="median time-to-first-render budget (s)")
+    parser.add_argument("--profile", action="store_true", help="print a cProfile of one fast-start first render")
+    args = parser.parse_args(argv)
+
+    if args.profile:
+        env = dict(os.environ, AGPILOT_FAST_START="1")
+        subprocess.run([sys.executable, "-c", _PROFILE, APP_PATH], env=env, cwd=os.path.dirname(APP_PATH), check=True)
+        return 0
+
+    over_budget = False
+    for mode in (("fast", "full") if args.mode == "both" else (args.mode,)):
+        samples = [sample(mode) for _ in range(args.runs)]
+        times = [elapsed for elapsed, _ in samples]
+        median = statistics.median(times)
+        print(f"{mode:5s} first render: median {median:.2f} s, min {min(times):.2f} s, max {max(times):.2f} s "
+              f"({args.runs} runs); heavy modules loaded: {samples[-1][1] or 'none'}")
+        if mode == "fast" and median > args.budget:
+            print(f"FAIL: fast-start median {median:.2f} s exceeds the {args.budget:.2f} s budget")
+            over_budget = True
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
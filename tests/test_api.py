@@ -0,0 +1,48 @@
+import http.client
+import json
+import math
+import threading
+
+import pytest
+
+from agpilot import api
+
+
+@pytest.fixture
+def server():
+    server = api.PooledHTTPServer(("127.0.0.1", 0), workers=4)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server, path, body, length=None):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=5)
+    connection.putrequest("POST", path)
+    connection.putheader("Content-Type", "application/json")
+    connection.putheader("Content-Length", str(len(body)) if length is None else length)
+    connection.endheaders(body)
+    response = connection.getresponse()
+    payload = json.loads(response.read())
+    connection.close()
+    return response.status, payload
+
+
+@pytest.mark.parametrize("length", ["abc", "-1", "1.5"])
+def test_bad_content_length_is_a_400(server, length):
+    status, payload = post(server, "/v1/performance", b"{}", length)
+    assert status == 400
+    assert "Content-Length" in payload["error"]
+
+
+def test_single_request(server):
+    status, payload = post(server, "/v1/max-hopper", json.dumps(api.SAMPLE_REQUESTS["/v1/max-hopper"]).encode())
+    assert status == 200
+    assert 0 < payload["hopper_gal"] <= 800
+
+
+def test_non_finite_values_are_sent_as_null():
+    payload = {"a": math.inf, "b": [math.nan, 1.5, -math.inf], "c": {"d": 2.0, "e": "text"}}
+    assert json.loads(json.dumps(api._finite(payload), allow_nan=False)) == {
+        "a": None, "b": [None, 1.5, None], "c": {"d": 2.0, "e": "text"}}
@@ -0,0 +1,45 @@
+import pytest
+
+from agpilot import fleet
+
+
+@pytest.fixture
+def store():
+    store = fleet.FleetStore(":memory:")
+    yield store
+    store.close()
+
+
+def test_save_update_delete(store):
+    store.save(" N802AT ", "Air Tractor AT-802", 6900, 160.5, "new prop ")
+    store.save("N502B", "Air Tractor AT-502B")
+    entry = store.get("N802AT")
+    assert (entry.aircraft, entry.empty_weight_lbs, entry.empty_arm_in, entry.notes) == (
+        "Air Tractor AT-802", 6900, 160.5, "new prop")
+    assert list(store.entries()) == ["N502B", "N802AT"]
+
+    store.save("N802AT", "Air Tractor AT-802", 6950)
+    assert store.get("N802AT").empty_weight_lbs == 6950 and store.get("N802AT").empty_arm_in is None
+    assert [e.nickname for e in store.by_aircraft("Air Tractor AT-802")] == ["N802AT"]
+
+    store.delete("N802AT")
+    assert store.get("N802AT") is None and store.by_aircraft("Air Tractor AT-802") == []
+
+
+def test_blank_nickname(store):
+    with pytest.raises(ValueError):
+        store.save("  ", "Air Tractor AT-802")
+
+
+def test_other_connection_sees_saves(tmp_path):
+    path = str(tmp_path / "fleet.sqlite3")
+    first, second = fleet.FleetStore(path), fleet.FleetStore(path)
+    try:
+        assert second.entries() == {}
+        first.save("N802AT", "Air Tractor AT-802")
+        assert list(second.entries()) == ["N802AT"]
+        first.delete("N802AT")
+        assert second.entries() == {}
+    finally:
+        first.close()
+        second.close()
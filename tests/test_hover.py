@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from agpilot import hover, performance, solver
+from agpilot.aircraft import database
+
+HELICOPTERS = database().names("helicopter")
+
+
+@pytest.fixture(scope="module")
+def table():
+    return hover.charts()
+
+
+def test_max_weight_at_nodes_and_between(table):
+    index = table.by_name["Robinson R44 Raven II"]
+    chart = table.tables[index, 1]
+    pa, oat = np.meshgrid(table.pressure_alt_ft, table.oat_c, indexing="ij")
+    np.testing.assert_allclose(table.max_weight(index, pa, oat), chart)
+    # Bilinear: the centre of a cell is the mean of its four corners.
+    centre = table.max_weight(index, pa[:-1, :-1] + 500, oat[:-1, :-1] + 5)
+    np.testing.assert_allclose(centre, (chart[:-1, :-1] + chart[1:, :-1] + chart[:-1, 1:] + chart[1:, 1:]) / 4)
+    ige = table.max_weight(index, pa, oat, out_of_ground_effect=False)
+    np.testing.assert_allclose(ige, table.tables[index, 0])
+
+
+def test_ceiling_inverts_max_weight(table):
+    index = table.by_name["Bell 206 JetRanger III"]
+    rng = np.random.default_rng(0)
+    pa = rng.uniform(0, table.pressure_alt_ft[-1], 500)
+    oat = rng.choice(table.oat_c, 500)    # on an OAT node both are piecewise linear in PA
+    weight = table.max_weight(index, pa, oat)
+    np.testing.assert_allclose(table.ceiling(index, weight, oat), pa, atol=1e-6)
+
+
+def test_above_the_chart_cannot_hover(table):
+    index = table.by_name["Robinson R44 Raven II"]
+    assert table.max_weight(index, 16_000, 15) == 0
+    assert table.max_weight(index, 5_000, 55) == 0
+    assert table.max_weight(index, 14_000, 50) > 0
+    assert table.ceiling(index, 1500, 55) == -np.inf
+    # A light weight is only vouched for up to the top of the chart.
+    assert table.ceiling(index, 100, 15) == table.pressure_alt_ft[-1]
+
+
+def test_below_the_chart_uses_the_edge(table):
+    index = table.by_name["Robinson R44 Raven II"]
+    assert table.max_weight(index, -800, 15) == table.max_weight(index, 0, 15)
+    assert table.max_weight(index, 5_000, -40) == table.max_weight(index, 5_000, -30)
+
+
+def test_margins_are_signed(table):
+    data = database()["Robinson R44 Raven II"]
+    _, oge = hover.hover_margins(data, 16_000, 15, 1800)
+    assert oge == pytest.approx(table.pressure_alt_ft[-1] - 16_000)
+    # Heavier than even the sea-level node: the ceiling extrapolates below sea level.
+    heavy = table.tables[table.by_name["Robinson R44 Raven II"], 1, 0, 0] + 200
+    _, oge = hover.hover_margins(data, 0, -30, heavy)
+    assert oge < 0
+
+
+def test_margin_sign_matches_max_hover_weight():
+    rng = np.random.default_rng(1)
+    names = rng.choice(HELICOPTERS, 5000)
+    data = database().rows(names)
+    pa, oat = rng.uniform(-500, 18_000, 5000), rng.uniform(-35, 55, 5000)
+    weight = data["max_takeoff_weight_lbs"] * rng.uniform(0.5, 1.1, 5000)
+    ige, oge = hover.hover_margins(data, pa, oat, weight)
+    for margin, out_of_ground_effect in ((ige, False), (oge, True)):
+        limit = hover.max_hover_weight(data, pa, oat, out_of_ground_effect)
+        clear = np.abs(weight - limit) > 1e-6
+        assert ((margin >= 0) == (weight <= limit))[clear].all()
+
+
+def test_hot_and_high_at_mtow_is_not_a_hover():
+    data = database().rows(HELICOPTERS)
+    _, oge = hover.hover_margins(data, 9000, 40, data["max_takeoff_weight_lbs"])
+    assert (oge < 0).all()
+
+
+def test_fixed_wing_and_formula_fallback():
+    fixed = database()["Air Tractor AT-802"]
+    assert hover.hover_margins(fixed, 5000, 30, 16_000) == (0.0, 0.0)
+    record = {key: value for key, value in database()["Robinson R44 Raven II"].items() if key != "name"}
+    ige, oge = hover.hover_margins(record, 9000, 40, record["max_takeoff_weight_lbs"])
+    expected = performance.hover_margin(record, performance.density_altitude(9000, 40), record["max_takeoff_weight_lbs"])
+    assert (ige, oge) == pytest.approx(expected)
+    assert oge < 0
+
+
+def test_solver_above_the_chart_lifts_nothing():
+    data = database()["Robinson R44 Raven II"]
+    load = solver.max_hopper_load(data, 16_000, 0, 0, performance.RUNWAY_CONDITION_NAMES[0], 3000, 20, 170)
+    assert not load["feasible"]
+    assert load["hopper_gal"] == 0 and load["limit"] == "hover ceiling"
@@ -0,0 +1,71 @@
+import csv
+import io
+import time
+
+import numpy as np
+import pytest
+
+from agpilot import loadplan
+from agpilot.aircraft import database
+
+
+def test_template_round_trip():
+    sorties = loadplan.read_sorties(loadplan.TEMPLATE_CSV)
+    table = loadplan.evaluate_sorties(sorties, database())
+    assert len(table["pass"]) == 2
+    assert set(loadplan.RESULT_COLUMNS) <= set(table)
+    assert loadplan.to_csv(table).count("\n") == 3
+
+
+def test_short_row_is_rejected_with_its_line_number():
+    text = loadplan.TEMPLATE_CSV + "Air Tractor AT-802,KELN,1800\n"
+    with pytest.raises(ValueError, match="line 4"):
+        loadplan.read_sorties(text)
+
+
+def test_blank_lines_are_skipped():
+    sorties = loadplan.read_sorties(loadplan.TEMPLATE_CSV.replace("\n", "\n\n", 1))
+    assert len(sorties["aircraft"]) == 2
+    assert np.isnan(sorties["fuel_burn_gal"]).all()
+
+
+def test_unknown_runway_condition_is_rejected():
+    sorties = loadplan.read_sorties(loadplan.TEMPLATE_CSV.replace("Dry Grass / Firm Turf", "Dry grass"))
+    with pytest.raises(ValueError, match="Dry grass"):
+        loadplan.evaluate_sorties(sorties, database())
+
+
+def test_quoted_fields_parse_like_plain_ones():
+    plain = loadplan.read_sorties(loadplan.TEMPLATE_CSV)
+    quoted = loadplan.read_sorties(loadplan.TEMPLATE_CSV.replace("KELN", '"KELN"'))
+    for key, values in plain.items():
+        np.testing.assert_array_equal(quoted[key], values)
+
+
+def test_to_csv_matches_per_cell_formatting():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.uniform(-1e5, 1e5, 1000), np.round(rng.uniform(-100, 100, 1000), 2) + 0.05,
+                             [np.nan, np.inf, -np.inf, -0.04, 0.0]])
+    names = np.array(['A "quoted", field', "Zoë"] * (values.size // 2) + ["plain"])
+    table = {"name": names, "value": values, "ok": values > 0}
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(table)
+    for name, value in zip(names.tolist(), values.tolist()):
+        text = "" if np.isnan(value) else str(value) if np.isinf(value) else f"{value:.1f}"
+        writer.writerow([name, text, value > 0])
+    expected = buffer.getvalue().splitlines()
+    assert loadplan.to_csv(table).splitlines() == expected
+
+
+def test_large_plan_reads_and_writes_quickly():
+    rows = loadplan.TEMPLATE_CSV.splitlines()
+    text = "\n".join([rows[0]] + rows[1:] * 50_000) + "\n"
+    start = time.perf_counter()
+    sorties = loadplan.read_sorties(text)
+    output = loadplan.to_csv(sorties)
+    elapsed = time.perf_counter() - start
+    assert len(sorties["aircraft"]) == 100_000
+    assert output.count("\n") == 100_001
+    # Row by row this took about 0.6 s; column-wise it takes about 0.25 s.
+    assert elapsed < 0.5
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from agpilot import lookup, performance
+from agpilot.aircraft import database
+
+TYPES = ("Air Tractor AT-802", "Robinson R44 Raven II")
+
+
+@pytest.fixture(scope="module")
+def tables(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("lookup")
+    lookup.build(directory, {name: database()[name] for name in TYPES})
+    return lookup.LookupTables(directory)
+
+
+def test_accuracy_within_tolerance(tables):
+    errors = lookup.accuracy(tables, samples=50_000)
+    assert set(errors) == set(TYPES)
+    assert max(errors.values()) <= lookup.TOLERANCE
+
+
+def test_grid_nodes_are_exact(tables):
+    name = TYPES[0]
+    data = database()[name]
+    pa, oat, weight, wind = np.ix_(lookup.PRESSURE_ALT_FT, lookup.OAT_C, tables.weight_lbs[0], lookup.WIND_KTS)
+    for condition in performance.RUNWAY_CONDITION_NAMES:
+        looked_up = tables.query(name, pa, oat, weight, wind, condition)
+        exact = performance.evaluate(data, pa, oat, weight, wind, condition)
+        for key in lookup.OUTPUTS:
+            np.testing.assert_allclose(looked_up[key], exact[key], rtol=1e-6, atol=1e-3)
+
+
+def test_off_grid_is_nan(tables):
+    name = TYPES[0]
+    mtow = database()[name]["max_takeoff_weight_lbs"]
+    looked_up = tables.query(name, [5000, 25_000, 5000, 5000, 5000], [15, 15, 60, 15, 15],
+                             [mtow, mtow, mtow, 1.2 * mtow, mtow], [0, 0, 0, 0, 30], 0)
+    assert np.isfinite(looked_up["takeoff_to_50ft_ft"][0])
+    assert np.isnan(looked_up["takeoff_to_50ft_ft"][1:]).all()
+
+
+def test_benchmark_and_check(tables, tmp_path, capsys):
+    timings = lookup.benchmark(tables, TYPES[1], samples=100_000, scalar_queries=100)
+    assert set(timings) == {"lookup_scalar_us", "lookup_batched_ms", "formulas_scalar_us", "formulas_batched_ms"}
+    assert timings["lookup_batched_ms"] < 1000
+    lookup.build(tmp_path, {TYPES[0]: database()[TYPES[0]]})
+    assert lookup.check(tmp_path, samples=10_000)
+    assert "tolerance" in capsys.readouterr().out
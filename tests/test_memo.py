@@ -0,0 +1,39 @@
+import math
+
+import pytest
+
+from agpilot import calculations, memo
+
+
+@pytest.mark.parametrize("value, step, rounding, expected", [
+    (1803, 10, math.ceil, 1810), (1800, 10, math.ceil, 1800), (27.2, 1, math.ceil, 28),
+    (5.9, 1, math.floor, 5), (-2.5, 1, math.floor, -3), (14504, 10, round, 14500), (None, 10, math.ceil, None),
+])
+def test_quantize(value, step, rounding, expected):
+    assert memo.quantize(value, step, rounding) == expected
+
+
+def test_lru_eviction_and_counters():
+    cached = memo.Memo(lambda x: [x], maxsize=2)
+    for x in (1, 2, 1, 3, 2):
+        cached(x)
+    # 1 hits once; 3 evicts 2 (least recently used), so the last 2 misses and evicts 1.
+    assert cached.stats() | {"function": None} == {
+        "function": None, "hits": 1, "misses": 4, "evictions": 2, "size": 2, "maxsize": 2, "hit_rate": 0.2}
+
+
+def test_results_are_copies():
+    cached = memo.Memo(lambda x: {"values": [x]})
+    cached(1)["values"].append(99)
+    assert cached(1) == {"values": [1]}
+
+
+def test_quantized_inputs_are_conservative():
+    aircraft = "Air Tractor AT-802"
+    condition = "Paved / Dry Hard Surface"
+    exact = calculations.compute_takeoff.function(1801, 27.2, 14501, 5.9, condition, aircraft)
+    cached = calculations.compute_takeoff(1801, 27.2, 14501, 5.9, condition, aircraft)
+    assert cached == calculations.compute_takeoff.function(1810, 28, 14510, 5, condition, aircraft)
+    assert all(c >= e for c, e in zip(cached, exact))
+    assert (calculations.compute_climb_rate(1801, 27.2, 14501, aircraft)
+            <= calculations.compute_climb_rate.function(1801, 27.2, 14501, aircraft))
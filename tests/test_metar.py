@@ -0,0 +1,35 @@
+import pytest
+
+from agpilot import metar
+
+
+def test_metar_groups_and_precise_temperature():
+    report = metar.parse_metar("METAR KELN 311156Z AUTO 31012G22KT 280V340 1 1/2SM -RA BR BKN008 OVC020 "
+                               "M01/M03 A2992 RMK AO2 T10061028")
+    assert (report.station, report.day, report.hour, report.minute, report.auto) == ("KELN", 31, 11, 56, True)
+    assert (report.wind_dir_deg, report.wind_speed_kt, report.wind_gust_kt) == (310, 12, 22)
+    assert (report.wind_var_from_deg, report.wind_var_to_deg) == (280, 340)
+    assert report.visibility_sm == 1.5
+    assert report.weather == ("-RA", "BR")
+    assert report.ceiling_ft == 800
+    assert report.temp_c == -0.6 and report.dewpoint_c == -2.8
+    assert report.altimeter_inhg == 29.92
+    assert report.pressure_altitude_ft(1000) == pytest.approx(1000)
+
+
+def test_vrb_wind_and_metric_groups():
+    report = metar.parse_metar("LFPG 311200Z VRB03MPS 9999 FEW040 SCT100 24/12 Q1013")
+    assert report.wind_dir_deg is None
+    assert report.wind_speed_kt == 6
+    assert report.headwind_kt(270) == 0.0
+    assert report.ceiling_ft is None
+    assert report.altimeter_hpa == 1013
+    assert report.altimeter_inhg == pytest.approx(29.91, abs=0.01)
+    assert report.temp_c == 24
+
+
+def test_cavok_and_missing_groups():
+    report = metar.parse_metar("EGLL 311150Z 25010KT CAVOK 18/09 Q1020")
+    assert report.visibility_sm == 6.2 and report.clouds == ()
+    report = metar.parse_metar("KXYZ 311150Z AUTO 00000KT")
+    assert report.temp_c is None and report.density_altitude_ft(0) is None
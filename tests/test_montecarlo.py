@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from agpilot import calculations, montecarlo, performance
+from agpilot.aircraft import database
+
+AIRCRAFT = "Air Tractor AT-802"
+CONDITION = performance.RUNWAY_CONDITION_NAMES[0]
+
+
+def distribution(**overrides):
+    arguments = dict(data=database()[AIRCRAFT], pressure_alt_ft=3000, oat_c=25, wind_kts=5, runway_condition=CONDITION,
+                     fuel_gal=100, hopper_gal=500, pilot_weight_lbs=200, field_length_ft=3100, min_climb_fpm=1060,
+                     gust_kts=12, n=20_000, seed=7)
+    return montecarlo.takeoff_climb_distribution(**{**arguments, **overrides})
+
+
+def test_same_seed_same_result():
+    first, second = distribution(), distribution()
+    assert first == second
+    assert 0 < first["p_to_50ft_exceeds_field"] < 1 and 0 < first["p_climb_below_min"] < 1
+    other = distribution(seed=8)
+    assert other["takeoff_to_50ft_ft"] != first["takeoff_to_50ft_ft"]
+
+
+def test_zero_spread_is_the_deterministic_result():
+    fixed = {name: ("fixed", 0) for name in montecarlo.DEFAULT_UNCERTAINTY}
+    result = distribution(hopper_gal=0, gust_kts=None, uncertainty=fixed, field_length_ft=None)
+    weight = 6750 + 100 * 6.7 + 200
+    assert list(result["weight_lbs"].values()) == pytest.approx([weight] * len(montecarlo.PERCENTILES))
+    ground_roll, to_50ft = calculations.compute_takeoff(3000, 25, weight, 5, CONDITION, AIRCRAFT)
+    climb = calculations.compute_climb_rate(3000, 25, weight, AIRCRAFT)
+    for p in montecarlo.PERCENTILES:
+        assert result["takeoff_ground_roll_ft"][p] == pytest.approx(ground_roll)
+        assert result["takeoff_to_50ft_ft"][p] == pytest.approx(to_50ft)
+        assert result["climb_rate_fpm"][p] == pytest.approx(climb)
+    assert result["p_climb_below_min"] == float(climb < 1060)
+    assert "p_to_50ft_exceeds_field" not in result
+
+
+def test_percentiles_count_from_the_bad_end():
+    result = distribution()
+    distances, climbs = result["takeoff_to_50ft_ft"], result["climb_rate_fpm"]
+    assert distances[50] < distances[95] < distances[99]
+    assert climbs[50] > climbs[95] > climbs[99]
+
+    data = database()[AIRCRAFT]
+    samples = montecarlo.sample_inputs(data, 3000, 25, 5, 100, 500, 200, gust_kts=12, n=20_000, seed=7)
+    weight, _, _ = performance.weight_balance(data, samples["fuel_gal"], samples["hopper_gal"], samples["pilot_weight_lbs"])
+    climb = performance.climb_rate(data, samples["pressure_alt_ft"], samples["oat_c"], weight)
+    _, to_50ft = performance.takeoff(data, samples["pressure_alt_ft"], samples["oat_c"], weight, samples["wind_kts"],
+                                     CONDITION)
+    assert climbs[95] == pytest.approx(np.percentile(climb, 5))
+    assert result["p_climb_below_min"] == pytest.approx(np.mean(climb < 1060))
+    assert result["p_to_50ft_exceeds_field"] == pytest.approx(np.mean(to_50ft > 3100))
+
+
+def test_field_at_p95_is_exceeded_five_percent_of_the_time():
+    p95 = distribution()["takeoff_to_50ft_ft"][95]
+    assert distribution(field_length_ft=p95)["p_to_50ft_exceeds_field"] == pytest.approx(0.05, abs=1e-3)
+
+
+def test_samples_stay_in_the_domain():
+    data = database()[AIRCRAFT]
+    wide = {"pressure_alt_ft": ("normal", 2000.0), "oat_c": ("uniform", 20.0)}
+    samples = montecarlo.sample_inputs(data, 100, 45, 0, 100, 500, 200, uncertainty=wide, n=10_000, seed=0)
+    assert samples["pressure_alt_ft"].min() == 0 and samples["pressure_alt_ft"].max() > 2000
+    assert samples["oat_c"].max() == 50 and samples["oat_c"].min() < 30
+    # A nominal value outside the domain widens it rather than being moved.
+    samples = montecarlo.sample_inputs(data, -400, 15, 0, 100, 500, 200, uncertainty=wide, n=1000, seed=0)
+    assert samples["pressure_alt_ft"].min() == -400 and samples["pressure_alt_ft"].max() > 0
+
+
+def test_unknown_distribution():
+    with pytest.raises(ValueError):
+        distribution(uncertainty={"oat_c": ("lognormal", 1.0)})
@@ -0,0 +1,156 @@
+import numpy as np
+import pytest
+
+from agpilot import performance
+from agpilot.aircraft import database
+
+N_CASES = 3000
+HELICOPTER_NAMES = ["R44", "Bell 206", "Enstrom 480", "Enstrom 480B", "Robinson R66", "Airbus AS350", "Enstrom F28F",
+                    "Bell 47"]
+
+
+# The scalar formulas the engine was vectorized from, kept verbatim as the reference.
+def calculate_density_altitude(pressure_alt_ft, oat_c):
+    isa_temp_c = 15 - (2 * (pressure_alt_ft / 1000))
+    deviation = oat_c - isa_temp_c
+    da_ft = pressure_alt_ft + (120 * deviation)
+    return round(da_ft)
+
+
+def adjust_for_weight(value, current_weight, base_weight, exponent=1.5):
+    return value * (current_weight / base_weight) ** exponent
+
+
+def adjust_for_runway_condition(value, condition):
+    multipliers = {
+        "Paved / Dry Hard Surface": 1.00,
+        "Dry Grass / Firm Turf": 1.15,
+        "Wet Grass / Damp Turf": 1.45,
+        "Soft / Muddy / Rough": 1.80
+    }
+    factor = multipliers.get(condition, 1.00)
+    return value * factor
+
+
+def adjust_for_wind(value, wind_kts):
+    factor = 1 - (0.1 * wind_kts / 9)
+    return value * max(factor, 0.5)
+
+
+def adjust_for_da(value, da_ft):
+    factor = 1 + (0.07 * da_ft / 1000)
+    return value * factor
+
+
+def compute_takeoff(pressure_alt_ft, oat_c, weight_lbs, wind_kts, runway_condition, data):
+    da_ft = calculate_density_altitude(pressure_alt_ft, oat_c)
+    ground_roll = adjust_for_weight(data["base_takeoff_ground_roll_ft"], weight_lbs, data["max_takeoff_weight_lbs"])
+    ground_roll = adjust_for_da(ground_roll, da_ft)
+    ground_roll = adjust_for_wind(ground_roll, wind_kts)
+    ground_roll = adjust_for_runway_condition(ground_roll, runway_condition)
+    to_50ft = adjust_for_weight(data["base_takeoff_to_50ft_ft"], weight_lbs, data["max_takeoff_weight_lbs"])
+    to_50ft = adjust_for_da(to_50ft, da_ft)
+    to_50ft = adjust_for_wind(to_50ft, wind_kts)
+    to_50ft = adjust_for_runway_condition(to_50ft, runway_condition) * 1.10
+    return ground_roll, to_50ft
+
+
+def compute_landing(pressure_alt_ft, oat_c, weight_lbs, wind_kts, runway_condition, data):
+    weight_lbs = min(weight_lbs, data["max_landing_weight_lbs"])
+    da_ft = calculate_density_altitude(pressure_alt_ft, oat_c)
+    ground_roll = adjust_for_weight(data["base_landing_ground_roll_ft"], weight_lbs, data["max_landing_weight_lbs"], exponent=1.0)
+    ground_roll = adjust_for_da(ground_roll, da_ft)
+    ground_roll = adjust_for_wind(ground_roll, wind_kts)
+    ground_roll = adjust_for_runway_condition(ground_roll, runway_condition)
+    from_50ft = adjust_for_weight(data["base_landing_to_50ft_ft"], weight_lbs, data["max_landing_weight_lbs"], exponent=1.0)
+    from_50ft = adjust_for_da(from_50ft, da_ft)
+    from_50ft = adjust_for_wind(from_50ft, wind_kts)
+    from_50ft = adjust_for_runway_condition(from_50ft, runway_condition) * 1.15
+    return ground_roll, from_50ft
+
+
+def compute_climb_rate(pressure_alt_ft, oat_c, weight_lbs, data):
+    da_ft = calculate_density_altitude(pressure_alt_ft, oat_c)
+    climb = adjust_for_weight(data["base_climb_rate_fpm"], weight_lbs, data["max_takeoff_weight_lbs"], exponent=-1)
+    climb *= (1 - (0.05 * da_ft / 1000))
+    return max(climb, 0)
+
+
+def compute_stall_speed(weight_lbs, data):
+    return data["base_stall_flaps_down_mph"] * np.sqrt(weight_lbs / data["max_landing_weight_lbs"])
+
+
+def compute_glide_distance(height_ft, wind_kts, aircraft, data):
+    is_helicopter = any(heli in aircraft for heli in HELICOPTER_NAMES)
+    if is_helicopter:
+        base_distance_nm = height_ft / 1300
+        wind_factor = 1 + (wind_kts / 20)
+        return base_distance_nm * wind_factor
+    else:
+        ground_speed_mph = 100 + wind_kts
+        return (height_ft / 6076) * data["glide_ratio"] * (ground_speed_mph / 60)
+
+
+def compute_hover_ceiling(da_ft, weight_lbs, data):
+    base_ceiling_ige = data.get("hover_ceiling_ige_max_gw", 0)
+    base_ceiling_oge = data.get("hover_ceiling_oge_max_gw", 0)
+    weight_factor = (data["max_takeoff_weight_lbs"] - weight_lbs) / 500.0
+    ige_ceiling = base_ceiling_ige + (weight_factor * 1000)
+    oge_ceiling = base_ceiling_oge + (weight_factor * 800)
+    da_loss = da_ft / 1000 * 1000
+    ige_ceiling -= da_loss
+    oge_ceiling -= da_loss
+    ige_ceiling = max(0, ige_ceiling)
+    oge_ceiling = max(0, oge_ceiling)
+    return ige_ceiling, oge_ceiling
+
+
+def reference(aircraft, data, pa, oat, weight, wind, condition, height):
+    da_ft = calculate_density_altitude(pa, oat)
+    return {
+        "density_altitude_ft": da_ft,
+        **dict(zip(("takeoff_ground_roll_ft", "takeoff_to_50ft_ft"), compute_takeoff(pa, oat, weight, wind, condition, data))),
+        **dict(zip(("landing_ground_roll_ft", "landing_from_50ft_ft"), compute_landing(pa, oat, weight, wind, condition, data))),
+        "climb_rate_fpm": compute_climb_rate(pa, oat, weight, data),
+        "stall_speed_mph": compute_stall_speed(weight, data),
+        "glide_distance_nm": compute_glide_distance(height, wind, aircraft, data),
+        **dict(zip(("hover_ceiling_ige_ft", "hover_ceiling_oge_ft"), compute_hover_ceiling(da_ft, weight, data))),
+    }
+
+
+@pytest.fixture(scope="module")
+def cases():
+    aircraft_db = database()
+    names = list(aircraft_db)
+    rng = np.random.default_rng(0)
+    return {
+        "aircraft": rng.choice(names, N_CASES),
+        "pressure_alt_ft": rng.uniform(-1000, 14000, N_CASES),
+        "oat_c": rng.uniform(-30, 50, N_CASES),
+        "weight_fraction": rng.uniform(0.3, 1.2, N_CASES),
+        "wind_kts": rng.uniform(-20, 30, N_CASES),
+        "runway_condition": rng.choice(performance.RUNWAY_CONDITION_NAMES, N_CASES),
+        "glide_height_ft": rng.uniform(0, 10000, N_CASES),
+    }
+
+
+def test_cases_cover_every_type(cases):
+    assert set(cases["aircraft"].tolist()) == set(database())
+    assert len(database()) == 16
+
+
+def test_engine_matches_the_scalar_formulas(cases):
+    aircraft_db = database()
+    for name in aircraft_db:
+        data = aircraft_db[name]
+        rows = np.flatnonzero(cases["aircraft"] == name)
+        pa, oat, wind, condition, height = (cases[key][rows] for key in (
+            "pressure_alt_ft", "oat_c", "wind_kts", "runway_condition", "glide_height_ft"))
+        weight = cases["weight_fraction"][rows] * data["max_takeoff_weight_lbs"]
+        results = performance.evaluate(data, pa, oat, weight, wind, condition, glide_height_ft=height,
+                                       helicopter=performance.is_helicopter(data))
+        expected = [reference(name, data, *case) for case in zip(
+            pa.tolist(), oat.tolist(), weight.tolist(), wind.tolist(), condition.tolist(), height.tolist())]
+        for key, values in results.items():
+            np.testing.assert_allclose(values, [case[key] for case in expected], rtol=1e-12, atol=1e-9,
+                                       err_msg=f"{name}: {key}")
@@ -0,0 +1,93 @@
+import numpy as np
+
+from agpilot import hover, performance, solver
+from agpilot.aircraft import database
+
+CONDITIONS = performance.RUNWAY_CONDITION_NAMES
+
+
+def random_cases(n=2000, seed=0):
+    db = database()
+    rng = np.random.default_rng(seed)
+    names = np.array(list(db))[rng.integers(0, len(db), n)]
+    data = db.rows(names)
+    return data, {
+        "pressure_alt_ft": rng.uniform(0, 8000, n),
+        "oat_c": rng.uniform(-10, 45, n),
+        "wind_kts": rng.uniform(-5, 20, n),
+        "runway_condition": np.array(CONDITIONS)[rng.integers(0, len(CONDITIONS), n)],
+        "field_length_ft": rng.uniform(800, 6000, n),
+        "fuel_gal": data["base_fuel_capacity_gal"] * rng.uniform(0.2, 1.0, n),
+        "pilot_weight_lbs": rng.uniform(140, 260, n),
+        "min_climb_fpm": rng.uniform(0, 600, n),
+    }
+
+
+def solve(data, case, to_50ft=True):
+    return solver.max_hopper_load(
+        data, case["pressure_alt_ft"], case["oat_c"], case["wind_kts"], case["runway_condition"],
+        case["field_length_ft"], case["fuel_gal"], case["pilot_weight_lbs"], min_climb_fpm=case["min_climb_fpm"],
+        to_50ft=to_50ft)
+
+
+def test_max_weight_for_takeoff_inverts_takeoff():
+    data, case = random_cases()
+    weight = performance.max_weight_for_takeoff(data, case["pressure_alt_ft"], case["oat_c"], case["wind_kts"],
+                                                case["runway_condition"], case["field_length_ft"])
+    fixed_wing = ~performance.is_helicopter(data)
+    with np.errstate(invalid="ignore"):     # helicopters have no takeoff run (NaN)
+        _, to_50 = performance.takeoff(data, case["pressure_alt_ft"], case["oat_c"], weight, case["wind_kts"],
+                                       case["runway_condition"])
+    np.testing.assert_allclose(to_50[fixed_wing], case["field_length_ft"][fixed_wing], rtol=1e-9)
+
+
+def test_max_weight_for_climb_inverts_climb():
+    data, case = random_cases()
+    climbing = case["min_climb_fpm"] > 0
+    weight = performance.max_weight_for_climb(data, case["pressure_alt_ft"], case["oat_c"], case["min_climb_fpm"])
+    climb = performance.climb_rate(data, case["pressure_alt_ft"], case["oat_c"], weight)
+    reachable = climbing & (weight > 0)
+    np.testing.assert_allclose(climb[reachable], case["min_climb_fpm"][reachable], rtol=1e-9)
+
+
+def test_max_hopper_load_meets_every_limit_and_binds_one():
+    data, case = random_cases()
+    for to_50ft in (True, False):
+        result = solve(data, case, to_50ft)
+        feasible = result["feasible"]
+        weight = result["weight_lbs"]
+        ground_roll, to_50 = performance.takeoff(data, case["pressure_alt_ft"], case["oat_c"], weight, case["wind_kts"],
+                                                 case["runway_condition"])
+        distance = to_50 if to_50ft else ground_roll
+        helicopter = performance.is_helicopter(data)
+        climb = performance.climb_rate(data, case["pressure_alt_ft"], case["oat_c"], weight)
+        _, oge_margin = hover.hover_margins(data, case["pressure_alt_ft"], case["oat_c"], weight)
+        hover_weight = hover.max_hover_weight(data, case["pressure_alt_ft"], case["oat_c"])
+
+        ok = feasible
+        assert (weight[ok] <= data["max_takeoff_weight_lbs"][ok] + 1e-6).all()
+        assert (helicopter | (distance <= case["field_length_ft"] * (1 + 1e-9)))[ok].all()
+        assert (climb >= case["min_climb_fpm"] * (1 - 1e-9))[ok].all()
+        assert (weight <= hover_weight + 1e-6)[ok].all()
+        assert ((result["hopper_gal"] >= 0) & (result["hopper_gal"] <= data["hopper_capacity_gal"]))[ok].all()
+
+        # Below capacity the named limit is met with equality.
+        limit = result["limit"]
+        binding = ok & (limit != "hopper capacity")
+        rows = binding & (limit == "max takeoff weight")
+        np.testing.assert_allclose(weight[rows], data["max_takeoff_weight_lbs"][rows], rtol=1e-9)
+        rows = binding & (limit == "takeoff distance")
+        np.testing.assert_allclose(distance[rows], case["field_length_ft"][rows], rtol=1e-9)
+        rows = binding & (limit == "climb rate")
+        np.testing.assert_allclose(climb[rows], case["min_climb_fpm"][rows], rtol=1e-9)
+        rows = binding & (limit == "hover ceiling")
+        np.testing.assert_allclose(weight[rows], hover_weight[rows], rtol=1e-9)
+        assert (oge_margin[rows] < 50).all()
+
+
+def test_full_hopper_when_nothing_binds():
+    db = database()
+    data = db["Air Tractor AT-802"]
+    result = solver.max_hopper_load(data, 0, 15, 10, CONDITIONS[0], 10_000, 50, 170)
+    assert result["limit"] in ("hopper capacity", "max takeoff weight")
+    assert result["feasible"]
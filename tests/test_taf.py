@@ -0,0 +1,125 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from agpilot import hover, metar, taf, wind
+from agpilot.aircraft import database
+
+RAW = ("TAF KELN 302330Z 3100/0106 31012G20KT P6SM SCT050 "
+       "FM310400 VRB03KT P6SM BKN030 "
+       "TEMPO 3106/3110 2SM BR OVC008 "
+       "BECMG 3112/3114 24015KT "
+       "PROB30 3118/3122 TSRA BKN020CB "
+       "FM010200 33008KT 6SM SKC TX31/3122Z TN12/0105Z")
+REFERENCE = datetime(2026, 8, 31, tzinfo=timezone.utc)
+
+
+def utc(month, day, hour):
+    return datetime(2026, month, day, hour, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def forecast():
+    return taf.parse_taf(RAW, REFERENCE)
+
+
+def test_header_resolves_across_the_month_end(forecast):
+    assert forecast.station == "KELN"
+    assert forecast.issued == datetime(2026, 8, 30, 23, 30, tzinfo=timezone.utc)
+    assert forecast.valid_from == utc(8, 31, 0)
+    assert forecast.valid_to == utc(9, 1, 6)
+    assert forecast.temperatures == ((utc(8, 31, 22), 31), (utc(9, 1, 5), 12))
+
+
+def test_change_groups_kind_and_timing(forecast):
+    got = [(g.kind, g.start, g.end, g.probability) for g in forecast.groups]
+    assert got == [
+        ("INITIAL", utc(8, 31, 0), utc(9, 1, 6), 100),
+        ("FM", utc(8, 31, 4), utc(9, 1, 6), 100),
+        ("TEMPO", utc(8, 31, 6), utc(8, 31, 10), 100),
+        ("BECMG", utc(8, 31, 12), utc(8, 31, 14), 100),
+        ("PROB", utc(8, 31, 18), utc(8, 31, 22), 30),
+        ("FM", utc(9, 1, 2), utc(9, 1, 6), 100),
+    ]
+
+
+def test_change_group_fields(forecast):
+    initial, fm, tempo, becmg, prob, last = forecast.groups
+    assert (initial.fields["wind_dir_deg"], initial.fields["wind_gust_kt"]) == (310, 20)
+    assert fm.fields["wind_dir_deg"] is None and fm.fields["wind_gust_kt"] is None
+    assert tempo.fields["clouds"] == (("OVC", 800, None),)
+    assert set(becmg.fields) == {"wind_dir_deg", "wind_speed_kt", "wind_gust_kt", "wind_var_from_deg",
+                                 "wind_var_to_deg"}
+    assert prob.fields["weather"] == ("TSRA",)
+    assert last.fields["clouds"] == ()
+
+
+def test_timeline_applies_fm_at_start_and_becmg_at_end(forecast):
+    hourly = taf.timeline(forecast, include_prob=False)
+    assert hourly["kind"] == ("PREVAILING", "TEMPO", "BECMG")
+    assert list(hourly["probability"]) == [100, 100, 100]
+    times = list(hourly["times"])
+    assert len(times) == 30 and times[0] == forecast.valid_from
+    speed, ceiling = hourly["wind_speed_kt"][0], hourly["ceiling_ft"][0]
+    assert speed[3] == 12 and speed[4] == 3              # FM0400
+    assert ceiling[3] == np.inf and ceiling[4] == 3000
+    assert speed[13] == 3 and speed[14] == 15            # BECMG 12–14 prevails from its end
+    assert hourly["wind_speed_kt"][2][12] == 15          # ... and is its own scenario while it happens
+    assert speed[26] == 8 and ceiling[26] == np.inf      # FM010200 replaces the clouds
+    tempo = hourly["ceiling_ft"][1]
+    assert tempo[5] == 3000 and tempo[6] == tempo[9] == 800 and tempo[10] == 3000
+
+
+def test_timeline_prob_scenario(forecast):
+    hourly = taf.timeline(forecast)
+    assert hourly["kind"][-1] == "PROB" and hourly["probability"][-1] == 30
+    no_go = hourly["no_go_weather"][-1]
+    assert not no_go[17] and no_go[18:22].all() and not no_go[22]
+
+
+def test_timeline_temperature_runs_through_tx_tn(forecast):
+    hourly = taf.timeline(forecast, oat_c=20)
+    assert hourly["oat_c"][0, 0] == 20
+    assert hourly["oat_c"][0, 22] == 31
+    assert hourly["oat_c"][0, 11] == pytest.approx(20 + 11 / 22 * 11)
+
+
+def test_not_a_taf():
+    with pytest.raises(ValueError):
+        taf.parse_taf("KELN 311155Z 31012KT 10SM CLR 25/10 A3001", REFERENCE)
+
+
+@pytest.mark.parametrize("go, window", [
+    ([0, 1, 1, 0, 1, 1, 1, 0], (4, 7)),
+    ([1, 1, 0, 1, 1], (0, 2)),
+    ([0, 0, 0], (0, 0)),
+    ([1, 1, 1], (0, 3)),
+])
+def test_launch_window(go, window):
+    start, stop = taf.launch_window(np.array(go, bool))
+    assert (start, stop) == window
+
+
+def test_launch_window_broadcasts():
+    start, stop = taf.launch_window(np.array([[0, 1, 1], [1, 0, 0]], bool))
+    assert list(start) == [1, 0] and list(stop) == [3, 1]
+
+
+def test_helicopter_that_cannot_hover_is_no_go():
+    clear = taf.parse_taf("TAF KELN 302330Z 3100/3106 00000KT P6SM SKC", REFERENCE)
+    hourly = taf.timeline(clear, oat_c=40)
+    strip = {**wind.runways(("KELN",)), "elevation_ft": np.array([9000.0])}
+    data = database().rows(database().names("helicopter"))
+    mtow = data["max_takeoff_weight_lbs"]
+    pressure_alt = metar.pressure_altitude(9000, hourly["altimeter_inhg"][0, 0])
+    limit = hover.max_hover_weight(data, pressure_alt, 40)
+    assert (limit < mtow).all()
+
+    heavy = taf.forecast(data, hourly, strip, mtow)
+    assert not heavy["go"].any()
+    assert (heavy["hover_margin_ft"] < 0).all()
+    light = taf.forecast(data, hourly, strip, 0.95 * limit)
+    assert light["go"].all()
+    # The same light load fails once the required margin above the field is large enough.
+    assert not taf.forecast(data, hourly, strip, 0.95 * limit, hover_margin_ft=3000)["go"].any()
@@ -0,0 +1,186 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from agpilot import weather
+
+STATIONS = ["KELN", "KYKM", "KEAT", "KPUW"]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    bulk = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self.server.paths.append(url.path)
+        time.sleep(self.server.delay)
+        if self.server.status != 200 or (url.path.startswith("/bulk") and not self.bulk):
+            self.send_response(self.server.status if self.server.status != 200 else 404)
+            self.end_headers()
+            return
+        ids = parse_qs(url.query)["ids"][0].split(",") if url.query else [url.path.rsplit("/", 1)[-1]]
+        if "metar" in url.path:
+            body = "\n".join(f"{icao} 180853Z 32012KT 10SM CLR 12/M01 A3012" for icao in ids)
+            if not url.path.startswith("/bulk"):
+                body = "2026/10/18 08:53\n" + body
+        else:
+            body = "\n".join(f"TAF {icao} 180520Z 1806/1906 32012KT P6SM SKC" for icao in ids)
+        body = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    def start(bulk=True, **client_options):
+        handler = type("Handler", (StubHandler,), {"bulk": bulk})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        server.paths, server.delay, server.status = [], 0.05, 200
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        base = f"http://127.0.0.1:{server.server_port}"
+        client = weather.WeatherClient(
+            metar_url=base + "/metar/{icao}", taf_url=base + "/taf/{icao}",
+            bulk_metar_url=base + "/bulkmetar?ids={ids}", bulk_taf_url=base + "/bulktaf?ids={ids}", **client_options)
+        clients.append(client)
+        return server, client
+
+    servers, clients = [], []
+    yield start
+    for client in clients:
+        client.close()
+    for server in servers:
+        server.shutdown()
+
+
+def test_concurrent_fallback_stations_do_not_deadlock(stub):
+    server, client = stub(bulk=False)
+    pool = ThreadPoolExecutor(8)
+    try:
+        calls = [pool.submit(client.stations, STATIONS) for _ in range(8)]
+        results = [call.result(timeout=15) for call in calls]
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    assert all(metar.text and taf.text for result in results for metar, taf in result.values())
+
+
+def test_expired_reports_refresh_with_one_bulk_call_per_kind(stub):
+    server, client = stub()
+    client.stations(STATIONS)
+    assert sorted(server.paths) == ["/bulkmetar", "/bulktaf"]
+    with client._lock:
+        for key, report in client._cache.items():
+            client._cache[key] = replace(report, fetched_at=report.fetched_at - weather.TAF_TTL_S - 1)
+    server.paths.clear()
+    reports = client.stations(STATIONS, stale_ok=True)
+    assert all(metar.stale and taf.stale for metar, taf in reports.values())
+    deadline = time.time() + 5
+    while len(server.paths) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.2)
+    assert sorted(server.paths) == ["/bulkmetar", "/bulktaf"]
+    assert all(not metar.stale for metar, _ in client.stations(STATIONS, stale_ok=True).values())
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_ttl_expiry_refetches(stub):
+    server, client = stub(metar_ttl_s=0.3)
+    first = client.metar("keln")
+    assert first.text.startswith("KELN") and first.issued == "2026/10/18 08:53"
+    assert client.metar("KELN") is first
+    assert server.paths == ["/metar/KELN"]
+    time.sleep(0.35)
+    second = client.metar("KELN")
+    assert server.paths == ["/metar/KELN"] * 2
+    assert second.fetched_at > first.fetched_at and not second.stale
+
+
+def test_stale_ok_returns_at_once_and_refreshes_in_background(stub):
+    server, client = stub(metar_ttl_s=0.1)
+    first = client.metar("KELN")
+    time.sleep(0.15)
+    server.delay = 0.5
+    start = time.perf_counter()
+    stale = client.metar("KELN", stale_ok=True)
+    assert time.perf_counter() - start < 0.3
+    assert stale.stale and stale.text == first.text
+    # A second caller while the refresh is in flight does not start another one.
+    assert client.metar("KELN", stale_ok=True).stale
+    assert wait_for(lambda: client.cached("metar", "KELN").fetched_at > first.fetched_at)
+    assert server.paths == ["/metar/KELN"] * 2
+    assert not client.cached("metar", "KELN").stale
+
+
+def test_concurrent_callers_share_one_fetch(stub):
+    server, client = stub()
+    server.delay = 0.3
+    barrier = threading.Barrier(8)
+
+    def fetch():
+        barrier.wait()
+        return client.metar("KELN")
+
+    with ThreadPoolExecutor(8) as pool:
+        reports = list(pool.map(lambda _: fetch(), range(8)))
+    assert server.paths == ["/metar/KELN"]
+    assert all(report == reports[0] for report in reports)
+
+
+def test_concurrent_station_calls_share_one_fetch_per_kind(stub):
+    server, client = stub()
+    server.delay = 0.3
+    barrier = threading.Barrier(6)
+
+    def fetch():
+        barrier.wait()
+        return client.station("KELN")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(6) as pool:
+        results = list(pool.map(lambda _: fetch(), range(6)))
+    # METAR and TAF are fetched side by side, not one after the other.
+    assert time.perf_counter() - start < 0.55
+    assert sorted(server.paths) == ["/metar/KELN", "/taf/KELN"]
+    assert all(metar.text and taf.text.startswith("TAF KELN") for metar, taf in results)
+
+
+def test_failed_fetch_falls_back_to_last_good_report(stub, monkeypatch):
+    monkeypatch.setattr(weather, "ERROR_TTL_S", 0.3)
+    server, client = stub(metar_ttl_s=0.1)
+    good = client.metar("KELN")
+    time.sleep(0.15)
+    server.status = 500
+    failed = client.metar("KELN")
+    assert failed.stale and failed.error == "HTTP 500" and failed.text == good.text
+    # The failure is remembered: no request until ERROR_TTL_S has passed.
+    assert client.metar("KELN").stale
+    assert len(server.paths) == 2
+    time.sleep(0.35)
+    server.status = 200
+    recovered = client.metar("KELN")
+    assert not recovered.stale and recovered.error is None and len(server.paths) == 3
+
+
+def test_failed_first_fetch_is_an_error_report(stub):
+    server, client = stub()
+    server.status = 404
+    report = client.taf("KXYZ")
+    assert report.text is None and report.error == "HTTP 404"
+    assert client.taf("KXYZ") is report     # cached for ERROR_TTL_S
+    assert server.paths == ["/taf/KXYZ"]
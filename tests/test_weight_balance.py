@@ -0,0 +1,79 @@
+import time
+
+import numpy as np
+
+from agpilot import loadplan, weight_balance
+from agpilot.aircraft import database
+
+SQUARE = np.array([[14.5, 3400], [14.5, 9400], [22.5, 9400], [22.5, 3400]], dtype=float)
+
+
+def sampled_path_inside(w0, m0, w1, m1, polygon, samples=4001):
+    u = np.linspace(0.0, 1.0, samples)
+    weight = w0[..., None] + u * (w1 - w0)[..., None]
+    cg = (m0[..., None] + u * (m1 - m0)[..., None]) / weight
+    return weight_balance.point_in_polygon(cg, weight, polygon).all(axis=-1)
+
+
+def test_path_in_polygon_matches_dense_sampling():
+    rng = np.random.default_rng(0)
+    w0, w1 = rng.uniform(3000, 9800, (2, 5000))
+    m0, m1 = rng.uniform(14, 23, (2, 5000)) * (w0, w1)
+    exact = weight_balance.path_in_polygon(w0, m0, w1, m1, SQUARE)
+    assert exact.any() and not exact.all()
+    assert np.array_equal(exact, sampled_path_inside(w0, m0, w1, m1, SQUARE))
+
+
+def test_path_in_polygon_is_winding_independent():
+    rng = np.random.default_rng(1)
+    w0, w1 = rng.uniform(3000, 9800, (2, 1000))
+    m0, m1 = rng.uniform(14, 23, (2, 1000)) * (w0, w1)
+    assert np.array_equal(weight_balance.path_in_polygon(w0, m0, w1, m1, SQUARE),
+                          weight_balance.path_in_polygon(w0, m0, w1, m1, SQUARE[::-1]))
+
+
+def test_path_leaving_between_inside_endpoints_fails():
+    # Both ends sit just inside the aft (slanted) limit; the CG curve (cg = a + b / W) bows across it.
+    triangle = np.array([[10.0, 1000.0], [10.0, 3000.0], [30.0, 3000.0]])
+    w0, w1 = 2890.0, 1285.0
+    m0, m1 = 28.7 * w0, 12.8 * w1
+    assert weight_balance.point_in_polygon([m0 / w0, m1 / w1], [w0, w1], triangle).all()
+    assert not weight_balance.path_in_polygon(w0, m0, w1, m1, triangle)
+    assert not sampled_path_inside(np.array(w0), np.array(m0), np.array(w1), np.array(m1), triangle)
+
+
+def test_trajectory_cg_ok_covers_the_sampled_points():
+    db = database()
+    names = np.repeat(list(db), 50)
+    data = db.rows(names)
+    rng = np.random.default_rng(2)
+    fuel = data["base_fuel_capacity_gal"] * rng.uniform(0, 1, len(names))
+    hopper = data["hopper_capacity_gal"] * rng.uniform(0, 1, len(names))
+    burn = fuel * rng.uniform(0.5, 1.5, len(names))
+    pilot = rng.uniform(120, 300, len(names))
+    envelope = weight_balance.envelope_polygons(db, names)
+    dense = weight_balance.trajectory(data, fuel, hopper, pilot, burn, envelope=envelope, steps=2001)
+    assert np.array_equal(dense["cg_ok"], dense["in_envelope"].all(axis=-1))
+    assert np.array_equal(weight_balance.trajectory(data, fuel, hopper, pilot, burn, envelope=envelope, steps=1)["cg_ok"],
+                          dense["cg_ok"])
+
+
+def test_load_plan_100k_rows_is_sub_second():
+    db = database()
+    rng = np.random.default_rng(3)
+    n = 100_000
+    names = np.array(list(db))[rng.integers(0, len(db), n)]
+    data = db.rows(names)
+    sorties = {
+        "aircraft": names, "field": np.full(n, "KELN"),
+        "pressure_alt_ft": rng.uniform(0, 5000, n), "oat_c": rng.uniform(-10, 40, n), "wind_kts": rng.uniform(-5, 15, n),
+        "runway_condition": np.full(n, "Paved / Dry Hard Surface"),
+        "fuel_gal": data["base_fuel_capacity_gal"] * rng.uniform(0.2, 1, n),
+        "hopper_gal": data["hopper_capacity_gal"] * rng.uniform(0, 1, n), "pilot_weight_lbs": rng.uniform(150, 250, n),
+        **{name: np.full(n, np.nan) for name in loadplan.OPTIONAL_COLUMNS},
+    }
+    loadplan.evaluate_sorties(sorties, db)
+    started = time.perf_counter()
+    table = loadplan.evaluate_sorties(sorties, db)
+    assert time.perf_counter() - started < 1.0
+    assert len(table["pass"]) == n
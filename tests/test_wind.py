@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from agpilot import wind
+
+
+@pytest.mark.parametrize("direction, speed, heading, headwind, crosswind", [
+    (340, 10, 340, 10, 0),
+    (160, 10, 340, -10, 0),
+    (70, 10, 340, 0, 10),
+    (10, 20, 340, 20 * np.cos(np.radians(30)), 20 * np.sin(np.radians(30))),
+])
+def test_steady_wind(direction, speed, heading, headwind, crosswind):
+    h, x = wind.components(direction, speed, heading)
+    assert h == pytest.approx(headwind, abs=1e-9)
+    assert x == pytest.approx(crosswind, abs=1e-9)
+
+
+def test_gust_counts_for_tailwind_and_crosswind_only():
+    h, x = wind.components(10, 10, 340, gust_kt=25)
+    assert h == pytest.approx(10 * np.cos(np.radians(30)))
+    assert x == pytest.approx(25 * np.sin(np.radians(30)))
+    h, _ = wind.components(180, 10, 340, gust_kt=25)
+    assert h == pytest.approx(-25 * np.cos(np.radians(20)))
+
+
+def test_variable_range_takes_the_worst_direction():
+    # 300V020 against runway 34 (340°): the range spans the crosswind-free head direction but
+    # not 90° off, so crosswind comes from the wider edge (300°, 40° off) and headwind from 020 (40° off).
+    h, x = wind.components(340, 10, 340, var_from_deg=300, var_to_deg=20)
+    assert h == pytest.approx(10 * np.cos(np.radians(40)))
+    assert x == pytest.approx(10 * np.sin(np.radians(40)))
+    # A range through a beam gives the full speed as crosswind; through the tail, full tailwind.
+    _, x = wind.components(40, 10, 340, var_from_deg=20, var_to_deg=100)
+    assert x == pytest.approx(10)
+    h, _ = wind.components(150, 10, 340, var_from_deg=120, var_to_deg=200, gust_kt=15)
+    assert h == pytest.approx(-15)
+
+
+def test_range_wrapping_north():
+    # 350V030 against a heading of 090: the range passes through 000, a direct crosswind, and
+    # 350 is the edge furthest behind the beam.
+    h, x = wind.components(10, 10, 90, var_from_deg=350, var_to_deg=30)
+    assert h == pytest.approx(10 * np.cos(np.radians(100)))
+    assert x == pytest.approx(10)
+
+
+def test_vrb_is_full_tailwind_and_crosswind():
+    h, x = wind.components(None, 4, 340, gust_kt=9)
+    assert h == pytest.approx(-9)
+    assert x == pytest.approx(9)
+    h, x = wind.components(np.nan, 4, 340)
+    assert (h, x) == pytest.approx((-4, 4))
+
+
+def test_components_broadcast():
+    h, x = wind.components(np.array([0, 90, 180])[:, None], 10, np.array([0, 90]))
+    assert h.shape == x.shape == (3, 2)
+    np.testing.assert_allclose(h[:, 0], [10, 0, -10], atol=1e-9)
+
+
+def test_evaluate_picks_the_best_usable_end():
+    table = wind.runways(("KELN",))
+    from agpilot.aircraft import database
+    data = database()["Air Tractor AT-802"]
+    result = wind.evaluate(data, table, 250, 12)
+    best = result["best"][0]
+    assert best >= 0 and result["usable"][0, best]
+    usable_margins = np.where(result["usable"][0], result["margin_ft"][0], -np.inf)
+    assert result["margin_ft"][0, best] == usable_margins.max()